@@ -0,0 +1,320 @@
+"""
+Benchmark das fases do GRASP sobre instâncias sintéticas.
+
+Gera uma instância com o número de salas, mistura de capacidades e nível de
+saturação pedidos, mede separadamente construir_solucao_grasp,
+buscar_melhora_local, a avaliação em lote e grasp, e escreve o resultado em JSON.
+Não depende do reportlab.
+
+Exemplo:
+    python benchmark.py --salas 40 --saturacao 0.9 --iteracoes 50 --saida bench.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import grasp as g
+
+
+def gerar_instancia_sintetica(n_salas=4, capacidades=((24, 0.5), (54, 0.5)), saturacao=1.0,
+                              n_aulas=None, n_dias=5, n_horarios=4, semente=0):
+    """
+    Cria uma Instancia e uma lista de aulas aleatórias.
+    capacidades: pares (capacidade, fração das salas).
+    saturacao: aulas por slot de sala disponível (1.0 = tantas aulas quanto
+    slots); ignorada se n_aulas for informado.
+    Retorna: tupla (instancia, aulas)
+    """
+    rng = random.Random(semente)
+    valores = [c for c, _ in capacidades]
+    pesos = [p for _, p in capacidades]
+
+    salas = [g.Sala(f"Sala{i + 1}", rng.choices(valores, pesos)[0], prioridade=rng.randint(-1, 2))
+             for i in range(n_salas)]
+    dias = [f"Dia {d + 1}" for d in range(n_dias)]
+    horarios = [f"Horário {h + 1}" for h in range(n_horarios)]
+    instancia = g.Instancia(salas, dias, horarios)
+
+    if n_aulas is None:
+        n_aulas = int(round(saturacao * n_salas * n_dias * n_horarios))
+
+    aulas = []
+    for i in range(n_aulas):
+        # tamanho da turma proporcional a uma capacidade sorteada da mistura
+        capacidade = rng.choices(valores, pesos)[0]
+        alunos = rng.randint(max(1, capacidade // 2), capacidade)
+        aulas.append(g.Aula(f"Disciplina {i + 1} ({alunos} alunos)", f"Prof. {i % 50 + 1}",
+                            alunos, rng.randrange(n_dias), rng.randrange(n_horarios)))
+    return instancia, aulas
+
+
+def medir_construcao(aulas, instancia, repeticoes, rng, alpha=None, construcao=None):
+    agenda = g.criar_agenda_vazia(instancia)
+    nao_alocadas = 0
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        _, sobras = g.construir_solucao_grasp(aulas, agenda, rng, instancia, alpha, estrategia=construcao)
+        nao_alocadas += len(sobras)
+    tempo = time.perf_counter() - inicio
+    return {
+        "repeticoes": repeticoes,
+        "tempo_s": tempo,
+        "construcoes_por_s": repeticoes / tempo if tempo else None,
+        "aulas_por_s": repeticoes * len(aulas) / tempo if tempo else None,
+        "nao_alocadas_media": nao_alocadas / repeticoes if repeticoes else None,
+    }
+
+
+def medir_busca_local(aulas, instancia, repeticoes, tentativas, rng):
+    # as construções ficam fora da medição; só a busca local é cronometrada.
+    # movimentos_por_s conta os movimentos de fato sorteados (EstatisticasGrasp),
+    # não o orçamento de tentativas: horários vazios não geram movimento
+    tempo = 0.0
+    ganho = 0.0
+    estatisticas = g.EstatisticasGrasp()
+    for _ in range(repeticoes):
+        agenda, _ = g.construir_solucao_grasp(aulas, None, rng, instancia)
+        score_inicial = g.avaliar_agenda(agenda, instancia)
+        inicio = time.perf_counter()
+        _, score = g.buscar_melhora_local(agenda, tentativas, rng=rng, instancia=instancia,
+                                          estatisticas=estatisticas)
+        tempo += time.perf_counter() - inicio
+        ganho += score - score_inicial
+    movimentos = estatisticas.movimentos_tentados
+    return {
+        "repeticoes": repeticoes,
+        "tentativas_por_chamada": tentativas,
+        "tempo_s": tempo,
+        "movimentos_tentados": movimentos,
+        "movimentos_viaveis": estatisticas.movimentos_viaveis,
+        "movimentos_aceitos": estatisticas.movimentos_aceitos,
+        "movimentos_por_s": movimentos / tempo if tempo else None,
+        "ganho_medio_score": ganho / repeticoes if repeticoes else None,
+    }
+
+
+def medir_avaliacao_lote(aulas, instancia, repeticoes, rng):
+    """
+    Score de `repeticoes` soluções construídas: avaliar_agenda uma a uma
+    contra MatrizCustos.avaliar_lote sobre os vetores de salas_por_aula.
+    """
+    vetores = []
+    agendas = []
+    for _ in range(repeticoes):
+        agenda, _ = g.construir_solucao_grasp(aulas, None, rng, instancia)
+        agendas.append(agenda)
+        vetores.append(g.salas_por_aula(agenda, aulas, instancia))
+
+    inicio = time.perf_counter()
+    matriz = g.MatrizCustos(aulas, instancia)
+    tempo_matriz = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for agenda in agendas:
+        g.avaliar_agenda(agenda, instancia)
+    tempo_agendas = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    matriz.avaliar_lote(vetores)
+    tempo_lote = time.perf_counter() - inicio
+    return {
+        "solucoes": repeticoes,
+        "numpy": g.obter_numpy() is not None,
+        "tempo_matriz_s": tempo_matriz,
+        "tempo_avaliar_agenda_s": tempo_agendas,
+        "tempo_avaliar_lote_s": tempo_lote,
+    }
+
+
+def medir_grasp(aulas, instancia, iteracoes, semente, processos=None, alpha=None, reativo=False,
+                elite=None, busca_local="aleatoria", construcao=None):
+    estatisticas = g.EstatisticasGrasp()
+    alpha_reativo = g.AlphaReativo() if reativo else None
+    pool = g.PoolElite(elite) if elite else None
+    inicio = time.perf_counter()
+    _, score, nao_alocadas = g.grasp(aulas, iteracoes=iteracoes, semente=semente,
+                                     processos=processos, instancia=instancia, alpha=alpha,
+                                     estatisticas=estatisticas, reativo=alpha_reativo,
+                                     elite=pool, busca_local=busca_local,
+                                     construcao=construcao)
+    tempo = time.perf_counter() - inicio
+    resultado = {
+        "iteracoes": iteracoes,
+        "processos": processos or 1,
+        "tempo_s": tempo,
+        "iteracoes_por_s": iteracoes / tempo if tempo else None,
+        "score": score,
+        "nao_alocadas": len(nao_alocadas),
+        "estatisticas": estatisticas.resumo(),
+    }
+    if alpha_reativo is not None:
+        resultado["alpha_reativo"] = alpha_reativo.relatorio()
+    if pool is not None:
+        resultado["elite"] = pool.resumo()
+    return resultado
+
+
+def comparar_buscas_locais(aulas, instancia, tempo_limite, semente, alpha=None):
+    """
+    Cada motor de BUSCAS_LOCAIS no grasp_anytime com o mesmo orçamento de
+    tempo: melhor score, aulas não alocadas e iterações concluídas.
+    """
+    resultado = {}
+    for nome in g.BUSCAS_LOCAIS:
+        estatisticas = g.EstatisticasGrasp()
+        melhor = None
+        for _, score, nao_alocadas, iteracao in g.grasp_anytime(
+                aulas, tempo_limite=tempo_limite, instancia=instancia, semente=semente,
+                alpha=alpha, limite=None, estatisticas=estatisticas, busca_local=nome):
+            melhor = {"score": score, "nao_alocadas": len(nao_alocadas), "iteracao": iteracao}
+        melhor["iteracoes"] = estatisticas.iteracoes
+        resultado[nome] = melhor
+    return resultado
+
+
+def comparar_construcoes(aulas, instancia, repeticoes, iteracoes, semente, alpha=None):
+    """
+    Cada combinação de ordem, RCL e viés de EstrategiaConstrucao: score e
+    aulas não alocadas das construções (sem busca local) e, no grasp com
+    `iteracoes` iterações, o melhor score e a iteração em que foi atingido.
+    """
+    resultado = {}
+    for ordem, rcl, vies in itertools.product(g.EstrategiaConstrucao.ORDENS, g.EstrategiaConstrucao.RCLS,
+                                              g.EstrategiaConstrucao.VIESES):
+        construcao = g.EstrategiaConstrucao(ordem, rcl, vies)
+        rng = random.Random(semente)
+        agenda = g.criar_agenda_vazia(instancia)
+        scores = []
+        nao_alocadas = 0
+        for _ in range(repeticoes):
+            _, sobras = g.construir_solucao_grasp(aulas, agenda, rng, instancia, alpha, estrategia=construcao)
+            scores.append(g.avaliar_agenda(agenda, instancia))
+            nao_alocadas += len(sobras)
+        estatisticas = g.EstatisticasGrasp()
+        _, score, sobras = g.grasp(aulas, iteracoes=iteracoes, semente=semente, instancia=instancia,
+                                   alpha=alpha, estatisticas=estatisticas, construcao=construcao)
+        resultado[construcao.nome] = {
+            "construcao_score_medio": sum(scores) / repeticoes if repeticoes else None,
+            "construcao_score_maximo": max(scores) if scores else None,
+            "construcao_nao_alocadas_media": nao_alocadas / repeticoes if repeticoes else None,
+            "grasp_score": score,
+            "grasp_nao_alocadas": len(sobras),
+            "grasp_iteracao_melhor": estatisticas.melhorias[-1][0] if estatisticas.melhorias else None,
+        }
+    return resultado
+
+
+def medir_convergencia(aulas, instancia, iteracoes, rng, alpha=None, construcao=None):
+    """
+    Melhor score em função do tempo de parede, iteração a iteração
+    (mesmo laço de construção + busca local do grasp sequencial).
+    """
+    agenda = g.criar_agenda_vazia(instancia)
+    melhor = float("-inf")
+    pontos = []
+    inicio = time.perf_counter()
+    for i in range(iteracoes):
+        g.construir_solucao_grasp(aulas, agenda, rng, instancia, alpha, estrategia=construcao)
+        _, score = g.buscar_melhora_local(agenda, rng=rng, instancia=instancia)
+        if score > melhor:
+            melhor = score
+            pontos.append({"iteracao": i, "tempo_s": time.perf_counter() - inicio, "score": score})
+    return pontos
+
+
+def ler_capacidades(texto):
+    """
+    "24:0.5,54:0.5" -> ((24, 0.5), (54, 0.5))
+    """
+    pares = []
+    for item in texto.split(","):
+        capacidade, _, fracao = item.partition(":")
+        pares.append((int(capacidade), float(fracao or 1)))
+    return tuple(pares)
+
+
+def executar(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das fases do GRASP em instâncias sintéticas.")
+    parser.add_argument("--salas", type=int, default=4)
+    parser.add_argument("--capacidades", default="24:0.5,54:0.5",
+                        help="mistura de capacidades, capacidade:fração separados por vírgula")
+    parser.add_argument("--saturacao", type=float, default=1.0,
+                        help="aulas por slot de sala disponível (padrão: 1.0)")
+    parser.add_argument("--aulas", type=int, default=None, help="número de aulas (ignora --saturacao)")
+    parser.add_argument("--dias", type=int, default=5)
+    parser.add_argument("--horarios", type=int, default=4)
+    parser.add_argument("--iteracoes", type=int, default=30, help="iterações do grasp medido")
+    parser.add_argument("--repeticoes", type=int, default=20,
+                        help="repetições das medições de construção e busca local")
+    parser.add_argument("--tentativas", type=int, default=100, help="max_tentativas da busca local")
+    parser.add_argument("--alpha", type=float, default=None)
+    parser.add_argument("--reativo", action="store_true", help="mede o grasp com alpha reativo")
+    parser.add_argument("--elite", type=int, default=None, metavar="N",
+                        help="mede o grasp com pool de elite de N soluções e path relinking")
+    parser.add_argument("--busca-local", choices=list(g.BUSCAS_LOCAIS), default="aleatoria",
+                        help="motor de busca local do grasp medido")
+    parser.add_argument("--comparar-buscas", type=float, default=None, metavar="SEGUNDOS",
+                        help="compara todos os motores de busca local com o mesmo orçamento de tempo")
+    parser.add_argument("--ordem", choices=g.EstrategiaConstrucao.ORDENS, default="csv",
+                        help="ordem das aulas na construção medida")
+    parser.add_argument("--rcl", choices=g.EstrategiaConstrucao.RCLS, default="cardinalidade",
+                        help="tipo de RCL da construção medida")
+    parser.add_argument("--vies", choices=list(g.EstrategiaConstrucao.VIESES), default="uniforme",
+                        help="viés do sorteio na RCL da construção medida")
+    parser.add_argument("--comparar-construcoes", action="store_true",
+                        help="compara todas as combinações de ordem, RCL e viés da construção")
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", help="arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    instancia, aulas = gerar_instancia_sintetica(
+        args.salas, ler_capacidades(args.capacidades), args.saturacao, args.aulas,
+        args.dias, args.horarios, args.semente)
+    rng = random.Random(args.semente)
+    construcao = g.EstrategiaConstrucao(args.ordem, args.rcl, args.vies)
+
+    resultado = {
+        "ambiente": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "parametros": vars(args),
+        "instancia": {
+            "aulas": len(aulas),
+            "salas": instancia.n_salas,
+            "dias": instancia.n_dias,
+            "horarios": instancia.n_horarios,
+        },
+        "construcao": medir_construcao(aulas, instancia, args.repeticoes, rng, args.alpha, construcao),
+        "busca_local": medir_busca_local(aulas, instancia, args.repeticoes, args.tentativas, rng),
+        "avaliacao_lote": medir_avaliacao_lote(aulas, instancia, args.repeticoes, rng),
+        "grasp": medir_grasp(aulas, instancia, args.iteracoes, args.semente, args.processos, args.alpha,
+                             args.reativo, args.elite, args.busca_local, construcao),
+        "convergencia": medir_convergencia(aulas, instancia, args.iteracoes, rng, args.alpha, construcao),
+    }
+
+    if args.comparar_construcoes:
+        resultado["construcoes"] = comparar_construcoes(aulas, instancia, args.repeticoes, args.iteracoes,
+                                                        args.semente, args.alpha)
+    if args.comparar_buscas:
+        resultado["buscas_locais"] = comparar_buscas_locais(aulas, instancia, args.comparar_buscas,
+                                                            args.semente, args.alpha)
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    else:
+        json.dump(resultado, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(executar())
@@ -1,21 +1,39 @@
 import random
 import os
+import argparse
 import csv
+import glob
+import hashlib
+import json
+import marshal
+import math
 import re
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import compress
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import sys
+import time
+import zlib
+from concurrent.futures import as_completed
+from contextlib import redirect_stdout
 from datetime import datetime
 
-# Para gerar PDF (instalar com: pip install reportlab)
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+# reportlab (pip install reportlab) só é importado dentro de gerar_pdf_agenda,
+# e o NumPy (opcional) na primeira MatrizCustos (obter_numpy), para que
+# execuções sem PDF ou sem busca em lote não paguem o custo da importação.
 
 # =========================
 # Modelagem das entidades
 # =========================
 
+# __slots__: sem __dict__ por objeto; agendas e listas de aulas de vários
+# semestres ficam em memória no serviço de agendamento.
+
 class Sala:
+    __slots__ = ("nome", "capacidade", "prioridade")
+
     def __init__(self, nome, capacidade, prioridade=0):
         self.nome = nome
         self.capacidade = capacidade
@@ -23,6 +41,8 @@ class Sala:
         self.prioridade = prioridade  
 
 class Aula:
+    __slots__ = ("disciplina", "professor", "alunos", "dia", "horario")
+
     def __init__(self, disciplina="", professor="", alunos=0, dia=None, horario=None):
         self.disciplina = disciplina
         self.professor = professor
@@ -32,10 +52,88 @@ class Aula:
         self.horario = horario
 
 class SlotAgenda:
+    __slots__ = ("ocupado", "aula")
+
     def __init__(self):
         self.ocupado = 0
         self.aula = None
 
+class TabelaAulas:
+    """
+    Aulas guardadas em colunas: alunos, dia e horario em array('i')
+    contíguos (-1 = sem dia/horário) e professor/disciplina como índices
+    em tabelas de textos distintos, internados com sys.intern. A aula é
+    identificada pelo inteiro i; tabela[i] monta um objeto Aula só quando
+    necessário (cada chamada cria um objeto novo).
+    """
+    COLUNAS = ("professor", "disciplina", "alunos", "dia", "horario")
+
+    def __init__(self, aulas=()):
+        self.professores = []
+        self.disciplinas = []
+        self._ids_professor = {}
+        self._ids_disciplina = {}
+        for nome in self.COLUNAS:
+            setattr(self, nome, array('i'))
+        for aula in aulas:
+            self.adicionar(aula.disciplina, aula.professor, aula.alunos, aula.dia, aula.horario)
+
+    @classmethod
+    def de_colunas(cls, professores, disciplinas, colunas):
+        """
+        Monta a tabela a partir das tabelas de textos e das cinco colunas
+        (na ordem de COLUNAS), como gravadas no cache de aulas.
+        """
+        tabela = cls()
+        tabela.professores = [sys.intern(texto) for texto in professores]
+        tabela.disciplinas = [sys.intern(texto) for texto in disciplinas]
+        tabela._ids_professor = {texto: i for i, texto in enumerate(tabela.professores)}
+        tabela._ids_disciplina = {texto: i for i, texto in enumerate(tabela.disciplinas)}
+        for nome, coluna in zip(cls.COLUNAS, colunas):
+            setattr(tabela, nome, array('i', coluna))
+        return tabela
+
+    def adicionar(self, disciplina, professor, alunos, dia=None, horario=None):
+        """
+        Acrescenta uma aula e retorna o seu id.
+        """
+        i_professor = self._ids_professor.get(professor)
+        if i_professor is None:
+            i_professor = self._ids_professor[professor] = len(self.professores)
+            self.professores.append(sys.intern(professor))
+        i_disciplina = self._ids_disciplina.get(disciplina)
+        if i_disciplina is None:
+            i_disciplina = self._ids_disciplina[disciplina] = len(self.disciplinas)
+            self.disciplinas.append(sys.intern(disciplina))
+        self.professor.append(i_professor)
+        self.disciplina.append(i_disciplina)
+        self.alunos.append(alunos)
+        self.dia.append(-1 if dia is None else dia)
+        self.horario.append(-1 if horario is None else horario)
+        return len(self.alunos) - 1
+
+    def colunas(self):
+        return tuple(getattr(self, nome) for nome in self.COLUNAS)
+
+    def __len__(self):
+        return len(self.alunos)
+
+    def __getitem__(self, i):
+        dia = self.dia[i]
+        horario = self.horario[i]
+        return Aula(self.disciplinas[self.disciplina[i]], self.professores[self.professor[i]],
+                    self.alunos[i], None if dia < 0 else dia, None if horario < 0 else horario)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def para_aulas(self):
+        """
+        Lista de objetos Aula (ids = posições na lista), com os textos
+        compartilhados entre as aulas.
+        """
+        return list(self)
+
 # =========================
 # Constantes e dados
 # =========================
@@ -44,6 +142,8 @@ MAX_SALAS = 4
 MAX_HORARIOS = 4
 MAX_DIAS = 5
 ALPHA = 0.3  
+ALPHAS_REATIVOS = (0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.7, 0.9)  # candidatos do GRASP reativo
+LIMITE_TABELA_HORARIOS = 1024  # textos de horário guardados por instância (mapear_horario)
 
 salas = [
     Sala("Lab1", 54, prioridade=2),  # mais desejado
@@ -67,11 +167,366 @@ horarios_texto = [
     "15:30 às 17:30",
 ]
 
+# trechos que identificam cada horário na primeira coluna do CSV
+marcadores_horario = [
+    ("8", "10"),
+    ("10", "12"),
+    ("13", "15"),
+    ("15", "17"),
+]
+
+
+# =========================
+# Instância do problema
+# =========================
+
+class Instancia:
+    """
+    Dados de uma instância: salas, dias e horários.
+    marcadores_horario[h] lista os trechos que identificam o horário h no CSV;
+    marcador_professor é o texto da 2ª coluna que indica uma linha de professor.
+    """
+    def __init__(self, salas, dias, horarios, marcadores_horario=None, marcador_professor="Segunda"):
+        self.salas = salas
+        self.dias = dias
+        self.horarios = horarios
+        self.marcadores_horario = [tuple(m) for m in (marcadores_horario or [])]
+        self.marcador_professor = marcador_professor
+        self.n_salas = len(salas)
+        self.n_dias = len(dias)
+        self.n_horarios = len(horarios)
+        self._indice = None
+        # cache texto normalizado -> índice do horário, preenchido por mapear_horario
+        # (no máximo LIMITE_TABELA_HORARIOS textos; o serviço mantém a instância viva)
+        self.tabela_horarios = {}
+
+    @property
+    def indice(self):
+        """
+        IndiceSalas desta instância, construído na primeira utilização.
+        """
+        if self._indice is None:
+            self._indice = IndiceSalas(self)
+        return self._indice
+
+
+# instância original: 4 laboratórios, 5 dias, 4 horários
+INSTANCIA_PADRAO = Instancia(salas, dias_semana, horarios_texto, marcadores_horario)
+
+
+# =========================
+# Índice de salas por capacidade e máscaras de ocupação
+# =========================
+
+def contar_bits(mascara):
+    return bin(mascara).count("1")
+
+
+def posicoes_bits(mascara):
+    """
+    Posições dos bits ligados da máscara, em ordem crescente.
+    """
+    posicoes = []
+    while mascara:
+        bit_baixo = mascara & -mascara
+        posicoes.append(bit_baixo.bit_length() - 1)
+        mascara ^= bit_baixo
+    return posicoes
+
+
+def n_esimo_bit(mascara, n):
+    """
+    Posição do n-ésimo (a partir de 0) bit ligado da máscara.
+    """
+    for _ in range(n):
+        mascara &= mascara - 1
+    return (mascara & -mascara).bit_length() - 1
+
+
+class IndiceSalas:
+    """
+    Salas ordenadas por (capacidade, -prioridade). O bit k de uma máscara
+    representa a k-ésima sala dessa ordem; para uma aula, as salas viáveis
+    (capacidade suficiente) formam um sufixo encontrado por bisect, e os bits
+    já saem na ordem de custo (sobra, -prioridade) usada na RCL.
+    """
+    def __init__(self, instancia):
+        salas_instancia = instancia.salas
+        self.ordem = sorted(range(instancia.n_salas),
+                            key=lambda s: (salas_instancia[s].capacidade, -salas_instancia[s].prioridade))
+        self.posicao = [0] * instancia.n_salas
+        for k, s_idx in enumerate(self.ordem):
+            self.posicao[s_idx] = k
+        self.capacidades = [salas_instancia[s].capacidade for s in self.ordem]
+        # custo de cada posição para a RCL por valor: -contribuicao_slot, a menos
+        # do termo dos alunos, que é o mesmo para todas as salas de uma aula
+        self.custos = [salas_instancia[s].capacidade * 0.1 - salas_instancia[s].prioridade
+                       for s in self.ordem]
+        self.completa = (1 << instancia.n_salas) - 1
+        self.n_horarios = instancia.n_horarios
+        self.n_slots = instancia.n_dias * instancia.n_horarios
+
+    def mascara_viaveis(self, alunos):
+        """
+        Máscara das salas com capacidade >= alunos.
+        """
+        k = bisect_left(self.capacidades, alunos)
+        return self.completa >> k << k
+
+    def chave(self, dia, horario):
+        return dia * self.n_horarios + horario
+
+    def mascaras_ocupacao(self, agenda, instancia):
+        """
+        Uma máscara de salas ocupadas por (dia, horario), indexada por chave().
+        """
+        if isinstance(agenda, AgendaCompacta):
+            return agenda.mascaras_ocupacao(self)
+        ocupacao = [0] * self.n_slots
+        for s_idx in range(instancia.n_salas):
+            bit = 1 << self.posicao[s_idx]
+            for d in range(instancia.n_dias):
+                for h in range(instancia.n_horarios):
+                    if agenda[s_idx][d][h].ocupado:
+                        ocupacao[d * self.n_horarios + h] |= bit
+        return ocupacao
+
+
+def carregar_instancia(caminho):
+    """
+    Lê uma instância de um arquivo JSON no formato:
+      {"salas": [{"nome": "Lab1", "capacidade": 54, "prioridade": 2}, ...],
+       "dias": ["Segunda-feira", ...],
+       "horarios": [{"texto": "08:00 às 10:00", "marcadores": ["8", "10"]}, ...],
+       "marcador_professor": "Segunda"}
+    """
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        return instancia_de_dict(json.load(arquivo))
+
+
+def instancia_de_dict(dados):
+    """
+    Instancia a partir de um dicionário no formato de carregar_instancia.
+    """
+    salas_instancia = [Sala(s["nome"], int(s["capacidade"]), s.get("prioridade", 0))
+                       for s in dados["salas"]]
+    horarios = [h["texto"] for h in dados["horarios"]]
+    marcadores = [h.get("marcadores", []) for h in dados["horarios"]]
+    return Instancia(salas_instancia, list(dados["dias"]), horarios, marcadores,
+                     dados.get("marcador_professor", "Segunda"))
+
+
+def instancia_para_dict(instancia):
+    """
+    Inverso de instancia_de_dict (serializável em JSON).
+    """
+    return {
+        "salas": [{"nome": s.nome, "capacidade": s.capacidade, "prioridade": s.prioridade}
+                  for s in instancia.salas],
+        "dias": list(instancia.dias),
+        "horarios": [{"texto": texto, "marcadores": list(marcadores)}
+                     for texto, marcadores in zip(instancia.horarios,
+                                                  instancia.marcadores_horario or
+                                                  [()] * instancia.n_horarios)],
+        "marcador_professor": instancia.marcador_professor,
+    }
+
+
+def criar_agenda_vazia(instancia=None):
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+    return [[[SlotAgenda() for _ in range(instancia.n_horarios)]
+             for _ in range(instancia.n_dias)]
+             for _ in range(instancia.n_salas)]
+
+# =========================
+# Agenda compacta (array plano de inteiros)
+# =========================
+
+LIVRE = -1             # slot sem aula
+OCUPADO_SEM_AULA = -2  # slot marcado como ocupado mas ainda sem aula associada
+
+
+class _SlotCompacto:
+    """
+    Visão de um slot de AgendaCompacta com a mesma interface de SlotAgenda
+    (atributos ocupado e aula), lendo e escrevendo direto no array.
+    """
+    __slots__ = ("_agenda", "_pos")
+
+    def __init__(self, agenda, pos):
+        self._agenda = agenda
+        self._pos = pos
+
+    @property
+    def ocupado(self):
+        return 1 if self._agenda.slots[self._pos] != LIVRE else 0
+
+    @ocupado.setter
+    def ocupado(self, valor):
+        slots = self._agenda.slots
+        if not valor:
+            slots[self._pos] = LIVRE
+        elif slots[self._pos] == LIVRE:
+            slots[self._pos] = OCUPADO_SEM_AULA
+
+    @property
+    def aula(self):
+        idx = self._agenda.slots[self._pos]
+        return self._agenda.aulas[idx] if idx >= 0 else None
+
+    @aula.setter
+    def aula(self, aula):
+        slots = self._agenda.slots
+        if aula is not None:
+            slots[self._pos] = self._agenda.indice_aula(aula)
+        elif slots[self._pos] >= 0:
+            slots[self._pos] = OCUPADO_SEM_AULA
+
+
+class _VisaoDia:
+    __slots__ = ("_agenda", "_base")
+
+    def __init__(self, agenda, base):
+        self._agenda = agenda
+        self._base = base
+
+    def __getitem__(self, h):
+        return _SlotCompacto(self._agenda, self._base + h)
+
+
+class _VisaoSala:
+    __slots__ = ("_agenda", "_sala")
+
+    def __init__(self, agenda, sala):
+        self._agenda = agenda
+        self._sala = sala
+
+    def __getitem__(self, d):
+        agenda = self._agenda
+        return _VisaoDia(agenda, (self._sala * agenda.n_dias + d) * agenda.n_horarios)
+
+
+class AgendaCompacta:
+    """
+    Agenda guardada em um único array('i') indexado por (sala, dia, horario).
+    Cada posição contém o índice da aula em self.aulas, ou LIVRE (-1).
+    agenda[s][d][h] devolve uma visão com .ocupado e .aula, então as funções
+    escritas para a agenda de SlotAgenda funcionam sem alteração; as visões
+    ficam para quem está fora do GRASP (PDF, resolver_exato, ...).
+    Construção, busca local e avaliação usam os métodos abaixo, que indexam
+    self.slots direto. Clonar é uma única cópia do buffer.
+    """
+    def __init__(self, aulas=None, instancia=None):
+        if instancia is None:
+            instancia = INSTANCIA_PADRAO
+        self.instancia = instancia
+        self.n_salas = instancia.n_salas
+        self.n_dias = instancia.n_dias
+        self.n_horarios = instancia.n_horarios
+        self.aulas = list(aulas) if aulas is not None else []
+        self._indices = {id(a): i for i, a in enumerate(self.aulas)}
+        self._alunos = None
+        self.slots = array('i', [LIVRE]) * (self.n_salas * self.n_dias * self.n_horarios)
+
+    def __len__(self):
+        return self.n_salas
+
+    def __getitem__(self, s):
+        return _VisaoSala(self, s)
+
+    def posicao(self, s, d, h):
+        return (s * self.n_dias + d) * self.n_horarios + h
+
+    def indice_aula(self, aula):
+        """
+        Índice da aula em self.aulas; aulas novas são registradas no fim.
+        """
+        idx = self._indices.get(id(aula))
+        if idx is None:
+            idx = len(self.aulas)
+            self.aulas.append(aula)
+            self._indices[id(aula)] = idx
+        return idx
+
+    def aula_em(self, s, d, h):
+        idx = self.slots[(s * self.n_dias + d) * self.n_horarios + h]
+        return self.aulas[idx] if idx >= 0 else None
+
+    def alocar(self, s, d, h, aula):
+        self.slots[(s * self.n_dias + d) * self.n_horarios + h] = self.indice_aula(aula)
+
+    def trocar(self, s1, s2, d, h):
+        slots = self.slots
+        p1 = (s1 * self.n_dias + d) * self.n_horarios + h
+        p2 = (s2 * self.n_dias + d) * self.n_horarios + h
+        slots[p1], slots[p2] = slots[p2], slots[p1]
+
+    def mover(self, s_origem, s_destino, d, h):
+        slots = self.slots
+        origem = (s_origem * self.n_dias + d) * self.n_horarios + h
+        slots[(s_destino * self.n_dias + d) * self.n_horarios + h] = slots[origem]
+        slots[origem] = LIVRE
+
+    def coluna(self, d, h):
+        """
+        Conteúdo de (d, h) em todas as salas, em ordem de sala (fatia do array).
+        """
+        return self.slots[d * self.n_horarios + h::self.n_dias * self.n_horarios]
+
+    def mascaras_ocupacao(self, indice):
+        """
+        Mesmo resultado de IndiceSalas.mascaras_ocupacao: o deslocamento de
+        um slot dentro do bloco da sala já é a chave (dia, horario).
+        """
+        bloco = self.n_dias * self.n_horarios
+        ocupacao = [0] * bloco
+        slots = self.slots
+        for s_idx in range(self.n_salas):
+            bit = 1 << indice.posicao[s_idx]
+            inicio = s_idx * bloco
+            for chave in compress(range(bloco), map(LIVRE.__ne__, slots[inicio:inicio + bloco])):
+                ocupacao[chave] |= bit
+        return ocupacao
+
+    def limpar(self):
+        self.slots = array('i', [LIVRE]) * len(self.slots)
+
+    def clonar(self):
+        nova = AgendaCompacta.__new__(AgendaCompacta)
+        nova.instancia = self.instancia
+        nova.n_salas = self.n_salas
+        nova.n_dias = self.n_dias
+        nova.n_horarios = self.n_horarios
+        # a tabela de aulas só cresce, então pode ser compartilhada
+        nova.aulas = self.aulas
+        nova._indices = self._indices
+        nova._alunos = self._alunos
+        nova.slots = array('i', self.slots)
+        return nova
+
+    def avaliar(self):
+        """
+        Mesmo critério de avaliar_agenda. Por sala, o score é
+        n_aulas * (prioridade - 0.1 * capacidade) + 0.1 * soma dos alunos;
+        contagem e soma saem do array sem laço em Python por slot.
+        """
+        alunos = self._alunos
+        if alunos is None or len(alunos) != len(self.aulas) + 2:
+            # índices LIVRE (-1) e OCUPADO_SEM_AULA (-2) caem nos dois zeros do fim
+            alunos = self._alunos = [aula.alunos for aula in self.aulas] + [0, 0]
+        score = 0
+        bloco = self.n_dias * self.n_horarios
+        slots = self.slots
+        for s_idx, sala in enumerate(self.instancia.salas):
+            inicio = s_idx * bloco
+            parte = slots[inicio:inicio + bloco]
+            n_aulas = bloco - parte.count(LIVRE) - parte.count(OCUPADO_SEM_AULA)
+            if n_aulas:
+                score += n_aulas * (sala.prioridade - sala.capacidade * 0.1)
+                score += sum(map(alunos.__getitem__, parte)) * 0.1
+        return score
 
-def criar_agenda_vazia():
-    return [[[SlotAgenda() for _ in range(MAX_HORARIOS)]
-             for _ in range(MAX_DIAS)]
-             for _ in range(MAX_SALAS)]
 
 # agenda global usada no modo manual (mantida por compatibilidade)
 agenda_manual = criar_agenda_vazia()
@@ -81,12 +536,14 @@ agenda_manual = criar_agenda_vazia()
 # Funções básicas (restrições)
 # =========================
 
-def pode_agendar(sala_idx, dia, horario, alunos, agenda):
+def pode_agendar(sala_idx, dia, horario, alunos, agenda, instancia=None):
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
     # conflito de sala
     if agenda[sala_idx][dia][horario].ocupado:
         return False
     # capacidade
-    if salas[sala_idx].capacidade < alunos:
+    if instancia.salas[sala_idx].capacidade < alunos:
         return False
     return True
 
@@ -95,10 +552,15 @@ def pode_agendar(sala_idx, dia, horario, alunos, agenda):
 # Modo manual (igual ao original, só adaptado)
 # =========================
 
-def inicializar_agenda(agenda):
-    for s in range(MAX_SALAS):
-        for d in range(MAX_DIAS):
-            for h in range(MAX_HORARIOS):
+def inicializar_agenda(agenda, instancia=None):
+    if isinstance(agenda, AgendaCompacta):
+        agenda.limpar()
+        return
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+    for s in range(instancia.n_salas):
+        for d in range(instancia.n_dias):
+            for h in range(instancia.n_horarios):
                 agenda[s][d][h].ocupado = 0
                 agenda[s][d][h].aula = None
 
@@ -146,32 +608,36 @@ def agendar_aula_manual():
         print("Erro: entrada inválida.")
 
 
-def mostrar_agenda(agenda):
+def mostrar_agenda(agenda, instancia=None):
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
     print("\n===== AGENDA COMPLETA =====")
-    for s_idx in range(MAX_SALAS):
-        print(f"\n{salas[s_idx].nome}")
-        for d in range(MAX_DIAS):
-            print(f" {dias_semana[d]}:")
-            for h in range(MAX_HORARIOS):
+    for s_idx in range(instancia.n_salas):
+        print(f"\n{instancia.salas[s_idx].nome}")
+        for d in range(instancia.n_dias):
+            print(f" {instancia.dias[d]}:")
+            for h in range(instancia.n_horarios):
                 slot = agenda[s_idx][d][h]
                 if slot.ocupado and slot.aula is not None:
                     a = slot.aula
-                    print(f"  {horarios_texto[h]} -> {a.disciplina} ({a.professor}, {a.alunos} alunos)")
+                    print(f"  {instancia.horarios[h]} -> {a.disciplina} ({a.professor}, {a.alunos} alunos)")
                 else:
-                    print(f"  {horarios_texto[h]} -> Livre")
+                    print(f"  {instancia.horarios[h]} -> Livre")
 
 
-def ver_disponibilidade(agenda):
+def ver_disponibilidade(agenda, instancia=None):
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
     print("\n******* DISPONIBILIDADE *******")
-    for s_idx in range(MAX_SALAS):
-        print(f"\n{salas[s_idx].nome}")
-        for d in range(MAX_DIAS):
+    for s_idx in range(instancia.n_salas):
+        print(f"\n{instancia.salas[s_idx].nome}")
+        for d in range(instancia.n_dias):
             livres_no_dia = []
-            for h in range(MAX_HORARIOS):
+            for h in range(instancia.n_horarios):
                 if agenda[s_idx][d][h].ocupado == 0:
-                    livres_no_dia.append(horarios_texto[h])
+                    livres_no_dia.append(instancia.horarios[h])
             if livres_no_dia:
-                print(f" {dias_semana[d]}:")
+                print(f" {instancia.dias[d]}:")
                 for texto in livres_no_dia:
                     print(f"  {texto}")
 
@@ -180,99 +646,72 @@ def ver_disponibilidade(agenda):
 # Geração de PDF (Agenda/Calendário)
 # =========================
 
-def gerar_pdf_agenda(agenda, nome_arquivo=None, aulas_nao_alocadas=None):
+class RenderizadorPDF:
     """
-    Gera um PDF com a agenda de horários no formato de calendário.
-    Cada sala terá sua própria tabela com dias da semana nas colunas e horários nas linhas.
-    Se houver aulas não alocadas, inclui uma seção adicional listando-as.
+    Monta os PDFs de agenda reaproveitando entre chamadas os estilos de
+    parágrafo e de tabela e o parágrafo "Livre" (idêntico em todas as células
+    vazias). Use obter_renderizador_pdf() para a instância compartilhada.
     """
-    if nome_arquivo is None:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        nome_arquivo = f"agenda_labs_{timestamp}.pdf"
-    
-    # Configurar documento em modo paisagem para melhor visualização
-    doc = SimpleDocTemplate(
-        nome_arquivo,
-        pagesize=landscape(A4),
-        rightMargin=1*cm,
-        leftMargin=1*cm,
-        topMargin=1*cm,
-        bottomMargin=1*cm
-    )
-    
-    elementos = []
-    styles = getSampleStyleSheet()
-    
-    # Estilo para título
-    titulo_style = ParagraphStyle(
-        'TituloAgenda',
-        parent=styles['Heading1'],
-        fontSize=16,
-        alignment=1,  # centralizado
-        spaceAfter=20
-    )
-    
-    # Estilo para nome da sala
-    sala_style = ParagraphStyle(
-        'NomeSala',
-        parent=styles['Heading2'],
-        fontSize=12,
-        alignment=0,
-        spaceAfter=10,
-        textColor=colors.darkblue
-    )
-    
-    # Estilo para células
-    celula_style = ParagraphStyle(
-        'Celula',
-        parent=styles['Normal'],
-        fontSize=8,
-        alignment=1,
-        leading=10
-    )
-    
-    # Título principal
-    data_geracao = datetime.now().strftime("%d/%m/%Y às %H:%M")
-    titulo = Paragraph(f"Agenda de Laboratórios - Gerado em {data_geracao}", titulo_style)
-    elementos.append(titulo)
-    elementos.append(Spacer(1, 0.5*cm))
-    
-    # Para cada sala, criar uma tabela no estilo calendário
-    for s_idx in range(MAX_SALAS):
-        sala = salas[s_idx]
+    def __init__(self):
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4, landscape
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import cm
+        from reportlab.platypus import (SimpleDocTemplate, Table, TableStyle,
+                                        Paragraph, Spacer, PageBreak)
+
+        self.cm = cm
+        self.pagina = landscape(A4)
+        self.SimpleDocTemplate = SimpleDocTemplate
+        self.Table = Table
+        self.Paragraph = Paragraph
+        self.Spacer = Spacer
+        self.PageBreak = PageBreak
+
+        self.styles = getSampleStyleSheet()
         
-        # Nome da sala
-        nome_sala = Paragraph(f"{sala.nome} (Capacidade: {sala.capacidade} alunos)", sala_style)
-        elementos.append(nome_sala)
+        # Estilo para título
+        self.titulo_style = ParagraphStyle(
+            'TituloAgenda',
+            parent=self.styles['Heading1'],
+            fontSize=16,
+            alignment=1,  # centralizado
+            spaceAfter=20
+        )
         
-        # Cabeçalho da tabela: Horário + dias da semana
-        cabecalho = ["Horário"] + [dia[:3] for dia in dias_semana]  # Abreviar dias
+        # Estilo para nome da sala
+        self.sala_style = ParagraphStyle(
+            'NomeSala',
+            parent=self.styles['Heading2'],
+            fontSize=12,
+            alignment=0,
+            spaceAfter=10,
+            textColor=colors.darkblue
+        )
         
-        # Dados da tabela
-        dados_tabela = [cabecalho]
+        # Estilo para células
+        self.celula_style = ParagraphStyle(
+            'Celula',
+            parent=self.styles['Normal'],
+            fontSize=8,
+            alignment=1,
+            leading=10
+        )
         
-        for h in range(MAX_HORARIOS):
-            linha = [horarios_texto[h]]
-            
-            for d in range(MAX_DIAS):
-                slot = agenda[s_idx][d][h]
-                if slot.ocupado and slot.aula is not None:
-                    aula = slot.aula
-                    # Formatar conteúdo da célula
-                    conteudo = f"<b>{aula.disciplina}</b><br/>{aula.professor}<br/>({aula.alunos} alunos)"
-                    celula = Paragraph(conteudo, celula_style)
-                    linha.append(celula)
-                else:
-                    linha.append(Paragraph("<font color='gray'>Livre</font>", celula_style))
-            
-            dados_tabela.append(linha)
+        # Estilo para título da seção de não alocadas
+        self.titulo_nao_alocadas_style = ParagraphStyle(
+            'TituloNaoAlocadas',
+            parent=self.styles['Heading2'],
+            fontSize=14,
+            alignment=0,
+            spaceAfter=10,
+            textColor=colors.HexColor('#C00000')
+        )
         
-        # Criar tabela
-        larguras_colunas = [3.5*cm] + [4.5*cm] * MAX_DIAS
-        tabela = Table(dados_tabela, colWidths=larguras_colunas)
+        # Célula "Livre" compartilhada por todas as tabelas
+        self.celula_livre = Paragraph("<font color='gray'>Livre</font>", self.celula_style)
         
-        # Estilizar tabela
-        estilo_tabela = TableStyle([
+        self.estilo_tabela = TableStyle([
             # Cabeçalho
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -301,64 +740,7 @@ def gerar_pdf_agenda(agenda, nome_arquivo=None, aulas_nao_alocadas=None):
             ('ROWBACKGROUNDS', (1, 1), (-1, -1), [colors.white, colors.HexColor('#F2F2F2')]),
         ])
         
-        tabela.setStyle(estilo_tabela)
-        elementos.append(tabela)
-        elementos.append(Spacer(1, 1*cm))
-    
-    # Seção de aulas não alocadas (se houver)
-    if aulas_nao_alocadas:
-        elementos.append(Spacer(1, 0.5*cm))
-        
-        # Estilo para título da seção de não alocadas
-        titulo_nao_alocadas_style = ParagraphStyle(
-            'TituloNaoAlocadas',
-            parent=styles['Heading2'],
-            fontSize=14,
-            alignment=0,
-            spaceAfter=10,
-            textColor=colors.HexColor('#C00000')
-        )
-        
-        titulo_nao_alocadas = Paragraph("⚠ Aulas Não Alocadas", titulo_nao_alocadas_style)
-        elementos.append(titulo_nao_alocadas)
-        
-        # Texto explicativo
-        texto_explicativo = Paragraph(
-            "As seguintes aulas não puderam ser alocadas devido a conflitos "
-            "de horário ou capacidade insuficiente dos laboratórios:",
-            styles['Normal']
-        )
-        elementos.append(texto_explicativo)
-        elementos.append(Spacer(1, 0.3*cm))
-        
-        # Cabeçalho da tabela de não alocadas
-        cabecalho_nao_alocadas = ["Disciplina", "Professor", "Dia", "Horário", "Alunos"]
-        dados_nao_alocadas = [cabecalho_nao_alocadas]
-        
-        for aula in aulas_nao_alocadas:
-            dia_nome = dias_semana[aula.dia] if aula.dia is not None else "N/A"
-            horario_nome = horarios_texto[aula.horario] if aula.horario is not None else "N/A"
-            linha = [
-                Paragraph(aula.disciplina[:40] + "..." if len(aula.disciplina) > 40 else aula.disciplina, celula_style),
-                aula.professor,
-                dia_nome[:3],
-                horario_nome,
-                str(aula.alunos)
-            ]
-            dados_nao_alocadas.append(linha)
-        
-        # Linha de total
-        dados_nao_alocadas.append([
-            Paragraph(f"<b>Total: {len(aulas_nao_alocadas)} aula(s) não alocada(s)</b>", celula_style),
-            "", "", "", ""
-        ])
-        
-        tabela_nao_alocadas = Table(
-            dados_nao_alocadas,
-            colWidths=[7*cm, 4*cm, 2.5*cm, 4*cm, 2*cm]
-        )
-        
-        estilo_nao_alocadas = TableStyle([
+        self.estilo_nao_alocadas = TableStyle([
             # Cabeçalho
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#C00000')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -374,38 +756,236 @@ def gerar_pdf_agenda(agenda, nome_arquivo=None, aulas_nao_alocadas=None):
             ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
             ('SPAN', (0, -1), (-1, -1)),
         ])
+
+    def elementos_agenda(self, agenda, aulas_nao_alocadas=None, instancia=None, titulo=None):
+        """
+        Lista de flowables de uma agenda: título, uma tabela por sala e,
+        se houver, a seção de aulas não alocadas.
+        """
+        if instancia is None:
+            instancia = INSTANCIA_PADRAO
+        cm = self.cm
+        Paragraph = self.Paragraph
+        Spacer = self.Spacer
+        celula_style = self.celula_style
         
-        tabela_nao_alocadas.setStyle(estilo_nao_alocadas)
-        elementos.append(tabela_nao_alocadas)
-    
-    # Gerar PDF
-    try:
-        doc.build(elementos)
-        caminho_completo = os.path.abspath(nome_arquivo)
-        print(f"\n✓ PDF gerado com sucesso!")
-        print(f"  Arquivo: {caminho_completo}")
-        return caminho_completo
-    except Exception as e:
-        print(f"\n✗ Erro ao gerar PDF: {e}")
+        elementos = []
+        
+        # Título principal
+        if titulo is None:
+            data_geracao = datetime.now().strftime("%d/%m/%Y às %H:%M")
+            titulo = f"Agenda de Laboratórios - Gerado em {data_geracao}"
+        elementos.append(Paragraph(titulo, self.titulo_style))
+        elementos.append(Spacer(1, 0.5*cm))
+        
+        # Cabeçalho da tabela: Horário + dias da semana
+        cabecalho = ["Horário"] + [dia[:3] for dia in instancia.dias]  # Abreviar dias
+        larguras_colunas = [3.5*cm] + [4.5*cm] * instancia.n_dias
+        
+        # Para cada sala, criar uma tabela no estilo calendário
+        for s_idx in range(instancia.n_salas):
+            sala = instancia.salas[s_idx]
+            
+            # Nome da sala
+            nome_sala = Paragraph(f"{sala.nome} (Capacidade: {sala.capacidade} alunos)", self.sala_style)
+            elementos.append(nome_sala)
+            
+            # Dados da tabela
+            dados_tabela = [cabecalho]
+            
+            for h in range(instancia.n_horarios):
+                linha = [instancia.horarios[h]]
+                
+                for d in range(instancia.n_dias):
+                    slot = agenda[s_idx][d][h]
+                    if slot.ocupado and slot.aula is not None:
+                        aula = slot.aula
+                        # Formatar conteúdo da célula
+                        conteudo = f"<b>{aula.disciplina}</b><br/>{aula.professor}<br/>({aula.alunos} alunos)"
+                        linha.append(Paragraph(conteudo, celula_style))
+                    else:
+                        linha.append(self.celula_livre)
+                
+                dados_tabela.append(linha)
+            
+            tabela = self.Table(dados_tabela, colWidths=larguras_colunas)
+            tabela.setStyle(self.estilo_tabela)
+            elementos.append(tabela)
+            elementos.append(Spacer(1, 1*cm))
+        
+        # Seção de aulas não alocadas (se houver)
+        if aulas_nao_alocadas:
+            elementos.append(Spacer(1, 0.5*cm))
+            
+            titulo_nao_alocadas = Paragraph("⚠ Aulas Não Alocadas", self.titulo_nao_alocadas_style)
+            elementos.append(titulo_nao_alocadas)
+            
+            # Texto explicativo
+            texto_explicativo = Paragraph(
+                "As seguintes aulas não puderam ser alocadas devido a conflitos "
+                "de horário ou capacidade insuficiente dos laboratórios:",
+                self.styles['Normal']
+            )
+            elementos.append(texto_explicativo)
+            elementos.append(Spacer(1, 0.3*cm))
+            
+            # Cabeçalho da tabela de não alocadas
+            cabecalho_nao_alocadas = ["Disciplina", "Professor", "Dia", "Horário", "Alunos"]
+            dados_nao_alocadas = [cabecalho_nao_alocadas]
+            
+            for aula in aulas_nao_alocadas:
+                dia_nome = instancia.dias[aula.dia] if aula.dia is not None else "N/A"
+                horario_nome = instancia.horarios[aula.horario] if aula.horario is not None else "N/A"
+                linha = [
+                    Paragraph(aula.disciplina[:40] + "..." if len(aula.disciplina) > 40 else aula.disciplina, celula_style),
+                    aula.professor,
+                    dia_nome[:3],
+                    horario_nome,
+                    str(aula.alunos)
+                ]
+                dados_nao_alocadas.append(linha)
+            
+            # Linha de total
+            dados_nao_alocadas.append([
+                Paragraph(f"<b>Total: {len(aulas_nao_alocadas)} aula(s) não alocada(s)</b>", celula_style),
+                "", "", "", ""
+            ])
+            
+            tabela_nao_alocadas = self.Table(
+                dados_nao_alocadas,
+                colWidths=[7*cm, 4*cm, 2.5*cm, 4*cm, 2*cm]
+            )
+            tabela_nao_alocadas.setStyle(self.estilo_nao_alocadas)
+            elementos.append(tabela_nao_alocadas)
+        
+        return elementos
+
+    def construir(self, nome_arquivo, elementos):
+        # Documento em modo paisagem para melhor visualização
+        cm = self.cm
+        doc = self.SimpleDocTemplate(
+            nome_arquivo,
+            pagesize=self.pagina,
+            rightMargin=1*cm,
+            leftMargin=1*cm,
+            topMargin=1*cm,
+            bottomMargin=1*cm
+        )
+        try:
+            doc.build(elementos)
+            caminho_completo = os.path.abspath(nome_arquivo)
+            print(f"\n✓ PDF gerado com sucesso!")
+            print(f"  Arquivo: {caminho_completo}")
+            return caminho_completo
+        except Exception as e:
+            print(f"\n✗ Erro ao gerar PDF: {e}")
+            return None
+
+
+_renderizador_pdf = None
+_executor_pdf = None
+
+
+def obter_renderizador_pdf():
+    """
+    RenderizadorPDF compartilhado; None se o reportlab não estiver instalado.
+    """
+    global _renderizador_pdf
+    if _renderizador_pdf is None:
+        try:
+            _renderizador_pdf = RenderizadorPDF()
+        except ImportError:
+            print("\n✗ Erro ao gerar PDF: instale a biblioteca reportlab (pip install reportlab).")
+            return None
+    return _renderizador_pdf
+
+
+def gerar_pdf_agenda(agenda, nome_arquivo=None, aulas_nao_alocadas=None, instancia=None, titulo=None):
+    """
+    Gera um PDF com a agenda de horários no formato de calendário.
+    Cada sala terá sua própria tabela com dias da semana nas colunas e horários nas linhas.
+    Se houver aulas não alocadas, inclui uma seção adicional listando-as.
+    """
+    renderizador = obter_renderizador_pdf()
+    if renderizador is None:
         return None
+    
+    if nome_arquivo is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        nome_arquivo = f"agenda_labs_{timestamp}.pdf"
+    
+    elementos = renderizador.elementos_agenda(agenda, aulas_nao_alocadas, instancia, titulo)
+    return renderizador.construir(nome_arquivo, elementos)
+
+
+def gerar_pdfs_lote(trabalhos, arquivo_unico=None):
+    """
+    Gera vários PDFs de uma vez com o mesmo renderizador. Cada trabalho é um
+    dict com as chaves de gerar_pdf_agenda (agenda, nome_arquivo,
+    aulas_nao_alocadas, instancia, titulo). Com arquivo_unico, todas as
+    agendas vão para um só PDF, uma após a outra em páginas separadas.
+    Retorna a lista de caminhos gerados (None nos que falharam).
+    """
+    renderizador = obter_renderizador_pdf()
+    if renderizador is None:
+        return [None] * (1 if arquivo_unico else len(trabalhos))
+    
+    if arquivo_unico:
+        elementos = []
+        for trabalho in trabalhos:
+            if elementos:
+                elementos.append(renderizador.PageBreak())
+            elementos.extend(renderizador.elementos_agenda(
+                trabalho["agenda"], trabalho.get("aulas_nao_alocadas"),
+                trabalho.get("instancia"), trabalho.get("titulo")))
+        return [renderizador.construir(arquivo_unico, elementos)]
+    
+    return [gerar_pdf_agenda(**trabalho) for trabalho in trabalhos]
+
+
+def gerar_pdf_em_segundo_plano(agenda, nome_arquivo=None, aulas_nao_alocadas=None, instancia=None, titulo=None):
+    """
+    Agenda a geração do PDF em uma thread de trabalho e retorna um Future com
+    o caminho gerado. Os PDFs são escritos em ordem, um de cada vez; a agenda
+    não deve ser alterada até o Future concluir.
+    """
+    global _executor_pdf
+    if _executor_pdf is None:
+        _executor_pdf = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf")
+    return _executor_pdf.submit(gerar_pdf_agenda, agenda, nome_arquivo,
+                                aulas_nao_alocadas, instancia, titulo)
+
+
+def aguardar_pdfs():
+    """
+    Espera os PDFs pendentes em segundo plano terminarem.
+    """
+    global _executor_pdf
+    if _executor_pdf is not None:
+        _executor_pdf.shutdown(wait=True)
+        _executor_pdf = None
 
 
 # =========================
 # GRASP: construção + busca local
 # =========================
 
-def avaliar_agenda(agenda):
+def avaliar_agenda(agenda, instancia=None):
     """
     Mede a qualidade da agenda com critérios simples:
       - prefere salas de maior prioridade
       - prefere menor sobra de capacidade (encaixe melhor)
     Não há penalização de violação: violações simplesmente não são aceitas.
     """
+    if isinstance(agenda, AgendaCompacta):
+        return agenda.avaliar()
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
     score = 0
-    for s_idx in range(MAX_SALAS):
-        sala = salas[s_idx]
-        for d in range(MAX_DIAS):
-            for h in range(MAX_HORARIOS):
+    for s_idx in range(instancia.n_salas):
+        sala = instancia.salas[s_idx]
+        for d in range(instancia.n_dias):
+            for h in range(instancia.n_horarios):
                 slot = agenda[s_idx][d][h]
                 if slot.ocupado and slot.aula is not None:
                     alunos = slot.aula.alunos
@@ -415,247 +995,2689 @@ def avaliar_agenda(agenda):
     return score
 
 
-def construir_solucao_grasp(aulas):
+# =========================
+# Avaliação incremental (delta de score)
+# =========================
+
+TOLERANCIA_SCORE = 1e-6
+
+def contribuicao_slot(sala_idx, aula, instancia=None):
     """
-    Fase construtiva:
-      - percorre a lista de aulas
-      - gera todos os slots viáveis (respeitando restrições duras)
-      - monta RCL com base em custo (sobra, prioridade de sala)
-      - escolhe aleatório da RCL
-    Retorna: tupla (agenda, aulas_nao_alocadas)
+    Parcela de avaliar_agenda referente a uma aula alocada na sala sala_idx.
     """
-    agenda = criar_agenda_vazia()
-    aulas_nao_alocadas = []  # Lista para rastrear aulas não alocadas
+    sala = (instancia or INSTANCIA_PADRAO).salas[sala_idx]
+    return sala.prioridade - (sala.capacidade - aula.alunos) * 0.1
 
-    for aula in aulas:
-        candidatos = []
-        dia = aula.dia
-        horario = aula.horario
 
-        for s_idx in range(MAX_SALAS):
-            if pode_agendar(s_idx, dia, horario, aula.alunos, agenda):
-                sobra = salas[s_idx].capacidade - aula.alunos
-                # custo menor = melhor (sobra pequena e sala prioritária)
-                custo = (sobra, -salas[s_idx].prioridade)
-                candidatos.append((custo, s_idx, dia, horario))
+def aplicar_troca(agenda, s1, s2, d, h):
+    """
+    Troca, no próprio objeto agenda, as aulas das salas s1 e s2 em (d, h).
+    """
+    if isinstance(agenda, AgendaCompacta):
+        agenda.trocar(s1, s2, d, h)
+        return
+    slot1 = agenda[s1][d][h]
+    slot2 = agenda[s2][d][h]
+    slot1.aula, slot2.aula = slot2.aula, slot1.aula
+    slot1.ocupado, slot2.ocupado = slot2.ocupado, slot1.ocupado
 
-        if not candidatos:
-            # Não conseguiu alocar essa aula - adicionar à lista de não alocadas
-            aulas_nao_alocadas.append(aula)
-            continue
 
-        candidatos.sort(key=lambda x: x[0])
-        limite = max(1, int(len(candidatos) * ALPHA))
-        rcl = candidatos[:limite]
-        _, sala_escolhida, d, h = random.choice(rcl)
+def aplicar_movimento(agenda, s_origem, s_destino, d, h):
+    """
+    Move, no próprio objeto agenda, a aula de s_origem para s_destino em (d, h).
+    """
+    if isinstance(agenda, AgendaCompacta):
+        agenda.mover(s_origem, s_destino, d, h)
+        return
+    origem = agenda[s_origem][d][h]
+    destino = agenda[s_destino][d][h]
+    destino.ocupado = 1
+    destino.aula = origem.aula
+    origem.ocupado = 0
+    origem.aula = None
 
-        slot = agenda[sala_escolhida][d][h]
-        slot.ocupado = 1
-        slot.aula = aula
 
-    return agenda, aulas_nao_alocadas
+class AvaliadorIncremental:
+    """
+    Mantém o score corrente de uma agenda e calcula a variação (delta) de cada
+    movimento olhando apenas os slots envolvidos, sem varrer a agenda inteira.
+    Os deltas são calculados antes de aplicar o movimento; com verificar=True,
+    cada delta registrado (após aplicar) é conferido contra avaliar_agenda.
+    """
+    def __init__(self, agenda, verificar=False, instancia=None):
+        self.agenda = agenda
+        self.instancia = instancia or INSTANCIA_PADRAO
+        self.score = avaliar_agenda(agenda, self.instancia)
+        self.verificar = verificar
+        # aula_em(s, d, h): leitura direta do array na AgendaCompacta
+        self.aula_em = agenda.aula_em if isinstance(agenda, AgendaCompacta) else self._aula_em
 
+    def _aula_em(self, s, d, h):
+        return self.agenda[s][d][h].aula
 
-def clonar_agenda(agenda):
-    nova = criar_agenda_vazia()
-    for s in range(MAX_SALAS):
-        for d in range(MAX_DIAS):
-            for h in range(MAX_HORARIOS):
-                if agenda[s][d][h].ocupado:
-                    nova[s][d][h].ocupado = 1
-                    nova[s][d][h].aula = agenda[s][d][h].aula
-    return nova
+    def delta_troca(self, s1, s2, d, h):
+        # troca as aulas das salas s1 e s2 no mesmo dia/horário
+        aula1 = self.aula_em(s1, d, h)
+        aula2 = self.aula_em(s2, d, h)
+        inst = self.instancia
+        antes = contribuicao_slot(s1, aula1, inst) + contribuicao_slot(s2, aula2, inst)
+        depois = contribuicao_slot(s1, aula2, inst) + contribuicao_slot(s2, aula1, inst)
+        return depois - antes
+
+    def delta_mover(self, s_origem, s_destino, d, h):
+        # move a aula de s_origem para s_destino (livre) no mesmo dia/horário
+        aula = self.aula_em(s_origem, d, h)
+        inst = self.instancia
+        return contribuicao_slot(s_destino, aula, inst) - contribuicao_slot(s_origem, aula, inst)
+
+    def registrar(self, delta):
+        """
+        Atualiza o score corrente após um movimento aceito.
+        """
+        self.score += delta
+        if self.verificar:
+            score_completo = avaliar_agenda(self.agenda, self.instancia)
+            assert abs(self.score - score_completo) < TOLERANCIA_SCORE, (
+                f"delta inconsistente: incremental={self.score}, completo={score_completo}"
+            )
 
 
-def buscar_melhora_local(agenda, max_tentativas=100):
+# =========================
+# Instrumentação do GRASP
+# =========================
+
+class EstatisticasGrasp:
     """
-    Busca local simples:
-      - escolhe aleatoriamente um dia/horário
-      - tenta trocar aulas entre salas ou mover para sala livre
-      - aceita apenas movimentos que melhoram o score e respeitam as restrições
+    Métricas opcionais de uma execução do grasp(): tempo por fase, contagem
+    de movimentos da busca local e evolução das soluções por iteração.
+    Só é preenchida quando passada a grasp(estatisticas=...).
     """
-    melhor_agenda = clonar_agenda(agenda)
-    melhor_score = avaliar_agenda(melhor_agenda)
+    FASES = ("construcao", "busca_local", "avaliacao", "religamento", "clonagem")
 
-    for _ in range(max_tentativas):
-        d = random.randrange(MAX_DIAS)
-        h = random.randrange(MAX_HORARIOS)
+    def __init__(self):
+        self.tempos = dict.fromkeys(self.FASES, 0.0)  # segundos por fase
+        self.iteracoes = 0
+        self.movimentos_tentados = 0
+        self.movimentos_viaveis = 0   # respeitam capacidade (chegaram a ser avaliados)
+        self.movimentos_aceitos = 0
+        self.melhorias = []           # (iteracao, score) de cada novo melhor global
+        self.scores = []              # score de cada iteração
+        self.nao_alocadas = []        # aulas não alocadas em cada iteração
 
-        ocupadas = [s for s in range(MAX_SALAS) if melhor_agenda[s][d][h].ocupado]
-        livres = [s for s in range(MAX_SALAS) if not melhor_agenda[s][d][h].ocupado]
+    def registrar_movimentos(self, tentados, viaveis, aceitos):
+        self.movimentos_tentados += tentados
+        self.movimentos_viaveis += viaveis
+        self.movimentos_aceitos += aceitos
 
-        # movimento 1: troca entre duas salas ocupadas
-        if len(ocupadas) >= 2:
-            s1, s2 = random.sample(ocupadas, 2)
-            nova = clonar_agenda(melhor_agenda)
+    def combinar(self, outra, deslocamento=0):
+        """
+        Soma as métricas de outra execução (ex.: de um processo do pool);
+        deslocamento é somado aos números de iteração dela. As melhorias
+        combinadas são as de cada execução, não as do melhor global.
+        """
+        for fase, tempo in outra.tempos.items():
+            self.tempos[fase] = self.tempos.get(fase, 0.0) + tempo
+        self.iteracoes += outra.iteracoes
+        self.registrar_movimentos(outra.movimentos_tentados, outra.movimentos_viaveis,
+                                  outra.movimentos_aceitos)
+        self.melhorias.extend((i + deslocamento, score) for i, score in outra.melhorias)
+        self.scores.extend(outra.scores)
+        self.nao_alocadas.extend(outra.nao_alocadas)
 
-            aula1 = nova[s1][d][h].aula
-            aula2 = nova[s2][d][h].aula
+    def resumo(self):
+        return {
+            "iteracoes": self.iteracoes,
+            "tempos_s": dict(self.tempos),
+            "movimentos": {
+                "tentados": self.movimentos_tentados,
+                "viaveis": self.movimentos_viaveis,
+                "aceitos": self.movimentos_aceitos,
+            },
+            "melhorias": [{"iteracao": i, "score": score} for i, score in self.melhorias],
+            "nao_alocadas_por_iteracao": list(self.nao_alocadas),
+        }
 
-            if (salas[s1].capacidade >= aula2.alunos and
-                salas[s2].capacidade >= aula1.alunos):
+    def imprimir(self):
+        print("\n===== ESTATÍSTICAS DO GRASP =====")
+        print(f"Iterações: {self.iteracoes}")
+        for fase, tempo in self.tempos.items():
+            print(f"  {fase:<12} {tempo:.4f} s")
+        print(f"Movimentos: {self.movimentos_tentados} tentados, "
+              f"{self.movimentos_viaveis} viáveis, {self.movimentos_aceitos} aceitos")
+        for i, score in self.melhorias:
+            print(f"  novo melhor na iteração {i}: {score:.2f}")
 
-                nova[s1][d][h].aula, nova[s2][d][h].aula = aula2, aula1
 
-                score = avaliar_agenda(nova)
-                if score > melhor_score:
-                    melhor_agenda = nova
-                    melhor_score = score
-                    continue
+class AlphaReativo:
+    """
+    GRASP reativo: em vez de um ALPHA fixo, sorteia o alpha de cada iteração
+    entre candidatos, com probabilidades reajustadas a cada `periodo`
+    iterações pela qualidade média das soluções que cada um produziu.
+    Como o score pode ser negativo, as médias são normalizadas entre o pior
+    e o melhor score já vistos: q = (0.01 + (media - pior) / (melhor - pior)) ** delta.
+    Candidatos ainda não usados recebem o maior q, para serem experimentados.
+    """
 
-        # movimento 2: mover aula de sala ocupada para sala livre
-        if ocupadas and livres:
-            s_ocup = random.choice(ocupadas)
-            s_livre = random.choice(livres)
-            nova = clonar_agenda(melhor_agenda)
+    def __init__(self, alphas=ALPHAS_REATIVOS, periodo=10, delta=2.0):
+        self.alphas = tuple(alphas)
+        self.periodo = periodo
+        self.delta = delta
+        self.probabilidades = [1.0 / len(self.alphas)] * len(self.alphas)
+        self.usos = [0] * len(self.alphas)
+        self.somas = [0.0] * len(self.alphas)
+        self.melhor = float("-inf")
+        self.pior = float("inf")
+        self.registros = 0
+        self._ultimo = None
 
-            aula = nova[s_ocup][d][h].aula
-            if salas[s_livre].capacidade >= aula.alunos:
-                nova[s_livre][d][h].ocupado = 1
-                nova[s_livre][d][h].aula = aula
+    def novo(self):
+        """
+        Cópia zerada com os mesmos parâmetros (ex.: para cada processo do pool).
+        """
+        return AlphaReativo(self.alphas, self.periodo, self.delta)
 
-                nova[s_ocup][d][h].ocupado = 0
-                nova[s_ocup][d][h].aula = None
+    def sortear(self, rng=random):
+        self._ultimo = rng.choices(range(len(self.alphas)), self.probabilidades)[0]
+        return self.alphas[self._ultimo]
 
-                score = avaliar_agenda(nova)
-                if score > melhor_score:
-                    melhor_agenda = nova
-                    melhor_score = score
-                    continue
+    def registrar(self, score):
+        """
+        Associa o score da iteração ao último alpha sorteado.
+        """
+        i = self._ultimo
+        self.usos[i] += 1
+        self.somas[i] += score
+        self.melhor = max(self.melhor, score)
+        self.pior = min(self.pior, score)
+        self.registros += 1
+        if self.registros % self.periodo == 0:
+            self.atualizar()
 
-    return melhor_agenda, melhor_score
+    def atualizar(self):
+        amplitude = self.melhor - self.pior
+        q = []
+        for usos, soma in zip(self.usos, self.somas):
+            if not usos:
+                q.append(None)
+                continue
+            relativo = (soma / usos - self.pior) / amplitude if amplitude > 0 else 1.0
+            q.append((0.01 + relativo) ** self.delta)
+        maior = max((v for v in q if v is not None), default=1.0)
+        q = [maior if v is None else v for v in q]
+        total = sum(q)
+        self.probabilidades = [v / total for v in q]
 
+    def combinar(self, outro):
+        """
+        Soma o aprendizado de outra execução e recalcula as probabilidades.
+        """
+        for i in range(len(self.alphas)):
+            self.usos[i] += outro.usos[i]
+            self.somas[i] += outro.somas[i]
+        self.melhor = max(self.melhor, outro.melhor)
+        self.pior = min(self.pior, outro.pior)
+        self.registros += outro.registros
+        if self.registros:
+            self.atualizar()
 
-def grasp(aulas, iteracoes=20):
+    def relatorio(self):
+        return [{"alpha": alpha, "probabilidade": p, "usos": usos,
+                 "score_medio": soma / usos if usos else None}
+                for alpha, p, usos, soma in zip(self.alphas, self.probabilidades, self.usos, self.somas)]
+
+    def imprimir(self):
+        print("\n===== GRASP REATIVO: DISTRIBUIÇÃO DE ALPHA =====")
+        for linha in self.relatorio():
+            media = "-" if linha["score_medio"] is None else f"{linha['score_medio']:.2f}"
+            print(f"  alpha {linha['alpha']:.2f}: p={linha['probabilidade']:.3f} "
+                  f"| usos {linha['usos']:>4} | score médio {media}")
+
+
+class EstrategiaConstrucao:
+    """
+    Como construir_solucao_grasp percorre as aulas e escolhe a sala:
+      - ordem: "csv" (ordem de leitura) ou "dificuldade" (menos salas
+        viáveis primeiro e, no empate, mais alunos primeiro);
+      - rcl: "cardinalidade" (as max(1, int(alpha * k)) primeiras das k
+        salas viáveis, na ordem de custo do IndiceSalas) ou "valor" (as
+        salas de custo até c_min + alpha * (c_max - c_min), custo =
+        -contribuicao_slot);
+      - vies: peso da sala de posição r (1, 2, ...) na RCL no sorteio:
+        uniforme, linear (1/r), log (1/log(r + 1)), exponencial (e^-r) ou
+        polinomial (1/r^2).
+    O padrão (csv, cardinalidade, uniforme) é a construção original, com
+    a mesma sequência de sorteios.
+    """
+    ORDENS = ("csv", "dificuldade")
+    RCLS = ("cardinalidade", "valor")
+    VIESES = {
+        "uniforme": lambda r: 1.0,
+        "linear": lambda r: 1.0 / r,
+        "log": lambda r: 1.0 / math.log(r + 1),
+        "exponencial": lambda r: math.exp(-r),
+        "polinomial": lambda r: r ** -2.0,
+    }
+
+    def __init__(self, ordem="csv", rcl="cardinalidade", vies="uniforme"):
+        for valor, opcoes, nome in ((ordem, self.ORDENS, "ordem"), (rcl, self.RCLS, "rcl"),
+                                    (vies, tuple(self.VIESES), "vies")):
+            if valor not in opcoes:
+                raise ValueError(f"{nome} de construção desconhecida: {valor!r} "
+                                 f"(opções: {', '.join(opcoes)})")
+        self.ordem = ordem
+        self.rcl = rcl
+        self.vies = vies
+        self._acumulados = {}  # tamanho da RCL -> pesos acumulados do viés
+
+    @property
+    def nome(self):
+        return f"{self.ordem}/{self.rcl}/{self.vies}"
+
+    def ordenar(self, aulas, indice):
+        if self.ordem == "csv":
+            return aulas
+        return sorted(aulas, key=lambda aula: (contar_bits(indice.mascara_viaveis(aula.alunos)),
+                                               -aula.alunos))
+
+    def escolher(self, candidatos, alpha, rng, indice):
+        """
+        Posição (bit) da sala sorteada entre as candidatas.
+        """
+        if self.rcl == "cardinalidade":
+            limite = max(1, int(contar_bits(candidatos) * alpha))
+            if self.vies == "uniforme":
+                return n_esimo_bit(candidatos, rng.randrange(limite))
+            rcl = posicoes_bits(candidatos)[:limite]
+        else:
+            custos = indice.custos
+            posicoes = posicoes_bits(candidatos)
+            minimo = min(custos[p] for p in posicoes)
+            maximo = max(custos[p] for p in posicoes)
+            corte = minimo + alpha * (maximo - minimo) + TOLERANCIA_SCORE
+            rcl = sorted((p for p in posicoes if custos[p] <= corte), key=custos.__getitem__)
+            if self.vies == "uniforme":
+                return rcl[rng.randrange(len(rcl))]
+        acumulados = self._acumulados.get(len(rcl))
+        if acumulados is None:
+            peso = self.VIESES[self.vies]
+            acumulados, total = [], 0.0
+            for r in range(1, len(rcl) + 1):
+                total += peso(r)
+                acumulados.append(total)
+            self._acumulados[len(rcl)] = acumulados
+        return rcl[min(bisect_left(acumulados, rng.random() * acumulados[-1]), len(rcl) - 1)]
+
+
+def construir_solucao_grasp(aulas, agenda=None, rng=random, instancia=None, alpha=None, reiniciar=True,
+                            estrategia=None):
+    """
+    Fase construtiva:
+      - percorre a lista de aulas
+      - obtém as salas viáveis pelo IndiceSalas (bisect por capacidade e
+        máscara de ocupação do dia/horário), já ordenadas por custo
+      - monta RCL com base em custo (sobra, prioridade de sala)
+      - escolhe aleatório da RCL
+    Se agenda for informada, ela é esvaziada e reaproveitada; com
+    reiniciar=False, as aulas já alocadas nela são mantidas e as novas
+    ocupam apenas as salas livres.
+    rng: gerador aleatório (módulo random ou uma instância random.Random).
+    alpha: tamanho relativo da RCL (padrão: ALPHA).
+    estrategia: EstrategiaConstrucao com a ordem das aulas, o tipo de RCL e
+    o viés do sorteio (padrão: ordem do CSV, RCL por cardinalidade, sorteio
+    uniforme).
+    Retorna: tupla (agenda, aulas_nao_alocadas)
+    """
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+    if alpha is None:
+        alpha = ALPHA
+    if estrategia is None:
+        estrategia = CONSTRUCAO_PADRAO
+    if agenda is None:
+        agenda = criar_agenda_vazia(instancia)
+    elif reiniciar:
+        inicializar_agenda(agenda, instancia)
+    indice = instancia.indice
+    # máscara de salas ocupadas por (dia, horario)
+    ocupacao = ([0] * indice.n_slots if reiniciar
+                else indice.mascaras_ocupacao(agenda, instancia))
+    aulas_nao_alocadas = []  # Lista para rastrear aulas não alocadas
+    compacta = isinstance(agenda, AgendaCompacta)
+    if compacta:
+        # escrita direta no array: posição (sala, dia, horario) e índice da aula
+        slots = agenda.slots
+        indice_aula = agenda.indice_aula
+        n_dias, n_horarios = agenda.n_dias, agenda.n_horarios
+
+    for aula in estrategia.ordenar(aulas, indice):
+        dia = aula.dia
+        horario = aula.horario
+        chave = indice.chave(dia, horario)
+
+        # salas livres com capacidade suficiente, já na ordem de custo
+        # (sobra pequena e sala prioritária primeiro)
+        candidatos = indice.mascara_viaveis(aula.alunos) & ~ocupacao[chave]
+
+        if not candidatos:
+            # Não conseguiu alocar essa aula - adicionar à lista de não alocadas
+            aulas_nao_alocadas.append(aula)
+            continue
+
+        pos = estrategia.escolher(candidatos, alpha, rng, indice)
+        ocupacao[chave] |= 1 << pos
+
+        if compacta:
+            slots[(indice.ordem[pos] * n_dias + dia) * n_horarios + horario] = indice_aula(aula)
+            continue
+        slot = agenda[indice.ordem[pos]][dia][horario]
+        slot.ocupado = 1
+        slot.aula = aula
+
+    return agenda, aulas_nao_alocadas
+
+
+CONSTRUCAO_PADRAO = EstrategiaConstrucao()
+
+
+def clonar_agenda(agenda, instancia=None):
+    if isinstance(agenda, AgendaCompacta):
+        return agenda.clonar()
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+    nova = criar_agenda_vazia(instancia)
+    for s in range(instancia.n_salas):
+        for d in range(instancia.n_dias):
+            for h in range(instancia.n_horarios):
+                if agenda[s][d][h].ocupado:
+                    nova[s][d][h].ocupado = 1
+                    nova[s][d][h].aula = agenda[s][d][h].aula
+    return nova
+
+
+def buscar_melhora_local(agenda, max_tentativas=100, verificar=False, rng=random, instancia=None,
+                         estatisticas=None, horarios=None):
+    """
+    Busca local simples:
+      - escolhe aleatoriamente um dia/horário
+      - tenta trocar aulas entre salas ou mover para sala livre
+      - aceita apenas movimentos que melhoram o score e respeitam as restrições
+    A agenda recebida é modificada no lugar, sem cópias. O delta de cada
+    movimento é calculado antes (AvaliadorIncremental.delta_troca/delta_mover)
+    a partir das aulas dos slots envolvidos, e só os que melhoram são
+    aplicados: um movimento rejeitado nunca toca a agenda, então não precisa
+    de registro de desfazer. verificar=True confere cada delta com avaliar_agenda.
+    estatisticas (EstatisticasGrasp) recebe a contagem de movimentos e o
+    tempo da avaliação completa inicial.
+    horarios: lista de (dia, horario) a que a busca se restringe (padrão: todos).
+    """
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+    salas_instancia = instancia.salas
+    indice = instancia.indice
+    ocupacao = indice.mascaras_ocupacao(agenda, instancia)
+    if estatisticas is not None:
+        inicio = time.perf_counter()
+        avaliador = AvaliadorIncremental(agenda, verificar, instancia)
+        estatisticas.tempos["avaliacao"] += time.perf_counter() - inicio
+    else:
+        avaliador = AvaliadorIncremental(agenda, verificar, instancia)
+    aula_em = avaliador.aula_em
+    tentados = viaveis = aceitos = 0
+
+    for _ in range(max_tentativas):
+        if horarios is None:
+            d = rng.randrange(instancia.n_dias)
+            h = rng.randrange(instancia.n_horarios)
+        else:
+            d, h = rng.choice(horarios)
+        chave = indice.chave(d, h)
+
+        ocupadas = [indice.ordem[k] for k in posicoes_bits(ocupacao[chave])]
+
+        # movimento 1: troca entre duas salas ocupadas
+        if len(ocupadas) >= 2:
+            s1, s2 = rng.sample(ocupadas, 2)
+            tentados += 1
+
+            aula1 = aula_em(s1, d, h)
+            aula2 = aula_em(s2, d, h)
+
+            if (salas_instancia[s1].capacidade >= aula2.alunos and
+                salas_instancia[s2].capacidade >= aula1.alunos):
+
+                viaveis += 1
+                delta = avaliador.delta_troca(s1, s2, d, h)
+                if delta > 0:
+                    aplicar_troca(agenda, s1, s2, d, h)
+                    avaliador.registrar(delta)
+                    aceitos += 1
+                    continue
+
+        # movimento 2: mover aula de sala ocupada para sala livre com capacidade
+        if ocupadas:
+            s_ocup = rng.choice(ocupadas)
+            tentados += 1
+            aula = aula_em(s_ocup, d, h)
+            livres = indice.mascara_viaveis(aula.alunos) & ~ocupacao[chave]
+
+            if livres:
+                viaveis += 1
+                pos_livre = n_esimo_bit(livres, rng.randrange(contar_bits(livres)))
+                s_livre = indice.ordem[pos_livre]
+                delta = avaliador.delta_mover(s_ocup, s_livre, d, h)
+                if delta > 0:
+                    aplicar_movimento(agenda, s_ocup, s_livre, d, h)
+                    avaliador.registrar(delta)
+                    aceitos += 1
+                    ocupacao[chave] ^= (1 << indice.posicao[s_ocup]) | (1 << pos_livre)
+                    continue
+
+    if estatisticas is not None:
+        estatisticas.registrar_movimentos(tentados, viaveis, aceitos)
+    return agenda, avaliador.score
+
+
+# =========================
+# Matriz aulas x salas e avaliação em lote
+# =========================
+
+_numpy = None
+
+
+def obter_numpy():
+    """
+    Módulo numpy, importado na primeira chamada; None se não estiver
+    instalado (MatrizCustos tem versão em Python puro).
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+class MatrizCustos:
+    """
+    Contribuição ao score (contribuicao_slot) e viabilidade (capacidade) de
+    cada aula em cada sala, calculadas uma vez por lista de aulas (ou
+    TabelaAulas, lida direto das colunas) e instância. Soluções são vetores de salas_por_aula (sala por aula, -1 =
+    fora da agenda). Com NumPy, as matrizes são arrays e as avaliações em
+    lote são vetorizadas; sem NumPy, o mesmo é feito com listas.
+    """
+
+    def __init__(self, aulas, instancia=None):
+        if instancia is None:
+            instancia = INSTANCIA_PADRAO
+        self.instancia = instancia
+        self.n_aulas = len(aulas)
+        self.n_salas = instancia.n_salas
+        indice = instancia.indice
+        self.n_slots = indice.n_slots
+        if isinstance(aulas, TabelaAulas):
+            alunos = aulas.alunos
+            self.chaves = [indice.chave(d, h) for d, h in zip(aulas.dia, aulas.horario)]
+        else:
+            alunos = [aula.alunos for aula in aulas]
+            self.chaves = [indice.chave(aula.dia, aula.horario) for aula in aulas]
+        capacidades = [sala.capacidade for sala in instancia.salas]
+        prioridades = [sala.prioridade for sala in instancia.salas]
+
+        grupos = {}
+        for i, chave in enumerate(self.chaves):
+            grupos.setdefault(chave, []).append(i)
+        pares = [(i, j) for grupo in grupos.values()
+                 for a, i in enumerate(grupo) for j in grupo[a + 1:]]
+        self.grupos = grupos
+
+        np = obter_numpy()
+        if np is not None:
+            alunos_col = np.array(alunos, dtype=float)[:, None]
+            capacidades_lin = np.array(capacidades, dtype=float)[None, :]
+            self.contribuicao = np.array(prioridades, dtype=float)[None, :] - (capacidades_lin - alunos_col) * 0.1
+            self.viavel = capacidades_lin >= alunos_col
+            self.chaves = np.array(self.chaves, dtype=np.intp)
+            self.pares = (np.array([i for i, _ in pares], dtype=np.intp),
+                          np.array([j for _, j in pares], dtype=np.intp))
+        else:
+            self.contribuicao = [[p - (c - a) * 0.1 for c, p in zip(capacidades, prioridades)]
+                                 for a in alunos]
+            self.viavel = [[c >= a for c in capacidades] for a in alunos]
+            self.pares = pares
+
+    # ---- avaliação de soluções ----
+
+    def avaliar(self, vetor):
+        return self.avaliar_lote([vetor])[0]
+
+    def avaliar_lote(self, vetores):
+        """
+        Score de várias soluções de uma vez (lista de vetores ou array k x n).
+        """
+        np = obter_numpy()
+        if np is None:
+            c = self.contribuicao
+            return [sum(c[i][s] for i, s in enumerate(vetor) if s >= 0) for vetor in vetores]
+        v = np.asarray(vetores, dtype=np.intp).reshape(-1, self.n_aulas)
+        alocada = v >= 0
+        valores = self.contribuicao[np.arange(self.n_aulas)[None, :], np.where(alocada, v, 0)]
+        return (valores * alocada).sum(axis=1).tolist()
+
+    # ---- avaliação de movimentos ----
+
+    def deltas_trocas(self, vetor, aulas_i, aulas_j):
+        """
+        Delta e viabilidade (capacidade) de trocar as salas de cada par
+        (aulas_i[k], aulas_j[k]), ambas alocadas no mesmo horário.
+        Retorna: tupla (deltas, viaveis)
+        """
+        np = obter_numpy()
+        if np is None:
+            c, f = self.contribuicao, self.viavel
+            deltas, viaveis = [], []
+            for i, j in zip(aulas_i, aulas_j):
+                si, sj = vetor[i], vetor[j]
+                deltas.append(c[i][sj] + c[j][si] - c[i][si] - c[j][sj])
+                viaveis.append(f[i][sj] and f[j][si])
+            return deltas, viaveis
+        v = np.asarray(vetor, dtype=np.intp)
+        i = np.asarray(aulas_i, dtype=np.intp)
+        j = np.asarray(aulas_j, dtype=np.intp)
+        si, sj = v[i], v[j]
+        c, f = self.contribuicao, self.viavel
+        return c[i, sj] + c[j, si] - c[i, si] - c[j, sj], f[i, sj] & f[j, si]
+
+    def deltas_movimentos(self, vetor, aulas, salas_destino):
+        """
+        Delta e viabilidade de levar cada aula para a sala correspondente
+        (inserção, se a aula estava fora). Não verifica se a sala está livre.
+        Retorna: tupla (deltas, viaveis)
+        """
+        np = obter_numpy()
+        if np is None:
+            c, f = self.contribuicao, self.viavel
+            deltas = [c[i][t] - (c[i][vetor[i]] if vetor[i] >= 0 else 0)
+                      for i, t in zip(aulas, salas_destino)]
+            return deltas, [f[i][t] for i, t in zip(aulas, salas_destino)]
+        v = np.asarray(vetor, dtype=np.intp)
+        i = np.asarray(aulas, dtype=np.intp)
+        t = np.asarray(salas_destino, dtype=np.intp)
+        atual = np.where(v[i] >= 0, self.contribuicao[i, np.maximum(v[i], 0)], 0.0)
+        return self.contribuicao[i, t] - atual, self.viavel[i, t]
+
+    def melhores_movimentos(self, vetor, chaves_permitidas=None, bloqueadas=None):
+        """
+        Avalia de uma vez todas as trocas entre aulas alocadas no mesmo
+        horário e todos os movimentos/inserções para salas livres viáveis, e
+        escolhe, em cada horário, o que mais melhora o score.
+        bloqueadas: {chave do horário: salas ocupadas por algo fora do vetor
+        (sem aula ou com aula que não está nesta matriz)}; não recebem aulas.
+        Retorna: tupla (movimentos, avaliados); cada movimento é uma lista de
+        (aula, sala_nova)
+        """
+        np = obter_numpy()
+        if np is None:
+            return self._melhores_movimentos_python(vetor, chaves_permitidas, bloqueadas)
+        v = np.asarray(vetor, dtype=np.intp)
+        chaves = self.chaves
+        alocada = v >= 0
+        ocupadas = np.zeros((self.n_slots, self.n_salas), dtype=bool)
+        ocupadas[chaves[alocada], v[alocada]] = True
+        for chave, salas_bloqueadas in (bloqueadas or {}).items():
+            ocupadas[chave, salas_bloqueadas] = True
+        permitida = None
+        if chaves_permitidas is not None:
+            permitida = np.zeros(self.n_slots, dtype=bool)
+            permitida[list(chaves_permitidas)] = True
+
+        # trocas
+        pi, pj = self.pares
+        manter = alocada[pi] & alocada[pj]
+        if permitida is not None:
+            manter &= permitida[chaves[pi]]
+        pi, pj = pi[manter], pj[manter]
+        d_troca, f_troca = self.deltas_trocas(v, pi, pj)
+
+        # movimentos e inserções
+        candidatas = ~ocupadas[chaves] & self.viavel
+        if permitida is not None:
+            candidatas &= permitida[chaves][:, None]
+        mi, mt = np.nonzero(candidatas)
+        d_mov, _ = self.deltas_movimentos(v, mi, mt)
+        avaliados = len(pi) + len(mi)
+
+        n_trocas = int(f_troca.sum())
+        deltas = np.concatenate([d_troca[f_troca], d_mov])
+        horarios = np.concatenate([chaves[pi[f_troca]], chaves[mi]])
+        origem = np.concatenate([pi[f_troca], mi])
+        destino = np.concatenate([pj[f_troca], mt])
+        melhora = deltas > TOLERANCIA_SCORE
+        if not melhora.any():
+            return [], avaliados
+        posicoes = np.nonzero(melhora)[0]
+        # maior delta primeiro dentro de cada horário; o primeiro de cada horário vence
+        ordem = posicoes[np.lexsort((-deltas[posicoes], horarios[posicoes]))]
+        primeiro = np.ones(len(ordem), dtype=bool)
+        primeiro[1:] = horarios[ordem][1:] != horarios[ordem][:-1]
+
+        movimentos = []
+        for k in ordem[primeiro].tolist():
+            a, b = int(origem[k]), int(destino[k])
+            if k < n_trocas:
+                movimentos.append([(a, int(v[b])), (b, int(v[a]))])
+            else:
+                movimentos.append([(a, b)])
+        return movimentos, avaliados
+
+    def _melhores_movimentos_python(self, vetor, chaves_permitidas, bloqueadas):
+        c, f = self.contribuicao, self.viavel
+        movimentos = []
+        avaliados = 0
+        for chave, grupo in self.grupos.items():
+            if chaves_permitidas is not None and chave not in chaves_permitidas:
+                continue
+            ocupadas = {vetor[i] for i in grupo if vetor[i] >= 0}
+            if bloqueadas and chave in bloqueadas:
+                ocupadas.update(bloqueadas[chave])
+            melhor_delta = TOLERANCIA_SCORE
+            melhor = None
+            for a, i in enumerate(grupo):
+                si = vetor[i]
+                atual = c[i][si] if si >= 0 else 0
+                if si >= 0:
+                    for j in grupo[a + 1:]:
+                        sj = vetor[j]
+                        if sj < 0:
+                            continue
+                        avaliados += 1
+                        if f[i][sj] and f[j][si]:
+                            delta = c[i][sj] + c[j][si] - atual - c[j][sj]
+                            if delta > melhor_delta:
+                                melhor_delta, melhor = delta, [(i, sj), (j, si)]
+                for t in range(self.n_salas):
+                    if t in ocupadas or not f[i][t]:
+                        continue
+                    avaliados += 1
+                    delta = c[i][t] - atual
+                    if delta > melhor_delta:
+                        melhor_delta, melhor = delta, [(i, t)]
+            if melhor is not None:
+                movimentos.append(melhor)
+        return movimentos, avaliados
+
+
+def busca_local_em_lote(agenda, aulas, matriz=None, instancia=None, horarios=None,
+                        max_rodadas=1000, estatisticas=None, verificar=False):
+    """
+    Busca local de melhor melhoria avaliada em lote pela MatrizCustos: a cada
+    rodada, todas as trocas entre aulas do mesmo horário, todos os movimentos
+    para salas livres e todas as inserções de aulas não alocadas são
+    avaliados de uma vez, e em cada (dia, horario) é aplicado o melhor
+    movimento que melhora o score (os horários são independentes). Para
+    quando nenhum movimento melhora. horarios restringe a busca como em
+    buscar_melhora_local. Salas ocupadas sem aula ou por aulas fora de
+    `aulas` (reservas, aulas reagendadas) ficam bloqueadas, como no
+    _EstadoHorario. A agenda é alterada no lugar. O score vem da soma
+    dos deltas (AvaliadorIncremental); verificar=True confere o total com
+    avaliar_agenda.
+    Retorna: tupla (agenda, score, aulas_nao_alocadas)
+    """
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+    if matriz is None:
+        matriz = MatrizCustos(aulas, instancia)
+    indice = instancia.indice
+    permitidas = None if horarios is None else {indice.chave(d, h) for d, h in horarios}
+    vetor = salas_por_aula(agenda, aulas, instancia)
+    original = list(vetor)
+    # ocupação real da agenda menos as salas das próprias aulas
+    ocupacao = indice.mascaras_ocupacao(agenda, instancia)
+    for i, s in enumerate(vetor):
+        if s >= 0:
+            ocupacao[int(matriz.chaves[i])] &= ~(1 << indice.posicao[s])
+    bloqueadas = {chave: [indice.ordem[k] for k in posicoes_bits(mascara)]
+                  for chave, mascara in enumerate(ocupacao) if mascara}
+    avaliador = AvaliadorIncremental(agenda, verificar, instancia)
+    contribuicao = matriz.contribuicao
+    delta = 0
+    avaliados = aceitos = 0
+
+    for _ in range(max_rodadas):
+        movimentos, n = matriz.melhores_movimentos(vetor, permitidas, bloqueadas)
+        avaliados += n
+        if not movimentos:
+            break
+        aceitos += len(movimentos)
+        for mudancas in movimentos:
+            for i, s in mudancas:
+                if vetor[i] >= 0:
+                    delta -= float(contribuicao[i][vetor[i]])
+                if s >= 0:
+                    delta += float(contribuicao[i][s])
+                vetor[i] = s
+
+    # regrava só as aulas que mudaram de sala
+    mudaram = [i for i in range(len(aulas)) if vetor[i] != original[i]]
+    for i in mudaram:
+        if original[i] >= 0:
+            slot = agenda[original[i]][aulas[i].dia][aulas[i].horario]
+            if slot.aula is aulas[i]:
+                slot.ocupado = 0
+                slot.aula = None
+    for i in mudaram:
+        if vetor[i] >= 0:
+            slot = agenda[vetor[i]][aulas[i].dia][aulas[i].horario]
+            slot.ocupado = 1
+            slot.aula = aulas[i]
+
+    avaliador.registrar(delta)
+    if estatisticas is not None:
+        estatisticas.registrar_movimentos(avaliados, avaliados, aceitos)
+    return (agenda, avaliador.score,
+            [aula for aula, s in zip(aulas, vetor) if s < 0])
+
+
+# =========================
+# Motores de busca local
+# =========================
+
+class BuscaLocal:
+    """
+    Interface dos motores de busca local de BUSCAS_LOCAIS. O motor é criado
+    uma vez por execução do GRASP (com as aulas e a instância) e buscar() é
+    chamado a cada iteração sobre a agenda construída, que é alterada no
+    lugar. horarios restringe a busca a uma lista de (dia, horario);
+    max_tentativas é o orçamento de cada motor, quando ele tiver um.
+    buscar() retorna: tupla (agenda, score, aulas_nao_alocadas)
+    """
+
+    def __init__(self, aulas, instancia=None):
+        self.aulas = aulas
+        self.instancia = instancia if instancia is not None else INSTANCIA_PADRAO
+        self._linhas = {}
+
+    def linha(self, alunos):
+        """
+        Contribuição (contribuicao_slot) e viabilidade de uma turma de
+        `alunos` em cada sala; como só dependem do número de alunos, são
+        calculadas uma vez por tamanho de turma.
+        """
+        linha = self._linhas.get(alunos)
+        if linha is None:
+            salas_instancia = self.instancia.salas
+            linha = self._linhas[alunos] = (
+                [sala.prioridade - (sala.capacidade - alunos) * 0.1 for sala in salas_instancia],
+                [sala.capacidade >= alunos for sala in salas_instancia])
+        return linha
+
+    def delta(self, estado, mudancas):
+        """
+        Variação do score ao aplicar mudancas (ver _EstadoHorario.aplicar).
+        """
+        delta = 0
+        for s, aula in mudancas:
+            antiga = estado.salas[s]
+            if antiga is not None:
+                delta -= self.linha(antiga.alunos)[0][s]
+            if aula is not None:
+                delta += self.linha(aula.alunos)[0][s]
+        return delta
+
+    def buscar(self, agenda, aulas_nao_alocadas, rng=random, max_tentativas=100, horarios=None,
+               estatisticas=None, verificar=False):
+        raise NotImplementedError
+
+
+class BuscaAleatoria(BuscaLocal):
+    """
+    buscar_melhora_local: max_tentativas trocas/movimentos sorteados,
+    aceitando só melhorias. Não muda o conjunto de aulas alocadas.
+    """
+
+    def buscar(self, agenda, aulas_nao_alocadas, rng=random, max_tentativas=100, horarios=None,
+               estatisticas=None, verificar=False):
+        agenda, score = buscar_melhora_local(agenda, max_tentativas, verificar=verificar, rng=rng,
+                                             instancia=self.instancia, estatisticas=estatisticas,
+                                             horarios=horarios)
+        return agenda, score, aulas_nao_alocadas
+
+
+class BuscaEmLote(BuscaLocal):
+    """
+    busca_local_em_lote, com a MatrizCustos montada uma vez por execução.
+    """
+
+    def __init__(self, aulas, instancia=None):
+        super().__init__(aulas, instancia)
+        self.matriz = MatrizCustos(aulas, self.instancia)
+
+    def buscar(self, agenda, aulas_nao_alocadas, rng=random, max_tentativas=100, horarios=None,
+               estatisticas=None, verificar=False):
+        return busca_local_em_lote(agenda, self.aulas, self.matriz, self.instancia, horarios,
+                                   estatisticas=estatisticas, verificar=verificar)
+
+
+class _EstadoHorario:
+    """
+    Um (dia, horario) da agenda para os motores que trabalham horário a
+    horário: aula em cada sala (None = livre), salas bloqueadas (ocupadas
+    sem aula) e aulas do horário que estão fora da agenda. Como cada aula
+    tem dia e horário fixos, os horários são independentes entre si.
+    """
+    __slots__ = ("dia", "horario", "salas", "bloqueadas", "fora")
+
+    def __init__(self, agenda, d, h, fora, instancia):
+        self.dia = d
+        self.horario = h
+        self.salas = []
+        self.bloqueadas = set()
+        self.fora = list(fora)
+        if isinstance(agenda, AgendaCompacta):
+            aulas = agenda.aulas
+            for s, idx in enumerate(agenda.coluna(d, h)):
+                self.salas.append(aulas[idx] if idx >= 0 else None)
+                if idx == OCUPADO_SEM_AULA:
+                    self.bloqueadas.add(s)
+            return
+        for s in range(instancia.n_salas):
+            slot = agenda[s][d][h]
+            self.salas.append(slot.aula if slot.ocupado else None)
+            if slot.ocupado and slot.aula is None:
+                self.bloqueadas.add(s)
+
+    def aplicar(self, mudancas):
+        """
+        mudancas: lista de (sala, aula ou None). Aulas que saem da agenda
+        vão para self.fora, e as que entram saem dela.
+        """
+        saem = [self.salas[s] for s, _ in mudancas if self.salas[s] is not None]
+        for s, aula in mudancas:
+            self.salas[s] = aula
+        dentro = {id(aula) for aula in self.salas if aula is not None}
+        self.fora = [aula for aula in self.fora if id(aula) not in dentro]
+        self.fora.extend(aula for aula in saem if id(aula) not in dentro)
+
+    def gravar(self, agenda):
+        compacta = isinstance(agenda, AgendaCompacta)
+        for s, aula in enumerate(self.salas):
+            if s in self.bloqueadas:
+                continue
+            if compacta:
+                posicao = agenda.posicao(s, self.dia, self.horario)
+                agenda.slots[posicao] = LIVRE if aula is None else agenda.indice_aula(aula)
+                continue
+            slot = agenda[s][self.dia][self.horario]
+            slot.ocupado = 0 if aula is None else 1
+            slot.aula = aula
+
+
+def _estados_horarios(agenda, aulas_nao_alocadas, instancia, horarios=None):
+    fora = {}
+    for aula in aulas_nao_alocadas:
+        fora.setdefault((aula.dia, aula.horario), []).append(aula)
+    if horarios is None:
+        horarios = [(d, h) for d in range(instancia.n_dias) for h in range(instancia.n_horarios)]
+    return [_EstadoHorario(agenda, d, h, fora.get((d, h), ()), instancia) for d, h in horarios]
+
+
+def _nao_alocadas_dos_estados(aulas_nao_alocadas, estados):
+    """
+    Aulas não alocadas depois da busca: as dos horários buscados vêm dos
+    estados, e as demais continuam as de antes.
+    """
+    buscados = {(estado.dia, estado.horario) for estado in estados}
+    nao_alocadas = [aula for aula in aulas_nao_alocadas if (aula.dia, aula.horario) not in buscados]
+    for estado in estados:
+        nao_alocadas.extend(estado.fora)
+    return nao_alocadas
+
+
+class BuscaVND(BuscaLocal):
+    """
+    Descida em vizinhança variável (VND), horário a horário. Vizinhanças, na
+    ordem de VIZINHANCAS (da varredura mais barata à mais cara):
+      - troca: duas aulas alocadas trocam de sala;
+      - mover: uma aula vai para uma sala livre (ou uma aula não alocada
+        entra numa sala livre);
+      - ejecao: uma aula não alocada toma a sala de outra, que vai para a
+        melhor sala livre do horário ou sai da agenda;
+      - rotacao: três salas em ciclo, a -> sala de b, b -> sala de c (ou
+        sala livre) e c -> sala de a.
+    As vizinhanças são limitadas por listas de candidatas: uma aula só é
+    levada para as tamanho_lista salas viáveis de maior contribuição
+    (candidatas()), então uma varredura custa O(salas * tamanho_lista), e a
+    rotação O(salas * tamanho_lista²).
+    A descida é cíclica: depois de uma melhoria continua na mesma vizinhança,
+    passa à seguinte quando ela não melhora, e o horário chega ao ótimo local
+    quando todas falham em sequência. Os horários avançam em rodízio, uma
+    varredura por vez, até todos chegarem ao ótimo local ou o orçamento de
+    max_tentativas * avaliacoes_por_tentativa movimentos avaliados (padrão:
+    salas * tamanho_lista, uma varredura da lista de candidatas) acabar.
+    """
+    VIZINHANCAS = ("troca", "mover", "ejecao", "rotacao")
+
+    def __init__(self, aulas, instancia=None, tamanho_lista=8, avaliacoes_por_tentativa=None):
+        super().__init__(aulas, instancia)
+        self.tamanho_lista = tamanho_lista
+        self.avaliacoes_por_tentativa = avaliacoes_por_tentativa or self.instancia.n_salas * tamanho_lista
+        self._candidatas = {}
+
+    def candidatas(self, alunos):
+        """
+        Salas viáveis para uma turma de `alunos`, da maior para a menor
+        contribuição, cortadas em tamanho_lista.
+        """
+        lista = self._candidatas.get(alunos)
+        if lista is None:
+            contribuicoes, viaveis = self.linha(alunos)
+            lista = sorted((s for s, viavel in enumerate(viaveis) if viavel),
+                           key=lambda s: -contribuicoes[s])[:self.tamanho_lista]
+            self._candidatas[alunos] = lista
+        return lista
+
+    def buscar(self, agenda, aulas_nao_alocadas, rng=random, max_tentativas=100, horarios=None,
+               estatisticas=None, verificar=False):
+        instancia = self.instancia
+        estados = _estados_horarios(agenda, aulas_nao_alocadas, instancia, horarios)
+        avaliador = AvaliadorIncremental(agenda, verificar, instancia)
+        vizinhancas = [getattr(self, "_" + nome) for nome in self.VIZINHANCAS]
+        self._avaliados = 0
+        self._orcamento = max_tentativas * self.avaliacoes_por_tentativa
+        aceitos = 0
+
+        # [estado, salas, vizinhança atual, falhas seguidas]
+        ativos = []
+        for estado in estados:
+            salas = [s for s in range(instancia.n_salas) if s not in estado.bloqueadas]
+            rng.shuffle(salas)  # ordem de varredura diferente a cada iteração do GRASP
+            ativos.append([estado, salas, 0, 0])
+
+        while ativos and self._avaliados < self._orcamento:
+            seguintes = []
+            for item in ativos:
+                if self._avaliados >= self._orcamento:
+                    break
+                estado, salas, k, _ = item
+                mudancas = vizinhancas[k](estado, salas)
+                if mudancas is None:
+                    item[2] = (k + 1) % len(vizinhancas)
+                    item[3] += 1
+                    if item[3] < len(vizinhancas):
+                        seguintes.append(item)
+                    continue
+                delta = self.delta(estado, mudancas)
+                estado.aplicar(mudancas)
+                aceitos += 1
+                item[3] = 0
+                if verificar:
+                    estado.gravar(agenda)
+                avaliador.registrar(delta)
+                seguintes.append(item)
+            ativos = seguintes
+
+        for estado in estados:
+            estado.gravar(agenda)
+        if estatisticas is not None:
+            estatisticas.registrar_movimentos(self._avaliados, self._avaliados, aceitos)
+        return agenda, avaliador.score, _nao_alocadas_dos_estados(aulas_nao_alocadas, estados)
+
+    def _livre(self, estado, s):
+        return estado.salas[s] is None and s not in estado.bloqueadas
+
+    def _troca(self, estado, salas):
+        ocupacao = estado.salas
+        for s1 in salas:
+            if self._avaliados >= self._orcamento:
+                return None
+            a = ocupacao[s1]
+            if a is None:
+                continue
+            ca, _ = self.linha(a.alunos)
+            for s2 in self.candidatas(a.alunos):
+                b = ocupacao[s2]
+                if b is None or s2 == s1:
+                    continue
+                self._avaliados += 1
+                cb, fb = self.linha(b.alunos)
+                if fb[s1] and ca[s2] + cb[s1] - ca[s1] - cb[s2] > TOLERANCIA_SCORE:
+                    return [(s1, b), (s2, a)]
+        return None
+
+    def _mover(self, estado, salas):
+        # candidatas em ordem de contribuição: só a primeira livre pode melhorar
+        for s1 in salas:
+            if self._avaliados >= self._orcamento:
+                return None
+            a = estado.salas[s1]
+            if a is None:
+                continue
+            ca, _ = self.linha(a.alunos)
+            for t in self.candidatas(a.alunos):
+                if t == s1 or not self._livre(estado, t):
+                    continue
+                self._avaliados += 1
+                if ca[t] - ca[s1] > TOLERANCIA_SCORE:
+                    return [(s1, None), (t, a)]
+                break
+        for u in estado.fora:
+            cu, _ = self.linha(u.alunos)
+            for t in self.candidatas(u.alunos):
+                if not self._livre(estado, t):
+                    continue
+                self._avaliados += 1
+                if cu[t] > TOLERANCIA_SCORE:
+                    return [(t, u)]
+                break
+        return None
+
+    def _rotacao(self, estado, salas):
+        ocupacao = estado.salas
+        for s1 in salas:
+            if self._avaliados >= self._orcamento:
+                return None
+            a = ocupacao[s1]
+            if a is None:
+                continue
+            ca, _ = self.linha(a.alunos)
+            for s2 in self.candidatas(a.alunos):
+                b = ocupacao[s2]
+                if b is None or s2 == s1:
+                    continue
+                cb, _ = self.linha(b.alunos)
+                ganho_ab = ca[s2] - ca[s1] - cb[s2]
+                for s3 in self.candidatas(b.alunos):
+                    if s3 == s1 or s3 == s2:
+                        continue
+                    x = ocupacao[s3]
+                    if x is None:
+                        if s3 in estado.bloqueadas:
+                            continue
+                        # a -> s2, b -> s3 (livre) e s1 fica livre
+                        self._avaliados += 1
+                        if ganho_ab + cb[s3] > TOLERANCIA_SCORE:
+                            return [(s2, a), (s3, b), (s1, None)]
+                        continue
+                    cx, fx = self.linha(x.alunos)
+                    self._avaliados += 1
+                    if fx[s1] and ganho_ab + cb[s3] + cx[s1] - cx[s3] > TOLERANCIA_SCORE:
+                        return [(s2, a), (s3, b), (s1, x)]
+        return None
+
+    def _ejecao(self, estado, salas):
+        for u in estado.fora:
+            if self._avaliados >= self._orcamento:
+                return None
+            cu, _ = self.linha(u.alunos)
+            for s in self.candidatas(u.alunos):
+                a = estado.salas[s]
+                if a is None:
+                    continue
+                self._avaliados += 1
+                ca, _ = self.linha(a.alunos)
+                destino, ganho = None, 0
+                for t in self.candidatas(a.alunos):
+                    if self._livre(estado, t):
+                        if ca[t] > ganho:
+                            destino, ganho = t, ca[t]
+                        break
+                if cu[s] - ca[s] + ganho > TOLERANCIA_SCORE:
+                    mudancas = [(s, u)]
+                    if destino is not None:
+                        mudancas.append((destino, a))
+                    return mudancas
+        return None
+
+
+class BuscaRecozimento(BuscaLocal):
+    """
+    Recozimento simulado (simulated annealing), horário a horário. A cada
+    passo sorteia um horário e um movimento (troca, mover, inserir ou
+    ejetar, como em BuscaVND); movimentos que pioram o score em delta são
+    aceitos com probabilidade exp(delta / T), e T cai geometricamente de
+    temperatura_inicial a temperatura_final ao longo de
+    max(max_tentativas, passos_por_aula * nº de aulas) passos. Como os
+    horários são independentes, a melhor solução é a união do melhor estado
+    visto em cada horário. O score vem por delta (AvaliadorIncremental);
+    verificar=True confere cada passo aceito com avaliar_agenda.
+    """
+
+    def __init__(self, aulas, instancia=None, passos_por_aula=20, temperatura_inicial=2.0,
+                 temperatura_final=0.02):
+        super().__init__(aulas, instancia)
+        self.passos_por_aula = passos_por_aula
+        self.temperatura_inicial = temperatura_inicial
+        self.temperatura_final = temperatura_final
+
+    def buscar(self, agenda, aulas_nao_alocadas, rng=random, max_tentativas=100, horarios=None,
+               estatisticas=None, verificar=False):
+        instancia = self.instancia
+        estados = [estado for estado in _estados_horarios(agenda, aulas_nao_alocadas, instancia, horarios)
+                   if estado.fora or any(aula is not None for aula in estado.salas)]
+        avaliador = AvaliadorIncremental(agenda, verificar, instancia)
+        if not estados:
+            return agenda, avaliador.score, list(aulas_nao_alocadas)
+        vazia = ([0] * instancia.n_salas, [True] * instancia.n_salas)  # "aula" None: sala livre
+
+        salas = [[s for s in range(instancia.n_salas) if s not in estado.bloqueadas] for estado in estados]
+        melhores = [(list(estado.salas), list(estado.fora)) for estado in estados]
+        ganhos = [0.0] * len(estados)          # score atual - score inicial, por horário
+        melhores_ganhos = [0.0] * len(estados)
+        buscados = {(estado.dia, estado.horario) for estado in estados}
+        n_aulas = sum(1 for aula in self.aulas if (aula.dia, aula.horario) in buscados)
+        passos = max(max_tentativas, self.passos_por_aula * n_aulas)
+        temperatura = self.temperatura_inicial
+        resfriamento = (self.temperatura_final / self.temperatura_inicial) ** (1 / passos)
+        viaveis = aceitos = 0
+
+        for _ in range(passos):
+            temperatura *= resfriamento
+            k = rng.randrange(len(estados))
+            estado = estados[k]
+            disponiveis = salas[k]
+            if not disponiveis:
+                continue
+            s1 = rng.choice(disponiveis)
+            a = estado.salas[s1]
+            ca, fa = vazia if a is None else self.linha(a.alunos)
+            if estado.fora and rng.random() < 0.5:
+                # inserir (sala livre) ou ejetar (sala ocupada) uma aula de fora
+                u = rng.choice(estado.fora)
+                cu, fu = self.linha(u.alunos)
+                if not fu[s1]:
+                    continue
+                mudancas = [(s1, u)]
+                delta = cu[s1] - ca[s1]
+            else:
+                s2 = rng.choice(disponiveis)
+                b = estado.salas[s2]
+                cb, fb = vazia if b is None else self.linha(b.alunos)
+                if s2 == s1 or (a is None and b is None) or not fa[s2] or not fb[s1]:
+                    continue
+                mudancas = [(s1, b), (s2, a)]  # troca, ou movimento se uma das salas está livre
+                delta = ca[s2] + cb[s1] - ca[s1] - cb[s2]
+            viaveis += 1
+            if delta < 0 and rng.random() >= math.exp(delta / temperatura):
+                continue
+            aceitos += 1
+            estado.aplicar(mudancas)
+            if verificar:
+                estado.gravar(agenda)
+            avaliador.registrar(delta)
+            ganhos[k] += delta
+            if ganhos[k] > melhores_ganhos[k] + TOLERANCIA_SCORE:
+                melhores_ganhos[k] = ganhos[k]
+                melhores[k] = (list(estado.salas), list(estado.fora))
+
+        for estado, (ocupacao, fora) in zip(estados, melhores):
+            estado.salas, estado.fora = ocupacao, fora
+            estado.gravar(agenda)
+        # volta de cada horário ao seu melhor estado
+        avaliador.registrar(sum(melhores_ganhos) - sum(ganhos))
+        if estatisticas is not None:
+            estatisticas.registrar_movimentos(passos, viaveis, aceitos)
+        return (agenda, avaliador.score,
+                _nao_alocadas_dos_estados(aulas_nao_alocadas, estados))
+
+
+BUSCAS_LOCAIS = {
+    "aleatoria": BuscaAleatoria,
+    "lote": BuscaEmLote,
+    "vnd": BuscaVND,
+    "recozimento": BuscaRecozimento,
+}
+
+
+def criar_busca_local(busca_local, aulas, instancia=None):
+    """
+    Motor de busca local pelo nome em BUSCAS_LOCAIS; um objeto BuscaLocal
+    já criado é devolvido como está.
+    """
+    if isinstance(busca_local, BuscaLocal):
+        return busca_local
+    try:
+        classe = BUSCAS_LOCAIS[busca_local]
+    except KeyError:
+        raise ValueError(f"busca local desconhecida: {busca_local!r} "
+                         f"(opções: {', '.join(BUSCAS_LOCAIS)})") from None
+    return classe(aulas, instancia)
+
+
+# =========================
+# Pool de elite e path relinking
+# =========================
+
+def salas_por_aula(agenda, aulas, instancia=None):
+    """
+    Representação compacta de uma solução: para cada aula de `aulas`, o
+    índice da sala em que está na agenda, ou -1 se ficou de fora.
+    """
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+    indices = {id(aula): i for i, aula in enumerate(aulas)}
+    vetor = [-1] * len(aulas)
+    if isinstance(agenda, AgendaCompacta):
+        slots = agenda.slots
+        tabela = agenda.aulas
+        bloco = agenda.n_dias * agenda.n_horarios
+        for pos in compress(range(len(slots)), map((0).__le__, slots)):
+            i = indices.get(id(tabela[slots[pos]]))
+            if i is not None:
+                vetor[i] = pos // bloco
+        return vetor
+    for s in range(instancia.n_salas):
+        for d in range(instancia.n_dias):
+            for h in range(instancia.n_horarios):
+                slot = agenda[s][d][h]
+                if slot.ocupado and slot.aula is not None:
+                    i = indices.get(id(slot.aula))
+                    if i is not None:
+                        vetor[i] = s
+    return vetor
+
+
+class PoolElite:
+    """
+    Conjunto limitado das melhores soluções distintas (vetores de
+    salas_por_aula) encontradas pelo GRASP. A distância entre duas soluções é
+    o número de aulas em salas diferentes. Uma solução nova entra se:
+      - o pool não está cheio e ela difere de todas em pelo menos
+        distancia_minima aulas (ou é a melhor de todas);
+      - o pool está cheio, ela é melhor que a pior e, a menos que seja a nova
+        melhor, difere de todas em pelo menos distancia_minima aulas.
+    Ao entrar num pool cheio, substitui a mais parecida entre as piores que ela.
+    """
+
+    def __init__(self, tamanho=10, distancia_minima=1):
+        self.tamanho = tamanho
+        self.distancia_minima = distancia_minima
+        self.solucoes = []  # (score, vetor)
+
+    def novo(self):
+        """
+        Pool vazio com os mesmos parâmetros (ex.: para cada processo do pool).
+        """
+        return PoolElite(self.tamanho, self.distancia_minima)
+
+    @staticmethod
+    def distancia(vetor1, vetor2):
+        return sum(1 for s1, s2 in zip(vetor1, vetor2) if s1 != s2)
+
+    def inserir(self, vetor, score):
+        """
+        Tenta incluir a solução; retorna True se ela entrou no pool.
+        """
+        distancias = [self.distancia(vetor, v) for _, v in self.solucoes]
+        if 0 in distancias:
+            return False
+        nova_melhor = not self.solucoes or score > max(sc for sc, _ in self.solucoes)
+        diversa = min(distancias, default=self.distancia_minima) >= self.distancia_minima
+
+        if len(self.solucoes) < self.tamanho:
+            if diversa or nova_melhor:
+                self.solucoes.append((score, list(vetor)))
+                return True
+            return False
+
+        if not (diversa or nova_melhor):
+            return False
+        piores = [k for k, (sc, _) in enumerate(self.solucoes) if sc < score]
+        if not piores:
+            return False
+        k = min(piores, key=lambda k: distancias[k])
+        self.solucoes[k] = (score, list(vetor))
+        return True
+
+    def escolher_guia(self, vetor, rng=random):
+        """
+        Sorteia um membro do pool com probabilidade proporcional à distância
+        até `vetor`. Retorna None se o pool está vazio ou só tem cópias dele.
+        """
+        distancias = [self.distancia(vetor, v) for _, v in self.solucoes]
+        if not any(distancias):
+            return None
+        return rng.choices(self.solucoes, distancias)[0][1]
+
+    def combinar(self, outro):
+        for score, vetor in outro.solucoes:
+            self.inserir(vetor, score)
+
+    def resumo(self):
+        scores = sorted((sc for sc, _ in self.solucoes), reverse=True)
+        distancias = [self.distancia(v1, v2)
+                      for k, (_, v1) in enumerate(self.solucoes)
+                      for _, v2 in self.solucoes[k + 1:]]
+        return {
+            "tamanho": len(self.solucoes),
+            "scores": scores,
+            "distancia_media": sum(distancias) / len(distancias) if distancias else 0,
+        }
+
+
+def _passo_religamento(i, pos, ocupantes, bloqueadas, guia, aulas, instancia):
+    """
+    Mudanças [(aula, sala_nova), ...] que levam a aula i para guia[i] em seu
+    dia/horário: se a sala estiver ocupada, a ocupante vai para a sala de
+    onde i saiu ou, se i estava fora da agenda, para uma sala livre (de
+    preferência a dela no guia). None se a capacidade não permitir ou se o
+    destino estiver em bloqueadas (salas ocupadas por quem não está sendo religado).
+    """
+    salas_inst = instancia.salas
+    destino = guia[i]
+    origem = pos[i]
+    if destino in bloqueadas:
+        return None
+    j = ocupantes.get(destino)
+    if j is None:
+        return [(i, destino)]
+    alunos_j = aulas[j].alunos
+    if origem >= 0:
+        if salas_inst[origem].capacidade >= alunos_j:
+            return [(i, destino), (j, origem)]
+        return None
+    livres = [s for s in range(instancia.n_salas)
+              if s not in ocupantes and s not in bloqueadas and salas_inst[s].capacidade >= alunos_j]
+    if not livres:
+        return None
+    if guia[j] in livres:
+        return [(i, destino), (j, guia[j])]
+    melhor = max(livres, key=lambda s: contribuicao_slot(s, aulas[j], instancia))
+    return [(i, destino), (j, melhor)]
+
+
+def religar_caminho(agenda, aulas, atual, guia, instancia=None):
+    """
+    Path relinking de `atual` em direção a `guia` (vetores de salas_por_aula).
+    Cada passo leva uma aula para a sala que ela ocupa no guia, escolhendo
+    sempre o passo de maior delta; nenhum passo tira uma aula da agenda.
+    Como as restrições são independentes por (dia, horário), o caminho é
+    percorrido horário a horário e, em cada um, fica-se com o melhor ponto
+    intermediário. Salas ocupadas sem aula ou por aulas fora de `aulas`
+    ficam intocadas. A agenda e `atual` são alterados no lugar.
+    Retorna: ganho total de score (>= 0)
+    """
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+
+    def contribuicao(k, s):
+        return contribuicao_slot(s, aulas[k], instancia) if s >= 0 else 0
+
+    grupos = {}
+    pendentes = set()
+    for i, aula in enumerate(aulas):
+        chave = (aula.dia, aula.horario)
+        grupos.setdefault(chave, []).append(i)
+        if guia[i] >= 0 and atual[i] != guia[i]:
+            pendentes.add(chave)
+
+    ganho_total = 0
+    for d, h in pendentes:
+        grupo = grupos[(d, h)]
+        pos = {i: atual[i] for i in grupo}
+        ocupantes = {s: i for i, s in pos.items() if s >= 0}
+        # como no _EstadoHorario: o que não é das aulas religadas não se move
+        bloqueadas = {s for s in range(instancia.n_salas)
+                      if s not in ocupantes and agenda[s][d][h].ocupado}
+        valor = {i: contribuicao(i, s) for i, s in pos.items()}
+        restantes = {i for i in grupo if guia[i] >= 0 and pos[i] != guia[i]}
+        ganho = melhor_ganho = 0
+        melhor_pos = None
+
+        while restantes:
+            melhor_passo = None
+            for i in restantes:
+                mudancas = _passo_religamento(i, pos, ocupantes, bloqueadas, guia, aulas, instancia)
+                if mudancas is None:
+                    continue
+                delta = sum(contribuicao(k, s) - valor[k] for k, s in mudancas)
+                if melhor_passo is None or delta > melhor_passo[0]:
+                    melhor_passo = (delta, mudancas)
+            if melhor_passo is None:
+                break
+
+            delta, mudancas = melhor_passo
+            for k, _ in mudancas:
+                if pos[k] >= 0 and ocupantes.get(pos[k]) == k:
+                    del ocupantes[pos[k]]
+            for k, s in mudancas:
+                pos[k] = s
+                ocupantes[s] = k
+                valor[k] = contribuicao(k, s)
+            ganho += delta
+            restantes = {i for i in restantes if pos[i] != guia[i]}
+            if ganho > melhor_ganho + TOLERANCIA_SCORE:
+                melhor_ganho = ganho
+                melhor_pos = dict(pos)
+
+        if melhor_pos is None:
+            continue
+        for i in grupo:
+            if atual[i] >= 0:
+                slot = agenda[atual[i]][d][h]
+                slot.ocupado = 0
+                slot.aula = None
+        for i, s in melhor_pos.items():
+            atual[i] = s
+            if s >= 0:
+                slot = agenda[s][d][h]
+                slot.ocupado = 1
+                slot.aula = aulas[i]
+        ganho_total += melhor_ganho
+
+    return ganho_total
+
+
+def _religar_com_elite(agenda, score, aulas, elite, rng, instancia, max_tentativas,
+                       verificar, estatisticas, busca=None):
+    """
+    Religa a solução da iteração a um membro do pool de elite (seguido de
+    busca local, com o motor busca, se houve ganho) e oferece o resultado ao
+    pool.
+    Retorna: tupla (agenda, score, aulas_nao_alocadas)
+    """
+    if busca is None:
+        busca = BuscaAleatoria(aulas, instancia)
+    atual = salas_por_aula(agenda, aulas, instancia)
+    guia = elite.escolher_guia(atual, rng)
+    if guia is not None and religar_caminho(agenda, aulas, atual, guia, instancia) > 0:
+        nao_alocadas = [aulas[i] for i, s in enumerate(salas_por_aula(agenda, aulas, instancia)) if s < 0]
+        agenda, score, _ = busca.buscar(agenda, nao_alocadas, rng, max_tentativas,
+                                        estatisticas=estatisticas, verificar=verificar)
+        atual = salas_por_aula(agenda, aulas, instancia)
+    elite.inserir(atual, score)
+    return agenda, score, [aulas[i] for i, s in enumerate(atual) if s < 0]
+
+
+# =========================
+# Memo de soluções por assinatura de horário
+# =========================
+
+class MemoHorarios:
+    """
+    Cache LRU da melhor atribuição de salas já encontrada para cada
+    assinatura de horário: (impressão das salas da instância, tamanhos das
+    turmas em ordem decrescente, máscara de salas livres). Como a
+    contribuição de uma aula ao score só depende do seu número de alunos e da
+    sala, a mesma atribuição vale para qualquer (dia, horario) com a mesma
+    assinatura, nesta execução ou em outra com as mesmas salas.
+    Uma entrada só é reaproveitada depois de observada `confirmacoes` vezes
+    (horários buscados com essa assinatura); até lá o horário continua
+    passando pela construção e pela busca local.
+    """
+
+    def __init__(self, capacidade=4096, confirmacoes=5):
+        self.capacidade = capacidade
+        self.confirmacoes = confirmacoes
+        self.entradas = OrderedDict()  # assinatura -> [valor, atribuicao, vistos]
+        self.acertos = 0
+        self.faltas = 0
+        self.base = {}  # assinatura -> vistos no momento da cópia (novo)
+
+    @staticmethod
+    def impressao(instancia):
+        """
+        Identifica as salas (capacidade e prioridade, na ordem) da instância.
+        """
+        salas_instancia = [(sala.capacidade, sala.prioridade) for sala in instancia.salas]
+        return hashlib.sha1(repr(salas_instancia).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def assinatura(impressao, aulas_horario, livres):
+        return impressao, tuple(sorted((aula.alunos for aula in aulas_horario), reverse=True)), livres
+
+    def consultar(self, assinatura):
+        """
+        Atribuição confirmada (salas na ordem dos tamanhos, -1 = fora) ou None.
+        """
+        entrada = self.entradas.get(assinatura)
+        if entrada is None or entrada[2] < self.confirmacoes:
+            self.faltas += 1
+            return None
+        self.entradas.move_to_end(assinatura)
+        self.acertos += 1
+        return entrada[1]
+
+    def registrar(self, assinatura, atribuicao, valor, vistos=1):
+        entrada = self.entradas.get(assinatura)
+        if entrada is None:
+            self.entradas[assinatura] = [valor, tuple(atribuicao), vistos]
+            if len(self.entradas) > self.capacidade:
+                self.entradas.popitem(last=False)
+            return
+        if valor > entrada[0] + TOLERANCIA_SCORE:
+            entrada[0] = valor
+            entrada[1] = tuple(atribuicao)
+        entrada[2] += vistos
+        self.entradas.move_to_end(assinatura)
+
+    def novo(self):
+        """
+        Cópia com as mesmas entradas (ex.: para cada processo do pool). A
+        cópia guarda quantas vezes cada assinatura já tinha sido vista, para
+        que combinar() some só as observações novas.
+        """
+        copia = MemoHorarios(self.capacidade, self.confirmacoes)
+        copia.entradas = OrderedDict((k, list(v)) for k, v in self.entradas.items())
+        copia.base = {k: v[2] for k, v in self.entradas.items()}
+        return copia
+
+    def combinar(self, outro):
+        """
+        Junta as observações de uma cópia de novo(); várias cópias do mesmo
+        memo podem ser combinadas, cada uma contribuindo só com o que viu.
+        """
+        for assinatura, (valor, atribuicao, vistos) in outro.entradas.items():
+            novos = vistos - outro.base.get(assinatura, 0)
+            self.registrar(assinatura, atribuicao, valor, max(0, novos))
+        self.acertos += outro.acertos
+        self.faltas += outro.faltas
+
+    def salvar(self, caminho):
+        """
+        Grava as entradas (da menos à mais recente) em JSON.
+        """
+        entradas = [[impressao, list(tamanhos), livres, valor, list(atribuicao), vistos]
+                    for (impressao, tamanhos, livres), (valor, atribuicao, vistos)
+                    in self.entradas.items()]
+        temporario = caminho + ".tmp"
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump({"entradas": entradas}, arquivo)
+        os.replace(temporario, caminho)
+
+    def carregar(self, caminho):
+        """
+        Acrescenta as entradas de um arquivo de salvar(); um arquivo
+        inexistente ou corrompido é ignorado.
+        Retorna o número de entradas lidas.
+        """
+        try:
+            with open(caminho, 'r', encoding='utf-8') as arquivo:
+                entradas = json.load(arquivo)["entradas"]
+            for impressao, tamanhos, livres, valor, atribuicao, vistos in entradas:
+                self.registrar((impressao, tuple(tamanhos), livres), atribuicao, valor, vistos)
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0
+        return len(entradas)
+
+    def resumo(self):
+        consultas = self.acertos + self.faltas
+        return {"entradas": len(self.entradas), "acertos": self.acertos, "faltas": self.faltas,
+                "taxa_acerto": self.acertos / consultas if consultas else 0}
+
+
+class _HorariosMemo:
+    """
+    Aulas de cada (dia, horario) ordenadas por tamanho, com a assinatura
+    usada no MemoHorarios (todas as salas livres: a construção parte de uma
+    agenda vazia).
+    """
+    def __init__(self, aulas, instancia):
+        livres = instancia.indice.completa
+        impressao = MemoHorarios.impressao(instancia)
+        self.grupos = {}
+        for (d, h), grupo in agrupar_por_horario(aulas).items():
+            ordenadas = sorted(grupo, key=lambda aula: -aula.alunos)
+            self.grupos[(d, h)] = (ordenadas, MemoHorarios.assinatura(impressao, ordenadas, livres))
+
+    def aplicar(self, agenda, chave, atribuicao, instancia):
+        """
+        Copia a atribuição do memo para o horário; retorna as aulas que ficam fora.
+        """
+        d, h = chave
+        fora = []
+        compacta = isinstance(agenda, AgendaCompacta)
+        for aula, s in zip(self.grupos[chave][0], atribuicao):
+            if s < 0:
+                fora.append(aula)
+                continue
+            if compacta:
+                agenda.alocar(s, d, h, aula)
+                continue
+            slot = agenda[s][d][h]
+            slot.ocupado = 1
+            slot.aula = aula
+        return fora
+
+    def registrar(self, memo, agenda, chaves, instancia):
+        """
+        Registra no memo a atribuição atual de cada horário de `chaves`.
+        """
+        for chave in chaves:
+            ordenadas, assinatura = self.grupos[chave]
+            d, h = chave
+            if isinstance(agenda, AgendaCompacta):
+                sala_de = {id(agenda.aulas[idx]): s for s, idx in enumerate(agenda.coluna(d, h))
+                           if idx >= 0}
+            else:
+                sala_de = {id(agenda[s][d][h].aula): s for s in range(instancia.n_salas)
+                           if agenda[s][d][h].ocupado and agenda[s][d][h].aula is not None}
+            atribuicao = [sala_de.get(id(aula), -1) for aula in ordenadas]
+            valor = sum(contribuicao_slot(s, aula, instancia)
+                        for aula, s in zip(ordenadas, atribuicao) if s >= 0)
+            memo.registrar(assinatura, atribuicao, valor)
+
+
+def _iteracao_grasp(aulas, agenda_trabalho, rng, instancia, alpha=None, max_tentativas=100,
+                    verificar_delta=False, estatisticas=None, elite=None, memo=None,
+                    horarios_memo=None, busca=None, construcao=None):
+    """
+    Uma iteração do GRASP sobre agenda_trabalho, comum a _grasp_sequencial e
+    grasp_anytime: construção (com a EstrategiaConstrucao construcao e, com
+    memo, copiando os horários confirmados),
+    busca local com o motor busca (BuscaLocal; padrão: BuscaAleatoria) e,
+    com elite, path relinking. Com estatisticas, acumula o tempo de cada
+    fase.
+    Retorna: tupla (agenda, score, aulas_nao_alocadas)
+    """
+    medir = estatisticas is not None
+    relogio = time.perf_counter
+    if busca is None:
+        busca = BuscaAleatoria(aulas, instancia)
+    if medir:
+        t0 = relogio()
+    if horarios_memo is None:
+        agenda_inicial, aulas_nao_alocadas = construir_solucao_grasp(
+            aulas, agenda_trabalho, rng, instancia, alpha, estrategia=construcao)
+        horarios_busca = None
+        tentativas = max_tentativas
+    else:
+        # horários com atribuição confirmada no memo são copiados; só os
+        # demais passam pela construção e pela busca local
+        copiados = {}
+        for chave, (_, assinatura) in horarios_memo.grupos.items():
+            atribuicao = memo.consultar(assinatura)
+            if atribuicao is not None:
+                copiados[chave] = atribuicao
+        horarios_busca = [chave for chave in horarios_memo.grupos if chave not in copiados]
+        agenda_inicial, aulas_nao_alocadas = construir_solucao_grasp(
+            [aula for aula in aulas if (aula.dia, aula.horario) not in copiados],
+            agenda_trabalho, rng, instancia, alpha, estrategia=construcao)
+        for chave, atribuicao in copiados.items():
+            aulas_nao_alocadas.extend(horarios_memo.aplicar(agenda_inicial, chave, atribuicao, instancia))
+        tentativas = -(-max_tentativas * len(horarios_busca) // max(1, len(horarios_memo.grupos)))
+    if medir:
+        t1 = relogio()
+    if horarios_busca == []:
+        agenda, score = agenda_inicial, avaliar_agenda(agenda_inicial, instancia)
+    else:
+        agenda, score, aulas_nao_alocadas = busca.buscar(
+            agenda_inicial, aulas_nao_alocadas, rng, tentativas, horarios_busca,
+            estatisticas, verificar_delta)
+    if horarios_memo is not None:
+        horarios_memo.registrar(memo, agenda, horarios_busca, instancia)
+    if medir:
+        t2 = relogio()
+
+    if elite is not None:
+        agenda, score, aulas_nao_alocadas = _religar_com_elite(
+            agenda, score, aulas, elite, rng, instancia, max_tentativas,
+            verificar_delta, estatisticas, busca)
+
+    if medir:
+        tempos = estatisticas.tempos
+        tempos["construcao"] += t1 - t0
+        tempos["busca_local"] += t2 - t1
+        tempos["religamento"] += relogio() - t2
+    return agenda, score, aulas_nao_alocadas
+
+
+def _grasp_sequencial(aulas, iteracoes, rng, instancia, verificar_delta=False, compacta=False,
+                      alpha=None, max_tentativas=100, estatisticas=None, callback=None,
+                      reativo=None, elite=None, memo=None, busca_local="aleatoria",
+                      construcao=None):
     melhor_global = None
     melhor_score_global = float("-inf")
     melhor_aulas_nao_alocadas = []  # Rastrear aulas não alocadas da melhor solução
+    medir = estatisticas is not None
+    relogio = time.perf_counter
+
+    # Uma única agenda de trabalho é reaproveitada em todas as iterações;
+    # só se tira cópia quando surge uma nova melhor solução global.
+    # compacta=True usa AgendaCompacta no lugar da grade de SlotAgenda.
+    agenda_trabalho = (AgendaCompacta(aulas, instancia) if compacta
+                       else criar_agenda_vazia(instancia))
+    horarios_memo = _HorariosMemo(aulas, instancia) if memo is not None else None
+    busca = criar_busca_local(busca_local, aulas, instancia)
+
+    for iteracao in range(iteracoes):
+        if reativo is not None:
+            alpha = reativo.sortear(rng)
+        agenda_refinada, score, aulas_nao_alocadas = _iteracao_grasp(
+            aulas, agenda_trabalho, rng, instancia, alpha, max_tentativas, verificar_delta,
+            estatisticas, elite, memo, horarios_memo, busca, construcao)
+
+        if reativo is not None:
+            reativo.registrar(score)
+
+        melhorou = score > melhor_score_global
+        if melhorou:
+            if medir:
+                t0 = relogio()
+            melhor_score_global = score
+            melhor_global = clonar_agenda(agenda_refinada, instancia)
+            melhor_aulas_nao_alocadas = aulas_nao_alocadas
+
+        if medir:
+            if melhorou:
+                estatisticas.tempos["clonagem"] += relogio() - t0
+                estatisticas.melhorias.append((iteracao, score))
+            estatisticas.iteracoes += 1
+            estatisticas.scores.append(score)
+            estatisticas.nao_alocadas.append(len(aulas_nao_alocadas))
+        if callback is not None:
+            callback(iteracao, score, melhor_score_global, len(aulas_nao_alocadas))
+
+    return melhor_global, melhor_score_global, melhor_aulas_nao_alocadas
+
+
+def _trabalho_grasp(aulas, iteracoes, semente, instancia, opcoes):
+    """
+    Executado em um processo do pool: roda suas iterações com um
+    random.Random próprio e devolve a melhor solução por índices de aula
+    (sala, dia, horario, aula_idx), para o processo pai remontar a agenda
+    com os objetos Aula originais.
+    """
+    rng = random.Random(semente)
+    agenda, score, nao_alocadas = _grasp_sequencial(aulas, iteracoes, rng, instancia, **opcoes)
+    estatisticas = opcoes.get("estatisticas")
+    reativo = opcoes.get("reativo")
+    elite = opcoes.get("elite")
+    memo = opcoes.get("memo")
+    if agenda is None:
+        return None, score, [], estatisticas, reativo, elite, memo
+
+    indices = {id(aula): i for i, aula in enumerate(aulas)}
+    alocacao = [(s, d, h, indices[id(agenda[s][d][h].aula)])
+                for s in range(instancia.n_salas)
+                for d in range(instancia.n_dias)
+                for h in range(instancia.n_horarios)
+                if agenda[s][d][h].ocupado and agenda[s][d][h].aula is not None]
+    return (alocacao, score, [indices[id(aula)] for aula in nao_alocadas], estatisticas, reativo,
+            elite, memo)
+
+
+def _grasp_paralelo(aulas, iteracoes, processos, semente, instancia, opcoes, estatisticas=None):
+    # Cada processo recebe uma semente derivada da semente mestre e uma fatia
+    # fixa das iterações: o resultado só depende de (semente, processos).
+    mestre = random.Random(semente)
+    sementes = [mestre.randrange(2**63) for _ in range(processos)]
+    base, resto = divmod(iteracoes, processos)
+    fatias = [base + (1 if i < resto else 0) for i in range(processos)]
+
+    # Cada processo coleta as próprias estatísticas, aprende o próprio alpha
+    # reativo e mantém o próprio pool de elite e memo; o pai combina tudo.
+    reativo = opcoes.get("reativo")
+    elite = opcoes.get("elite")
+    memo = opcoes.get("memo")
+    opcoes = dict(opcoes, estatisticas=EstatisticasGrasp() if estatisticas is not None else None,
+                  reativo=reativo.novo() if reativo is not None else None,
+                  elite=elite.novo() if elite is not None else None,
+                  memo=memo.novo() if memo is not None else None)
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = [executor.submit(_trabalho_grasp, aulas, n, sem, instancia, opcoes)
+                   for n, sem in zip(fatias, sementes) if n > 0]
+        resultados = [f.result() for f in futuros]
+
+    melhor_global = None
+    melhor_score_global = float("-inf")
+    melhor_aulas_nao_alocadas = []
+    deslocamento = 0
+
+    # Redução na ordem dos processos: empates ficam com o de menor índice.
+    for (alocacao, score, nao_alocadas, est_processo, reat_processo, elite_processo,
+         memo_processo), n in zip(resultados, [n for n in fatias if n > 0]):
+        if estatisticas is not None and est_processo is not None:
+            estatisticas.combinar(est_processo, deslocamento)
+        if reativo is not None and reat_processo is not None:
+            reativo.combinar(reat_processo)
+        if elite is not None and elite_processo is not None:
+            elite.combinar(elite_processo)
+        if memo is not None and memo_processo is not None:
+            memo.combinar(memo_processo)
+        deslocamento += n
+        if alocacao is not None and score > melhor_score_global:
+            agenda = (AgendaCompacta(aulas, instancia) if opcoes.get("compacta")
+                      else criar_agenda_vazia(instancia))
+            for s, d, h, a_idx in alocacao:
+                slot = agenda[s][d][h]
+                slot.ocupado = 1
+                slot.aula = aulas[a_idx]
+            melhor_global = agenda
+            melhor_score_global = score
+            melhor_aulas_nao_alocadas = [aulas[i] for i in nao_alocadas]
+
+    return melhor_global, melhor_score_global, melhor_aulas_nao_alocadas
+
+
+def grasp(aulas, iteracoes=20, verificar_delta=False, compacta=False, processos=None, semente=None,
+          instancia=None, alpha=None, estatisticas=None, callback=None, max_tentativas=100,
+          reativo=None, elite=None, memo=None, busca_local="aleatoria", construcao=None):
+    """
+    Executa iteracoes de construção + busca local e devolve a melhor solução.
+    processos > 1 distribui as iterações em um ProcessPoolExecutor, cada
+    processo com seu próprio random.Random derivado de semente; o resultado é
+    reprodutível para a mesma semente e o mesmo número de processos.
+    Sem semente, o modo sequencial usa o módulo random global.
+    alpha substitui o ALPHA global na construção; max_tentativas vai para
+    o motor de busca local.
+    estatisticas: EstatisticasGrasp a preencher com tempos por fase, movimentos
+    e evolução por iteração (sem ela, nada é medido).
+    reativo: AlphaReativo que sorteia o alpha de cada iteração e aprende a
+    distribuição (ignora alpha); ao final, reativo.relatorio() a descreve.
+    elite: PoolElite; a cada iteração a solução da busca local é religada
+    (path relinking) a um membro do pool e o resultado é oferecido a ele.
+    memo: MemoHorarios; horários cuja assinatura já tem atribuição confirmada
+    são copiados dela, e a busca local (com max_tentativas proporcional) só
+    percorre os demais.
+    busca_local: nome do motor de busca local em BUSCAS_LOCAIS ("aleatoria",
+    "lote", "vnd", "recozimento") ou um objeto BuscaLocal (só no modo
+    sequencial; no paralelo, use o nome).
+    construcao: EstrategiaConstrucao (ordem das aulas, tipo de RCL e viés do
+    sorteio) usada em todas as iterações.
+    callback(iteracao, score, melhor_score, n_nao_alocadas) é chamado ao fim
+    de cada iteração (só no modo sequencial).
+    Retorna: tupla (agenda, score, aulas_nao_alocadas)
+    """
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+    opcoes = dict(verificar_delta=verificar_delta, compacta=compacta, alpha=alpha,
+                  max_tentativas=max_tentativas, reativo=reativo, elite=elite, memo=memo,
+                  busca_local=busca_local, construcao=construcao)
+    if processos is not None and processos > 1:
+        if semente is None:
+            semente = random.randrange(2**63)
+        return _grasp_paralelo(aulas, iteracoes, processos, semente, instancia, opcoes, estatisticas)
+
+    rng = random.Random(semente) if semente is not None else random
+    return _grasp_sequencial(aulas, iteracoes, rng, instancia, estatisticas=estatisticas,
+                             callback=callback, **opcoes)
+
+
+# =========================
+# GRASP "anytime": orçamento de tempo, estagnação e limite superior
+# =========================
+
+def limite_superior_score(aulas, instancia=None, exato=True, prazo=None):
+    """
+    Limite para o score de uma agenda, usado pelo grasp_anytime para parar cedo.
+    exato=True (padrão): as restrições só acoplam aulas do mesmo (dia, horario),
+    então somar o ótimo de resolver_horario_exato de cada horário dá o menor
+    número possível de aulas não alocadas e o maior score entre as agendas
+    com esse número (é o score de resolver_exato, logo é atingível). Custa
+    uma atribuição por horário; com prazo (instante de time.perf_counter) e o
+    cálculo passando dele, desiste e retorna None.
+    exato=False: limite rápido e frouxo, cada aula na sua melhor sala viável
+    ignorando conflitos (aulas de contribuição negativa contam 0); quase
+    nunca é atingido quando há aulas disputando salas.
+    Retorna: tupla (limite, minimo_nao_alocadas), ou None se o prazo acabou
+    """
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+
+    if exato:
+        limite = 0
+        nao_alocadas = sum(1 for aula in aulas if aula.dia is None or aula.horario is None)
+        for grupo in agrupar_por_horario(aulas).values():
+            if prazo is not None and time.perf_counter() > prazo:
+                return None
+            pares, sobras = resolver_horario_exato(grupo, instancia)
+            limite += sum(contribuicao_slot(s_idx, aula, instancia) for aula, s_idx in pares)
+            nao_alocadas += len(sobras)
+        return limite, nao_alocadas
+
+    indice = instancia.indice
+    limite = 0
+    sem_sala = 0
+    for aula in aulas:
+        viaveis = posicoes_bits(indice.mascara_viaveis(aula.alunos))
+        if not viaveis:
+            sem_sala += 1
+            continue
+        melhor = max(contribuicao_slot(indice.ordem[k], aula, instancia) for k in viaveis)
+        limite += max(0, melhor)
+    return limite, sem_sala
+
+
+def grasp_anytime(aulas, tempo_limite=None, estagnacao=None, max_iteracoes=None, instancia=None,
+                  semente=None, alpha=None, max_tentativas=None, limite="exato", estatisticas=None,
+                  reativo=None, elite=None, memo=None, busca_local="aleatoria",
+                  construcao=None):
+    """
+    GRASP sem número fixo de iterações: é um gerador que produz
+    (agenda, score, aulas_nao_alocadas, iteracao) a cada nova melhor solução,
+    e o chamador pode parar quando quiser. Também para sozinho:
+      - tempo_limite: segundos de relógio de parede;
+      - estagnacao: iterações seguidas sem melhora;
+      - max_iteracoes: total de iterações;
+      - limite ("exato", "relaxado" ou None): assim que a melhor solução
+        atinge limite_superior_score (calculado uma vez, antes das
+        iterações), não há como melhorar. O limite "exato" soma o ótimo de
+        cada horário e é atingível; com tempo_limite, o cálculo desiste
+        ao passar da metade do orçamento (conferido entre horários) e o
+        GRASP segue sem limite. "relaxado" é instantâneo, mas frouxo.
+    max_tentativas da busca local cresce com a instância (padrão:
+    max(100, nº de aulas)). reativo, elite, memo, busca_local e construcao:
+    como em grasp().
+    Cada agenda produzida é uma cópia independente.
+    """
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+    if max_tentativas is None:
+        max_tentativas = max(100, len(aulas))
+    rng = random.Random(semente) if semente is not None else random
+    relogio = time.perf_counter
+    inicio = relogio()
+
+    limite_score = None
+    if limite is not None:
+        prazo = inicio + tempo_limite / 2 if tempo_limite is not None else None
+        calculado = limite_superior_score(aulas, instancia, exato=(limite == "exato"), prazo=prazo)
+        if calculado is not None:
+            limite_score, minimo_nao_alocadas = calculado
+
+    melhor_score = float("-inf")
+    agenda_trabalho = criar_agenda_vazia(instancia)
+    iteracao = 0
+    sem_melhora = 0
+
+    horarios_memo = _HorariosMemo(aulas, instancia) if memo is not None else None
+    busca = criar_busca_local(busca_local, aulas, instancia)
+
+    while max_iteracoes is None or iteracao < max_iteracoes:
+        if reativo is not None:
+            alpha = reativo.sortear(rng)
+        agenda, score, nao_alocadas = _iteracao_grasp(
+            aulas, agenda_trabalho, rng, instancia, alpha, max_tentativas,
+            estatisticas=estatisticas, elite=elite, memo=memo, horarios_memo=horarios_memo,
+            busca=busca, construcao=construcao)
+        if reativo is not None:
+            reativo.registrar(score)
+        if estatisticas is not None:
+            estatisticas.iteracoes += 1
+            estatisticas.scores.append(score)
+            estatisticas.nao_alocadas.append(len(nao_alocadas))
+
+        if score > melhor_score:
+            melhor_score = score
+            sem_melhora = 0
+            if estatisticas is not None:
+                estatisticas.melhorias.append((iteracao, score))
+            yield clonar_agenda(agenda, instancia), score, list(nao_alocadas), iteracao
+
+            if (limite_score is not None and score >= limite_score - TOLERANCIA_SCORE
+                    and len(nao_alocadas) <= minimo_nao_alocadas):
+                return
+        else:
+            sem_melhora += 1
+
+        iteracao += 1
+        if estagnacao is not None and sem_melhora >= estagnacao:
+            return
+        if tempo_limite is not None and relogio() - inicio >= tempo_limite:
+            return
+
+
+# =========================
+# Solver exato por horário (emparelhamento bipartido de peso máximo)
+# =========================
+
+def agrupar_por_horario(aulas):
+    """
+    Agrupa as aulas por (dia, horario), preservando a ordem de leitura.
+    Aulas sem dia ou horário definidos ficam de fora.
+    """
+    grupos = {}
+    for aula in aulas:
+        if aula.dia is None or aula.horario is None:
+            continue
+        grupos.setdefault((aula.dia, aula.horario), []).append(aula)
+    return grupos
 
-    for _ in range(iteracoes):
-        agenda_inicial, aulas_nao_alocadas = construir_solucao_grasp(aulas)
-        agenda_refinada, score = buscar_melhora_local(agenda_inicial)
 
-        if score > melhor_score_global:
-            melhor_score_global = score
-            melhor_global = agenda_refinada
-            melhor_aulas_nao_alocadas = aulas_nao_alocadas
+def _hungaro(custo):
+    """
+    Algoritmo húngaro (com potenciais) para uma matriz de custo n x m, n <= m.
+    Retorna, para cada linha, a coluna atribuída, minimizando o custo total.
+    """
+    n = len(custo)
+    m = len(custo[0])
+    inf = float("inf")
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    p = [0] * (m + 1)    # p[j] = linha (1-based) atribuída à coluna j
+    via = [0] * (m + 1)
 
-    return melhor_global, melhor_score_global, melhor_aulas_nao_alocadas
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        usado = [False] * (m + 1)
+        while True:
+            usado[j0] = True
+            i0 = p[j0]
+            linha = custo[i0 - 1]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if not usado[j]:
+                    atual = linha[j - 1] - u[i0] - v[j]
+                    if atual < minv[j]:
+                        minv[j] = atual
+                        via[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if usado[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        # reconstrói o caminho aumentante
+        while True:
+            j1 = via[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+
+    atribuicao = [-1] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            atribuicao[p[j] - 1] = j - 1
+    return atribuicao
+
+
+def resolver_horario_exato(aulas_horario, instancia=None):
+    """
+    Resolve um único (dia, horario) de forma ótima: emparelhamento de
+    cardinalidade máxima e, entre esses, de peso máximo, com peso
+    prioridade - 0.1*sobra (o mesmo de avaliar_agenda).
+    Retorna: tupla (pares, aulas_nao_alocadas), pares = [(aula, sala_idx)]
+    """
+    if not aulas_horario:
+        return [], []
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+
+    pesos = [[contribuicao_slot(s_idx, aula, instancia) if sala.capacidade >= aula.alunos else None
+              for s_idx, sala in enumerate(instancia.salas)]
+             for aula in aulas_horario]
+
+    # Um bônus grande por par viável faz a cardinalidade dominar o peso.
+    bonus = 1 + 2 * sum(max((abs(w) for w in linha if w is not None), default=0)
+                        for linha in pesos)
+    custo = [[-(bonus + w) if w is not None else 0 for w in linha] for linha in pesos]
+
+    transposta = len(aulas_horario) > instancia.n_salas
+    if transposta:
+        custo = [list(coluna) for coluna in zip(*custo)]
+    atribuicao = _hungaro(custo)
+
+    pares = []
+    for linha, coluna in enumerate(atribuicao):
+        a_idx, s_idx = (coluna, linha) if transposta else (linha, coluna)
+        if a_idx >= 0 and s_idx >= 0 and pesos[a_idx][s_idx] is not None:
+            pares.append((aulas_horario[a_idx], s_idx))
+
+    alocadas = {id(aula) for aula, _ in pares}
+    nao_alocadas = [aula for aula in aulas_horario if id(aula) not in alocadas]
+    return pares, nao_alocadas
+
+
+def resolver_exato(aulas, instancia=None):
+    """
+    Solver exato: como as restrições só acoplam aulas do mesmo (dia, horario),
+    cada horário é um problema de atribuição independente, resolvido de forma
+    ótima por resolver_horario_exato.
+    Retorna a mesma tupla de grasp(): (agenda, score, aulas_nao_alocadas)
+    """
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+    agenda = criar_agenda_vazia(instancia)
+    alocadas = set()
+
+    for (d, h), grupo in agrupar_por_horario(aulas).items():
+        pares, _ = resolver_horario_exato(grupo, instancia)
+        for aula, s_idx in pares:
+            slot = agenda[s_idx][d][h]
+            slot.ocupado = 1
+            slot.aula = aula
+            alocadas.add(id(aula))
+
+    aulas_nao_alocadas = [aula for aula in aulas if id(aula) not in alocadas]
+    return agenda, avaliar_agenda(agenda, instancia), aulas_nao_alocadas
+
+
+# =========================
+# Reagendamento de aulas não alocadas em outros horários
+# =========================
+
+class IndiceDisponibilidade:
+    """
+    Índices para achar, sem varrer a agenda, os (dia, horario) que ainda
+    comportam uma aula. Horários são bits de máscaras indexadas por
+    IndiceSalas.chave():
+      - professores: professor -> máscara dos horários em que já dá aula;
+      - com_sala[k]: horários com alguma sala livre na posição >= k da ordem
+        do IndiceSalas, isto é, com sala livre de capacidade >= capacidades[k].
+    Aulas sem professor não entram no índice de professores.
+    """
+    def __init__(self, agenda, instancia=None):
+        if instancia is None:
+            instancia = INSTANCIA_PADRAO
+        self.instancia = instancia
+        indice = self.indice = instancia.indice
+        self.ocupacao = indice.mascaras_ocupacao(agenda, instancia)
+        self.professores = {}
+        for s in range(instancia.n_salas):
+            for d in range(instancia.n_dias):
+                for h in range(instancia.n_horarios):
+                    slot = agenda[s][d][h]
+                    if slot.ocupado and slot.aula is not None and slot.aula.professor:
+                        professor = slot.aula.professor
+                        self.professores[professor] = (self.professores.get(professor, 0)
+                                                       | 1 << indice.chave(d, h))
+
+        # maior posição livre de cada horário (-1 se cheio)
+        self.maior_livre = [(indice.completa & ~ocupacao).bit_length() - 1
+                            for ocupacao in self.ocupacao]
+        self.com_sala = [0] * instancia.n_salas
+        for chave, maior in enumerate(self.maior_livre):
+            for k in range(maior + 1):
+                self.com_sala[k] |= 1 << chave
+
+    def candidatos(self, aula):
+        """
+        Máscara dos horários com sala livre que comporta a aula e em que o
+        professor está livre.
+        """
+        k = bisect_left(self.indice.capacidades, aula.alunos)
+        if k >= len(self.com_sala):
+            return 0
+        return self.com_sala[k] & ~self.professores.get(aula.professor, 0)
+
+    def ocupar(self, posicao_sala, chave, professor):
+        self.ocupacao[chave] |= 1 << posicao_sala
+        if professor:
+            self.professores[professor] = self.professores.get(professor, 0) | 1 << chave
+        anterior = self.maior_livre[chave]
+        novo = (self.indice.completa & ~self.ocupacao[chave]).bit_length() - 1
+        for k in range(novo + 1, anterior + 1):
+            self.com_sala[k] &= ~(1 << chave)
+        self.maior_livre[chave] = novo
+
+
+def reagendar_nao_alocadas(agenda, aulas_nao_alocadas, instancia=None):
+    """
+    Fase de reparo opcional: tenta colocar cada aula não alocada em outro
+    (dia, horario) com sala livre de capacidade suficiente, sem dar duas
+    aulas ao mesmo professor no mesmo horário. As maiores turmas são tratadas
+    primeiro; entre os horários possíveis, prefere o mesmo dia e o horário
+    mais próximo do original, e nele a sala de menor sobra (ordem da RCL).
+    A agenda é alterada no lugar e recebe cópias das aulas com o novo
+    dia/horário; as aulas originais não são modificadas.
+    Retorna: tupla (reagendadas, restantes), reagendadas com pares
+    (aula_original, aula_reagendada)
+    """
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+    indice = instancia.indice
+    disponibilidade = IndiceDisponibilidade(agenda, instancia)
+    reagendadas = []
+    restantes = []
+
+    for aula in sorted(aulas_nao_alocadas, key=lambda a: -a.alunos):
+        candidatos = disponibilidade.candidatos(aula)
+        if not candidatos:
+            restantes.append(aula)
+            continue
+
+        def distancia(chave):
+            d, h = divmod(chave, instancia.n_horarios)
+            return (d != aula.dia, abs(d - aula.dia), abs(h - aula.horario), chave)
+
+        chave = min(posicoes_bits(candidatos), key=distancia)
+        livres = indice.mascara_viaveis(aula.alunos) & ~disponibilidade.ocupacao[chave]
+        pos = (livres & -livres).bit_length() - 1
+        d, h = divmod(chave, instancia.n_horarios)
+
+        nova = Aula(aula.disciplina, aula.professor, aula.alunos, d, h)
+        slot = agenda[indice.ordem[pos]][d][h]
+        slot.ocupado = 1
+        slot.aula = nova
+        disponibilidade.ocupar(pos, chave, aula.professor)
+        reagendadas.append((aula, nova))
+
+    # mantém a ordem original das que sobraram
+    pendentes = {id(aula) for aula in restantes}
+    restantes = [aula for aula in aulas_nao_alocadas if id(aula) in pendentes]
+    return reagendadas, restantes
+
+
+# =========================
+# Re-solução incremental (partida quente)
+# =========================
+
+def chave_aula(aula):
+    return (aula.disciplina, aula.professor, aula.alunos, aula.dia, aula.horario)
+
+
+def diferenca_aulas(aulas_anteriores, aulas_novas):
+    """
+    Casa as aulas das duas listas pela chave_aula; aulas repetidas casam na
+    ordem em que aparecem.
+    Retorna: tupla (pares, novas, removidas), pares com (anterior, nova)
+    """
+    disponiveis = {}
+    for aula in aulas_anteriores:
+        disponiveis.setdefault(chave_aula(aula), []).append(aula)
+    pares = []
+    novas = []
+    for aula in aulas_novas:
+        fila = disponiveis.get(chave_aula(aula))
+        if fila:
+            pares.append((fila.pop(0), aula))
+        else:
+            novas.append(aula)
+    removidas = [aula for fila in disponiveis.values() for aula in fila]
+    return pares, novas, removidas
+
+
+def _esvaziar_horarios(agenda, horarios, instancia):
+    for d, h in horarios:
+        for s in range(instancia.n_salas):
+            slot = agenda[s][d][h]
+            slot.ocupado = 0
+            slot.aula = None
+
+
+def resolver_incremental(aulas, agenda_anterior, aulas_anteriores, instancia=None, iteracoes=10,
+                         rng=random, alpha=None, max_tentativas=None):
+    """
+    Re-solução com partida quente depois de uma pequena mudança nas aulas.
+    Compara `aulas` com `aulas_anteriores` (as que geraram agenda_anterior):
+    nos (dia, horario) sem aulas incluídas ou removidas, as alocações da
+    agenda anterior são mantidas (com os novos objetos Aula); só os
+    horários afetados passam por iteracoes de construção + busca local
+    restritas a eles. Aulas inseridas em agenda_anterior por fora dessa lista
+    (ex.: pelo reagendamento) não são mantidas.
+    max_tentativas da busca local: padrão 20 por horário afetado.
+    Retorna: tupla (agenda, score, aulas_nao_alocadas, horarios_afetados)
+    """
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+    pares, novas, removidas = diferenca_aulas(aulas_anteriores, aulas)
+    afetados = sorted({(aula.dia, aula.horario) for aula in novas + removidas})
+    conjunto_afetados = set(afetados)
+    correspondente = {id(anterior): nova for anterior, nova in pares}
+
+    agenda = criar_agenda_vazia(instancia)
+    mantidas = set()
+    for s in range(instancia.n_salas):
+        for d in range(instancia.n_dias):
+            for h in range(instancia.n_horarios):
+                slot = agenda_anterior[s][d][h]
+                if (d, h) in conjunto_afetados or not slot.ocupado or slot.aula is None:
+                    continue
+                nova = correspondente.get(id(slot.aula))
+                if nova is not None:
+                    agenda[s][d][h].ocupado = 1
+                    agenda[s][d][h].aula = nova
+                    mantidas.add(id(nova))
+
+    pendentes = [aula for aula in aulas if (aula.dia, aula.horario) in conjunto_afetados]
+    if max_tentativas is None:
+        max_tentativas = 20 * len(afetados)
+
+    melhor_score = float("-inf")
+    melhor_alocacao = []
+    melhor_nao_alocadas = set()
+    for _ in range(iteracoes if pendentes else 0):
+        _esvaziar_horarios(agenda, afetados, instancia)
+        agenda, nao_alocadas = construir_solucao_grasp(pendentes, agenda, rng, instancia, alpha,
+                                                       reiniciar=False)
+        agenda, score = buscar_melhora_local(agenda, max_tentativas, rng=rng, instancia=instancia,
+                                             horarios=afetados)
+        if score > melhor_score:
+            melhor_score = score
+            melhor_alocacao = [(s, d, h, agenda[s][d][h].aula)
+                               for d, h in afetados for s in range(instancia.n_salas)
+                               if agenda[s][d][h].ocupado]
+            melhor_nao_alocadas = {id(aula) for aula in nao_alocadas}
+
+    _esvaziar_horarios(agenda, afetados, instancia)
+    for s, d, h, aula in melhor_alocacao:
+        agenda[s][d][h].ocupado = 1
+        agenda[s][d][h].aula = aula
+
+    aulas_nao_alocadas = [aula for aula in aulas
+                          if (id(aula) in melhor_nao_alocadas
+                              if (aula.dia, aula.horario) in conjunto_afetados
+                              else id(aula) not in mantidas)]
+    return agenda, avaliar_agenda(agenda, instancia), aulas_nao_alocadas, afetados
 
 
 # =========================
 # Leitura do CSV e extração de aulas
 # =========================
 
-def mapear_horario(horario_texto):
+_RE_OBSERVACAO_PROFESSOR = re.compile(r'\*+.*')
+_RE_ALUNOS = re.compile(r'\((\d+)\s*alunos?\)', re.IGNORECASE)
+
+
+def mapear_horario(horario_texto, instancia=None):
     """
-    Mapeia o texto do horário do CSV para o índice correspondente.
+    Mapeia o texto do horário do CSV para o índice correspondente:
+    o primeiro horário cujos marcadores aparecem todos no texto.
+    O resultado fica na tabela_horarios da instância, então cada texto
+    distinto só é analisado uma vez. A tabela guarda no máximo
+    LIMITE_TABELA_HORARIOS textos; ao encher, o mais antigo sai.
     """
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
     horario_texto = horario_texto.strip().lower()
+    tabela = instancia.tabela_horarios
+    if horario_texto in tabela:
+        return tabela[horario_texto]
     
-    if '8' in horario_texto and '10' in horario_texto:
-        return 0  # 08:00 às 10:00
-    elif '10' in horario_texto and '12' in horario_texto:
-        return 1  # 10:00 às 12:00
-    elif '13' in horario_texto and '15' in horario_texto:
-        return 2  # 13:30 às 15:30
-    elif '15' in horario_texto and '17' in horario_texto:
-        return 3  # 15:30 às 17:30
+    resultado = None
+    for idx, marcadores in enumerate(instancia.marcadores_horario):
+        if marcadores and all(m in horario_texto for m in marcadores):
+            resultado = idx
+            break
     
-    return None
+    if len(tabela) >= LIMITE_TABELA_HORARIOS:
+        del tabela[next(iter(tabela))]
+    tabela[horario_texto] = resultado
+    return resultado
 
 
-def mapear_dia(coluna_idx):
+def mapear_dia(coluna_idx, instancia=None):
     """
     Mapeia o índice da coluna para o dia da semana.
     Coluna 1 = Segunda (0), Coluna 2 = Terça (1), etc.
     """
-    if 1 <= coluna_idx <= 5:
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+    if 1 <= coluna_idx <= instancia.n_dias:
         return coluna_idx - 1
     return None
 
 
-def carregar_aulas_do_csv(caminho_csv="agenda.csv"):
+class RelatorioCarga:
     """
-    Lê o arquivo CSV e extrai as aulas (disciplina, professor, dia, horário).
-    Retorna uma lista de objetos Aula.
+    Contagem de linhas lidas, aulas extraídas e erros de cada arquivo CSV.
+    """
+    def __init__(self):
+        self.arquivos = {}  # caminho -> {"linhas": int, "aulas": int, "erros": [str]}
+
+    def arquivo(self, caminho):
+        return self.arquivos.setdefault(caminho, {"linhas": 0, "aulas": 0, "erros": []})
+
+    @property
+    def total_aulas(self):
+        return sum(info["aulas"] for info in self.arquivos.values())
+
+    @property
+    def total_erros(self):
+        return sum(len(info["erros"]) for info in self.arquivos.values())
+
+    def imprimir(self):
+        for caminho, info in self.arquivos.items():
+            marca = "✓" if not info["erros"] else "⚠"
+            print(f"{marca} {caminho}: {info['aulas']} aulas em {info['linhas']} linhas")
+            for erro in info["erros"]:
+                print(f"    - {erro}")
+
+
+def expandir_entradas(entradas):
     """
-    aulas = []
+    Converte um caminho, diretório, padrão glob (ou lista deles) na lista
+    ordenada de arquivos CSV correspondentes. Caminhos inexistentes são
+    mantidos para que o erro apareça no relatório da carga.
+    """
+    if isinstance(entradas, str):
+        entradas = [entradas]
+    arquivos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            arquivos.extend(sorted(glob.glob(os.path.join(entrada, '*.csv'))))
+        elif glob.has_magic(entrada):
+            arquivos.extend(sorted(glob.glob(entrada)))
+        else:
+            arquivos.append(entrada)
+    return arquivos
+
+
+def _aulas_do_arquivo(caminho_csv, instancia, info):
+    """
+    Gera as aulas de um único CSV, linha a linha, atualizando info.
+    """
+    n_colunas = 1 + instancia.n_dias  # primeira coluna + uma por dia
+    marcador_professor = instancia.marcador_professor
     professor_atual = None
     
-    try:
-        with open(caminho_csv, 'r', encoding='utf-8') as arquivo:
-            leitor = csv.reader(arquivo)
-            linhas = list(leitor)
-    except FileNotFoundError:
-        print(f"Erro: Arquivo '{caminho_csv}' não encontrado.")
-        return []
-    except Exception as e:
-        print(f"Erro ao ler arquivo CSV: {e}")
-        return []
-    
-    for linha in linhas:
-        if len(linha) < 6:
-            continue
-        
-        primeira_celula = linha[0].strip() if linha[0] else ""
-        
-        # Ignora linhas vazias, de cabeçalho de seção ou almoço
-        if not primeira_celula:
-            continue
-        if 'PROFESSORES' in primeira_celula.upper():
-            continue
-        if 'Almoço' in primeira_celula:
-            continue
-        
-        # Detecta se é uma linha de professor (nome seguido de dias da semana)
-        # Verifica se a segunda célula contém "Segunda"
-        if len(linha) > 1 and linha[1] and 'Segunda' in linha[1]:
-            professor_atual = primeira_celula.strip()
-            # Remove asteriscos e observações do nome
-            professor_atual = re.sub(r'\*+.*', '', professor_atual).strip()
-            continue
-        
-        # Detecta se é uma linha de horário
-        horario_idx = mapear_horario(primeira_celula)
-        
-        if horario_idx is not None and professor_atual:
-            # Percorre as colunas dos dias (1 a 5)
-            for col_idx in range(1, min(6, len(linha))):
+    with open(caminho_csv, 'r', encoding='utf-8', newline='') as arquivo:
+        for linha in csv.reader(arquivo):
+            info["linhas"] += 1
+            if len(linha) < n_colunas:
+                continue
+            
+            primeira_celula = linha[0].strip() if linha[0] else ""
+            
+            # Ignora linhas vazias, de cabeçalho de seção ou almoço
+            if not primeira_celula:
+                continue
+            if 'PROFESSORES' in primeira_celula.upper():
+                continue
+            if 'Almoço' in primeira_celula:
+                continue
+            
+            # Detecta se é uma linha de professor (nome seguido de dias da semana)
+            # Verifica se a segunda célula contém "Segunda"
+            if linha[1] and marcador_professor in linha[1]:
+                # Remove asteriscos e observações do nome
+                professor_atual = sys.intern(_RE_OBSERVACAO_PROFESSOR.sub('', primeira_celula).strip())
+                continue
+            
+            # Detecta se é uma linha de horário
+            horario_idx = mapear_horario(primeira_celula, instancia)
+            
+            if horario_idx is None or not professor_atual:
+                continue
+            
+            # Percorre as colunas dos dias (1 a n_dias)
+            for col_idx in range(1, n_colunas):
                 disciplina = linha[col_idx].strip() if linha[col_idx] else ""
                 
                 # Ignora células vazias, almoço ou apenas espaços
                 if not disciplina or disciplina.lower() == 'almoço':
                     continue
                 
-                dia_idx = mapear_dia(col_idx)
-                if dia_idx is None:
-                    continue
-                
                 # Limpa o nome da disciplina (remove quebras de linha, etc.)
-                disciplina = ' '.join(disciplina.split())
+                # (internada: a mesma disciplina se repete em vários horários e arquivos)
+                disciplina = sys.intern(' '.join(disciplina.split()))
                 
                 # Tenta extrair número de alunos se estiver no formato "(XX alunos)"
                 # Por padrão, usa 30 alunos se não especificado
                 alunos = 30
-                match_alunos = re.search(r'\((\d+)\s*alunos?\)', disciplina, re.IGNORECASE)
+                match_alunos = _RE_ALUNOS.search(disciplina)
                 if match_alunos:
                     alunos = int(match_alunos.group(1))
                 
-                # Cria a aula
-                aula = Aula(
+                info["aulas"] += 1
+                yield Aula(
                     disciplina=disciplina,
                     professor=professor_atual,
                     alunos=alunos,
-                    dia=dia_idx,
+                    dia=mapear_dia(col_idx, instancia),
                     horario=horario_idx
                 )
-                aulas.append(aula)
+
+
+def iterar_aulas_csv(entradas, instancia=None, relatorio=None):
+    """
+    Gerador de aulas sobre um ou vários CSVs (arquivo, diretório ou glob),
+    lendo linha a linha sem carregar os arquivos inteiros em memória.
+    Erros de leitura são registrados no relatorio (RelatorioCarga) e a
+    leitura segue para o próximo arquivo.
+    """
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+    if relatorio is None:
+        relatorio = RelatorioCarga()
+    
+    for caminho_csv in expandir_entradas(entradas):
+        info = relatorio.arquivo(caminho_csv)
+        try:
+            yield from _aulas_do_arquivo(caminho_csv, instancia, info)
+        except FileNotFoundError:
+            info["erros"].append(f"Arquivo '{caminho_csv}' não encontrado.")
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            info["erros"].append(f"Erro ao ler arquivo CSV (linha {info['linhas']}): {e}")
+
+
+def carregar_aulas_do_csv(caminho_csv="agenda.csv", instancia=None):
+    """
+    Lê o(s) arquivo(s) CSV e extrai as aulas (disciplina, professor, dia, horário).
+    caminho_csv pode ser um arquivo, um diretório ou um padrão glob.
+    Retorna uma lista de objetos Aula.
+    """
+    relatorio = RelatorioCarga()
+    aulas = list(iterar_aulas_csv(caminho_csv, instancia, relatorio))
+    
+    if len(relatorio.arquivos) > 1:
+        print()
+        relatorio.imprimir()
+    else:
+        for info in relatorio.arquivos.values():
+            for erro in info["erros"]:
+                print(f"Erro: {erro}")
     
     print(f"\n✓ Carregadas {len(aulas)} aulas do arquivo CSV.")
     return aulas
 
 
+# =========================
+# Cache persistente das aulas lidas
+# =========================
+
+VERSAO_PARSER = 1  # incrementar quando a extração de aulas do CSV mudar
+DIRETORIO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_aulas")
+LIMITE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def _chave_cache(arquivos, instancia):
+    """
+    Hash do conteúdo dos arquivos + versão do parser + parâmetros da
+    instância que afetam a leitura.
+    """
+    h = hashlib.sha256()
+    h.update(f"parser={VERSAO_PARSER}".encode())
+    h.update(repr((instancia.n_dias, instancia.marcadores_horario,
+                   instancia.marcador_professor)).encode())
+    for caminho in arquivos:
+        h.update(b"\0")
+        with open(caminho, 'rb') as arquivo:
+            for bloco in iter(lambda: arquivo.read(1 << 20), b''):
+                h.update(bloco)
+    return h.hexdigest()
+
+
+def _salvar_cache(caminho_cache, aulas):
+    """
+    Grava as aulas em formato binário compacto (marshal): as tabelas de
+    textos e as colunas array('i') de uma TabelaAulas.
+    """
+    tabela = TabelaAulas(aulas)
+    dados = (VERSAO_PARSER, tabela.professores, tabela.disciplinas,
+             tuple(coluna.tobytes() for coluna in tabela.colunas()))
+    temporario = caminho_cache + ".tmp"
+    with open(temporario, 'wb') as arquivo:
+        marshal.dump(dados, arquivo)
+    os.replace(temporario, caminho_cache)
+
+
+def _ler_cache(caminho_cache):
+    with open(caminho_cache, 'rb') as arquivo:
+        versao, professores, disciplinas, brutos = marshal.load(arquivo)
+    if versao != VERSAO_PARSER:
+        raise ValueError("versão de cache incompatível")
+
+    colunas = []
+    for bruto in brutos:
+        coluna = array('i')
+        coluna.frombytes(bruto)
+        colunas.append(coluna)
+    return TabelaAulas.de_colunas(professores, disciplinas, colunas).para_aulas()
+
+
+def _podar_cache(diretorio, limite_bytes):
+    """
+    Remove as entradas menos usadas recentemente (mtime) até o cache caber no limite.
+    """
+    entradas = []
+    for nome in os.listdir(diretorio):
+        caminho = os.path.join(diretorio, nome)
+        if nome.endswith(".bin") and os.path.isfile(caminho):
+            info = os.stat(caminho)
+            entradas.append((info.st_mtime, info.st_size, caminho))
+    total = sum(tamanho for _, tamanho, _ in entradas)
+    for _, tamanho, caminho in sorted(entradas):
+        if total <= limite_bytes:
+            break
+        try:
+            os.remove(caminho)
+            total -= tamanho
+        except OSError:
+            pass
+
+
+def carregar_aulas_com_cache(caminho_csv="agenda.csv", instancia=None,
+                             diretorio_cache=None, limite_bytes=LIMITE_CACHE_BYTES):
+    """
+    Como carregar_aulas_do_csv, mas guarda a lista de aulas já extraída em
+    disco, indexada pelo hash do conteúdo dos CSVs. Se o conteúdo não mudou,
+    a leitura vem do cache sem passar pelo parser.
+    """
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+    if diretorio_cache is None:
+        diretorio_cache = DIRETORIO_CACHE
+
+    try:
+        chave = _chave_cache(expandir_entradas(caminho_csv), instancia)
+    except OSError:
+        # arquivo ausente ou ilegível: o parser normal reporta o erro
+        return carregar_aulas_do_csv(caminho_csv, instancia)
+
+    caminho_cache = os.path.join(diretorio_cache, chave + ".bin")
+    if os.path.exists(caminho_cache):
+        try:
+            aulas = _ler_cache(caminho_cache)
+            os.utime(caminho_cache)  # marca como usado recentemente
+            print(f"\n✓ Carregadas {len(aulas)} aulas do cache.")
+            return aulas
+        except (OSError, EOFError, ValueError, TypeError, IndexError):
+            pass  # entrada corrompida ou de outra versão: relê o CSV
+
+    aulas = carregar_aulas_do_csv(caminho_csv, instancia)
+    if aulas:
+        try:
+            os.makedirs(diretorio_cache, exist_ok=True)
+            _salvar_cache(caminho_cache, aulas)
+            _podar_cache(diretorio_cache, limite_bytes)
+        except OSError as e:
+            print(f"⚠ Não foi possível gravar o cache: {e}")
+    return aulas
+
+
 def exemplo_aulas():
     # Função mantida para compatibilidade
     return [
@@ -665,15 +3687,471 @@ def exemplo_aulas():
     ]
 
 
+# =========================
+# Exportação (JSON / CSV)
+# =========================
+
+def listar_alocacoes(agenda, instancia=None):
+    """
+    Lista (sala_idx, dia, horario, aula) de todos os slots ocupados.
+    """
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+    alocacoes = []
+    for s_idx in range(instancia.n_salas):
+        for d in range(instancia.n_dias):
+            for h in range(instancia.n_horarios):
+                slot = agenda[s_idx][d][h]
+                if slot.ocupado and slot.aula is not None:
+                    alocacoes.append((s_idx, d, h, slot.aula))
+    return alocacoes
+
+
+def exportar_agenda_json(agenda, score, aulas_nao_alocadas, arquivo, instancia=None):
+    """
+    Escreve a agenda, o score e as aulas não alocadas como JSON em arquivo
+    (objeto de arquivo já aberto).
+    """
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+
+    def descrever(aula):
+        return {"disciplina": aula.disciplina, "professor": aula.professor, "alunos": aula.alunos,
+                "dia": instancia.dias[aula.dia] if aula.dia is not None else None,
+                "horario": instancia.horarios[aula.horario] if aula.horario is not None else None}
+
+    dados = {
+        "score": score,
+        "alocadas": [dict(descrever(aula), sala=instancia.salas[s_idx].nome)
+                     for s_idx, _, _, aula in listar_alocacoes(agenda, instancia)],
+        "nao_alocadas": [descrever(aula) for aula in aulas_nao_alocadas],
+    }
+    json.dump(dados, arquivo, ensure_ascii=False, indent=2)
+    arquivo.write("\n")
+
+
+def exportar_agenda_csv(agenda, aulas_nao_alocadas, arquivo, instancia=None):
+    """
+    Escreve uma linha por aula (alocada ou não) em arquivo, no formato CSV.
+    """
+    if instancia is None:
+        instancia = INSTANCIA_PADRAO
+    escritor = csv.writer(arquivo)
+    escritor.writerow(["Laboratório", "Dia", "Horário", "Disciplina", "Professor", "Alunos"])
+    for s_idx, d, h, aula in listar_alocacoes(agenda, instancia):
+        escritor.writerow([instancia.salas[s_idx].nome, instancia.dias[d], instancia.horarios[h],
+                           aula.disciplina, aula.professor, aula.alunos])
+    for aula in aulas_nao_alocadas:
+        escritor.writerow(["NÃO ALOCADA",
+                           instancia.dias[aula.dia] if aula.dia is not None else "",
+                           instancia.horarios[aula.horario] if aula.horario is not None else "",
+                           aula.disciplina, aula.professor, aula.alunos])
+
+
+# =========================
+# Execução em lote (vários CSVs, um por departamento)
+# =========================
+
+EXTENSOES_SAIDA = {"texto": ".txt", "json": ".json", "csv": ".csv", "pdf": ".pdf"}
+ARQUIVO_ESTADO_LOTE = "estado_lote.json"
+ARQUIVO_RESUMO_LOTE = "resumo_lote.json"
+
+
+def ler_trabalhos_lote(entradas, parametros):
+    """
+    Monta a lista de trabalhos do lote. Cada entrada é um manifesto JSON ou
+    um CSV, diretório ou padrão glob (um trabalho por CSV). O manifesto é
+    uma lista de trabalhos ou {"trabalhos": [...], + parâmetros padrão}; cada
+    trabalho tem "csv" e, opcionalmente, "nome", "instancia", "iteracoes",
+    "alpha" e "semente". No nível de cima, "semente" é a semente do lote.
+    Caminhos relativos partem da pasta do manifesto.
+    parametros: valores padrão (instancia, iteracoes, alpha, semente_lote).
+    """
+    if isinstance(entradas, str):
+        entradas = [entradas]
+    trabalhos = []
+    for entrada in entradas:
+        if not entrada.lower().endswith(".json"):
+            for caminho in expandir_entradas(entrada):
+                trabalhos.append(dict(parametros, csv=caminho))
+            continue
+
+        with open(entrada, 'r', encoding='utf-8') as arquivo:
+            manifesto = json.load(arquivo)
+        base = os.path.dirname(os.path.abspath(entrada))
+        padrao = dict(parametros)
+        if isinstance(manifesto, dict):
+            padrao.update((k, v) for k, v in manifesto.items() if k not in ("trabalhos", "semente"))
+            if "semente" in manifesto:
+                padrao["semente_lote"] = manifesto["semente"]
+            manifesto = manifesto.get("trabalhos", [])
+        for item in manifesto:
+            trabalho = dict(padrao, **item)
+            for campo in ("csv", "instancia"):
+                if isinstance(trabalho.get(campo), str):
+                    trabalho[campo] = os.path.join(base, trabalho[campo])
+            trabalhos.append(trabalho)
+
+    nomes = set()
+    for trabalho in trabalhos:
+        nome = trabalho.get("nome") or os.path.splitext(os.path.basename(trabalho["csv"]))[0]
+        if nome in nomes:
+            raise ValueError(f"nome de trabalho repetido no lote: {nome}")
+        nomes.add(nome)
+        trabalho["nome"] = nome
+    return trabalhos
+
+
+def _executar_trabalho_lote(trabalho, diretorio_saida, formato, memo=None):
+    """
+    Executado em um processo do pool: carga -> grasp -> exportação de um CSV.
+    memo: MemoHorarios (já com as entradas de lotes anteriores) ou None.
+    Retorna: tupla (resumo do trabalho, memo); erros viram o campo "erro"
+    """
+    nome = trabalho["nome"]
+    saida = os.path.join(diretorio_saida, nome + EXTENSOES_SAIDA[formato])
+    resumo = {"nome": nome, "csv": trabalho["csv"], "saida": saida, "semente": trabalho["semente"]}
+    relogio = time.perf_counter
+    try:
+        # mensagens de progresso dos processos vão para stderr
+        with redirect_stdout(sys.stderr):
+            t0 = relogio()
+            instancia = (carregar_instancia(trabalho["instancia"]) if trabalho.get("instancia")
+                         else INSTANCIA_PADRAO)
+            aulas = carregar_aulas_com_cache(trabalho["csv"], instancia)
+            t1 = relogio()
+            if not aulas:
+                raise ValueError("nenhuma aula encontrada no CSV")
+            agenda, score, nao_alocadas = grasp(aulas, iteracoes=trabalho["iteracoes"],
+                                                semente=trabalho["semente"], instancia=instancia,
+                                                alpha=trabalho.get("alpha"), memo=memo)
+            t2 = relogio()
+            if formato == "pdf":
+                if gerar_pdf_agenda(agenda, saida, nao_alocadas, instancia, titulo=nome) is None:
+                    raise RuntimeError("falha ao gerar o PDF")
+            else:
+                with open(saida, 'w', encoding='utf-8', newline='') as arquivo:
+                    if formato == "json":
+                        exportar_agenda_json(agenda, score, nao_alocadas, arquivo, instancia)
+                    elif formato == "csv":
+                        exportar_agenda_csv(agenda, nao_alocadas, arquivo, instancia)
+                    else:
+                        with redirect_stdout(arquivo):
+                            print(f"Score: {score}")
+                            mostrar_agenda(agenda, instancia)
+            t3 = relogio()
+    except Exception as erro:
+        resumo["erro"] = f"{type(erro).__name__}: {erro}"
+        return resumo, None
+
+    resumo.update({
+        "aulas": len(aulas),
+        "score": score,
+        "nao_alocadas": len(nao_alocadas),
+        "tempos_s": {"carga": t1 - t0, "grasp": t2 - t1, "exportacao": t3 - t2},
+    })
+    return resumo, memo
+
+
+def _chave_trabalho_lote(trabalho, formato, memo=None):
+    """
+    Muda se o CSV, a instância ou algum parâmetro que afeta o resultado mudar.
+    """
+    instancia = (carregar_instancia(trabalho["instancia"]) if trabalho.get("instancia")
+                 else INSTANCIA_PADRAO)
+    parametros = (trabalho["iteracoes"], trabalho.get("alpha"), trabalho["semente"], formato,
+                  memo is not None, json.dumps(instancia_para_dict(instancia), sort_keys=True))
+    h = hashlib.sha256(_chave_cache([trabalho["csv"]], instancia).encode())
+    h.update(repr(parametros).encode())
+    return h.hexdigest()
+
+
+def executar_lote(trabalhos, diretorio_saida, formato="json", processos=None, forcar=False,
+                  memo=None):
+    """
+    Resolve vários CSVs em paralelo (ProcessPoolExecutor), um trabalho por
+    processo. Cada trabalho sem semente própria recebe semente derivada da
+    semente do lote e do nome (crc32), que não depende da ordem nem do número
+    de processos. Trabalhos cujo CSV e parâmetros não mudaram desde o último
+    lote no mesmo diretorio_saida (estado em estado_lote.json) são pulados
+    e o resumo anterior é reaproveitado, a menos que forcar=True.
+    memo: None, "" (MemoHorarios só dentro de cada trabalho) ou caminho de um
+    arquivo de memo, lido por todos os trabalhos e atualizado ao final (cada
+    trabalho recebe uma cópia de MemoHorarios.novo(), e só as observações
+    novas de cada um são somadas).
+    Grava resumo_lote.json em diretorio_saida e o retorna.
+    """
+    os.makedirs(diretorio_saida, exist_ok=True)
+    caminho_estado = os.path.join(diretorio_saida, ARQUIVO_ESTADO_LOTE)
+    try:
+        with open(caminho_estado, 'r', encoding='utf-8') as arquivo:
+            estado = json.load(arquivo)
+    except (OSError, ValueError):
+        estado = {}
+
+    inicio = time.perf_counter()
+    resumos = {}
+    pendentes = []
+    for trabalho in trabalhos:
+        trabalho = dict(trabalho)
+        if trabalho.get("semente") is None:
+            trabalho["semente"] = ((trabalho.get("semente_lote") or 0)
+                                   ^ zlib.crc32(trabalho["nome"].encode("utf-8")))
+        try:
+            chave = _chave_trabalho_lote(trabalho, formato, memo)
+        except OSError as erro:
+            resumos[trabalho["nome"]] = {"nome": trabalho["nome"], "csv": trabalho["csv"],
+                                         "erro": f"{type(erro).__name__}: {erro}"}
+            continue
+        anterior = estado.get(trabalho["nome"])
+        if (not forcar and anterior and anterior.get("chave") == chave
+                and os.path.exists(anterior["resumo"].get("saida", ""))):
+            resumos[trabalho["nome"]] = dict(anterior["resumo"], reaproveitado=True)
+            continue
+        pendentes.append((trabalho, chave))
+
+    memo_lote = None
+    if memo is not None:
+        memo_lote = MemoHorarios()
+        if memo:
+            memo_lote.carregar(memo)
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = {executor.submit(_executar_trabalho_lote, trabalho, diretorio_saida, formato,
+                                   memo_lote.novo() if memo_lote is not None else None):
+                   (trabalho, chave) for trabalho, chave in pendentes}
+        for futuro in as_completed(futuros):
+            trabalho, chave = futuros[futuro]
+            resumo, memo_trabalho = futuro.result()
+            resumos[trabalho["nome"]] = resumo
+            if memo_lote is not None and memo_trabalho is not None:
+                memo_lote.combinar(memo_trabalho)
+            if "erro" in resumo:
+                print(f"  ✗ {resumo['nome']}: {resumo['erro']}")
+                estado.pop(trabalho["nome"], None)
+            else:
+                print(f"  ✓ {resumo['nome']}: score {resumo['score']:.2f} | "
+                      f"não alocadas {resumo['nao_alocadas']}")
+                estado[trabalho["nome"]] = {"chave": chave, "resumo": resumo}
+
+    with open(caminho_estado, 'w', encoding='utf-8') as arquivo:
+        json.dump(estado, arquivo, ensure_ascii=False, indent=2)
+    if memo:
+        memo_lote.salvar(memo)
+
+    lista = [resumos[t["nome"]] for t in trabalhos if t["nome"] in resumos]
+    concluidos = [r for r in lista if "erro" not in r]
+    resumo_lote = {
+        "trabalhos": lista,
+        "total": len(lista),
+        "executados": len(pendentes),
+        "reaproveitados": sum(1 for r in lista if r.get("reaproveitado")),
+        "erros": sum(1 for r in lista if "erro" in r),
+        "aulas": sum(r["aulas"] for r in concluidos),
+        "nao_alocadas": sum(r["nao_alocadas"] for r in concluidos),
+        "tempo_total_s": time.perf_counter() - inicio,
+    }
+    with open(os.path.join(diretorio_saida, ARQUIVO_RESUMO_LOTE), 'w', encoding='utf-8') as arquivo:
+        json.dump(resumo_lote, arquivo, ensure_ascii=False, indent=2)
+    return resumo_lote
+
+
+# =========================
+# Linha de comando (modo não interativo)
+# =========================
+
+def criar_parser_cli():
+    parser = argparse.ArgumentParser(
+        prog="grasp.py",
+        description="Agendamento de laboratórios em modo não interativo. "
+                    "Sem argumentos, abre o menu interativo.")
+    parser.add_argument("entradas", nargs="+",
+                        help="arquivos CSV, diretórios ou padrões glob com as aulas")
+    parser.add_argument("--instancia", help="arquivo JSON com salas, dias e horários")
+    parser.add_argument("--iteracoes", type=int, default=30, help="iterações do GRASP (padrão: 30)")
+    parser.add_argument("--alpha", type=float, default=ALPHA, help=f"tamanho relativo da RCL (padrão: {ALPHA})")
+    parser.add_argument("--semente", type=int, default=42, help="semente aleatória (padrão: 42)")
+    parser.add_argument("--processos", type=int, default=None, help="processos para o GRASP paralelo")
+    parser.add_argument("--exato", action="store_true", help="usa o solver exato no lugar do GRASP")
+    parser.add_argument("--formato", choices=["texto", "json", "csv", "pdf"], default="texto",
+                        help="formato da saída (padrão: texto)")
+    parser.add_argument("--saida", help="arquivo de saída (padrão: stdout; para pdf, {nome_do_csv}_grasp.pdf)")
+    parser.add_argument("--sem-cache", action="store_true", help="sempre relê os CSVs, sem usar o cache")
+    parser.add_argument("--estatisticas", action="store_true",
+                        help="mostra tempos por fase e contagem de movimentos do GRASP (stderr)")
+    parser.add_argument("--reativo", action="store_true",
+                        help="GRASP reativo: aprende o alpha entre candidatos (ignora --alpha)")
+    parser.add_argument("--elite", type=int, default=None, metavar="N",
+                        help="pool de elite de N soluções com path relinking entre iterações")
+    parser.add_argument("--reagendar", action="store_true",
+                        help="tenta colocar as aulas não alocadas em outros dias/horários")
+    parser.add_argument("--lote", action="store_true",
+                        help="um trabalho por CSV (ou por item de manifestos .json), em paralelo; "
+                             "--saida é o diretório dos resultados")
+    parser.add_argument("--forcar", action="store_true",
+                        help="no modo lote, refaz também os trabalhos sem alterações")
+    parser.add_argument("--memo", nargs="?", const="", default=None, metavar="ARQUIVO",
+                        help="reaproveita a melhor atribuição de horários com a mesma demanda; "
+                             "com ARQUIVO, o memo é lido e gravado entre execuções")
+    parser.add_argument("--busca-local", choices=list(BUSCAS_LOCAIS), default="aleatoria",
+                        help="motor de busca local do GRASP (padrão: aleatoria)")
+    parser.add_argument("--ordem", choices=EstrategiaConstrucao.ORDENS, default="csv",
+                        help="ordem das aulas na construção: csv (padrão) ou dificuldade "
+                             "(menos salas viáveis e mais alunos primeiro)")
+    parser.add_argument("--rcl", choices=EstrategiaConstrucao.RCLS, default="cardinalidade",
+                        help="RCL por cardinalidade (padrão) ou por valor (faixa de custo)")
+    parser.add_argument("--vies", choices=list(EstrategiaConstrucao.VIESES), default="uniforme",
+                        help="viés do sorteio na RCL (padrão: uniforme)")
+    parser.add_argument("--tempo", type=float, default=None,
+                        help="modo anytime: orçamento de tempo em segundos (ignora --iteracoes)")
+    parser.add_argument("--estagnacao", type=int, default=None,
+                        help="modo anytime: para após N iterações seguidas sem melhora")
+    return parser
+
+
+def _executar_cli_lote(args):
+    diretorio = args.saida or "saida_lote"
+    with redirect_stdout(sys.stderr):
+        try:
+            trabalhos = ler_trabalhos_lote(args.entradas, {
+                "instancia": args.instancia, "iteracoes": args.iteracoes,
+                "alpha": args.alpha, "semente_lote": args.semente})
+        except (OSError, ValueError) as erro:
+            print(f"\n⚠ Erro ao ler o lote: {erro}")
+            return 1
+        if not trabalhos:
+            print("\n⚠ Nenhum CSV encontrado para o lote.")
+            return 1
+        print(f"\nExecutando lote com {len(trabalhos)} trabalho(s) em {diretorio}...")
+        resumo = executar_lote(trabalhos, diretorio, args.formato, args.processos, args.forcar,
+                               memo=args.memo)
+        print(f"\nLote concluído em {resumo['tempo_total_s']:.2f} s: {resumo['executados']} executado(s), "
+              f"{resumo['reaproveitados']} sem alterações, {resumo['erros']} com erro. "
+              f"Resumo em {os.path.join(diretorio, ARQUIVO_RESUMO_LOTE)}")
+    return 1 if resumo["erros"] else 0
+
+
+def executar_cli(argv=None):
+    """
+    Carrega as aulas, resolve e grava o resultado conforme os argumentos.
+    Mensagens de progresso vão para stderr; stdout recebe apenas o resultado.
+    Retorna o código de saída do processo.
+    """
+    args = criar_parser_cli().parse_args(argv)
+
+    if args.lote:
+        return _executar_cli_lote(args)
+
+    with redirect_stdout(sys.stderr):
+        instancia = carregar_instancia(args.instancia) if args.instancia else INSTANCIA_PADRAO
+        carregar = carregar_aulas_do_csv if args.sem_cache else carregar_aulas_com_cache
+        aulas = carregar(args.entradas, instancia)
+        if not aulas:
+            print("\n⚠ Nenhuma aula encontrada no CSV. Verifique o arquivo.")
+            return 1
+
+        if args.exato:
+            agenda, score, aulas_nao_alocadas = resolver_exato(aulas, instancia)
+        else:
+            estatisticas = EstatisticasGrasp() if args.estatisticas else None
+            reativo = AlphaReativo() if args.reativo else None
+            elite = PoolElite(args.elite) if args.elite else None
+            memo = MemoHorarios() if args.memo is not None else None
+            construcao = EstrategiaConstrucao(args.ordem, args.rcl, args.vies)
+            if memo is not None and args.memo:
+                memo.carregar(args.memo)
+            if args.tempo is not None or args.estagnacao is not None:
+                inicio = time.perf_counter()
+                for agenda, score, aulas_nao_alocadas, iteracao in grasp_anytime(
+                        aulas, tempo_limite=args.tempo, estagnacao=args.estagnacao,
+                        instancia=instancia, semente=args.semente, alpha=args.alpha,
+                        estatisticas=estatisticas, reativo=reativo, elite=elite, memo=memo,
+                        busca_local=args.busca_local, construcao=construcao):
+                    print(f"  iteração {iteracao}: score {score:.2f} | "
+                          f"não alocadas {len(aulas_nao_alocadas)} | "
+                          f"{time.perf_counter() - inicio:.2f}s")
+            else:
+                agenda, score, aulas_nao_alocadas = grasp(
+                    aulas, iteracoes=args.iteracoes, processos=args.processos,
+                    semente=args.semente, instancia=instancia, alpha=args.alpha,
+                    estatisticas=estatisticas, reativo=reativo, elite=elite, memo=memo,
+                    busca_local=args.busca_local, construcao=construcao)
+            if estatisticas is not None:
+                estatisticas.imprimir()
+            if reativo is not None:
+                reativo.imprimir()
+            if memo is not None:
+                resumo_memo = memo.resumo()
+                print(f"\nMemo de horários: {resumo_memo['entradas']} assinaturas, "
+                      f"{resumo_memo['taxa_acerto']:.0%} dos horários reaproveitados")
+                if args.memo:
+                    memo.salvar(args.memo)
+        if args.reagendar and aulas_nao_alocadas:
+            reagendadas, aulas_nao_alocadas = reagendar_nao_alocadas(agenda, aulas_nao_alocadas, instancia)
+            score = avaliar_agenda(agenda, instancia)
+            print(f"\nReagendadas em outro horário: {len(reagendadas)}")
+        print(f"\nScore: {score} | aulas não alocadas: {len(aulas_nao_alocadas)}")
+
+        if args.formato == "pdf":
+            nome_base = os.path.splitext(os.path.basename(args.entradas[0].rstrip(os.sep)))[0]
+            nome_pdf = args.saida or f"{nome_base}_{'exato' if args.exato else 'grasp'}.pdf"
+            caminho = gerar_pdf_agenda(agenda, nome_pdf, aulas_nao_alocadas, instancia)
+            return 0 if caminho else 1
+
+    saida = open(args.saida, 'w', encoding='utf-8', newline='') if args.saida else sys.stdout
+    try:
+        if args.formato == "json":
+            exportar_agenda_json(agenda, score, aulas_nao_alocadas, saida, instancia)
+        elif args.formato == "csv":
+            exportar_agenda_csv(agenda, aulas_nao_alocadas, saida, instancia)
+        else:
+            with redirect_stdout(saida):
+                print(f"Score: {score}")
+                mostrar_agenda(agenda, instancia)
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+    return 0
+
+
 # =========================
 # Menu principal
 # =========================
 
 # Variável global para armazenar última agenda GRASP gerada
 ultima_agenda_grasp = None
+# aulas e CSV que geraram ultima_agenda_grasp (para a re-solução incremental)
+ultimas_aulas_grasp = None
+ultimo_csv_grasp = None
+
+def solicitar_arquivo_csv():
+    """
+    Pergunta o nome do CSV e o localiza no diretório do script ou no atual.
+    Retorna (nome_arquivo, caminho_csv); caminho_csv é None se inválido.
+    """
+    nome_arquivo = input("\nDigite o nome do arquivo CSV (ex: agenda.csv): ").strip()
+    
+    if not nome_arquivo:
+        print("\n⚠ Nome do arquivo não pode ser vazio.")
+        return nome_arquivo, None
+    
+    # Adiciona extensão .csv se não foi informada
+    if not nome_arquivo.lower().endswith('.csv'):
+        nome_arquivo += '.csv'
+    
+    # Tenta encontrar o arquivo no diretório do script ou no diretório atual
+    caminho_csv = os.path.join(os.path.dirname(__file__), nome_arquivo)
+    if not os.path.exists(caminho_csv):
+        caminho_csv = nome_arquivo
+    
+    if not os.path.exists(caminho_csv):
+        print(f"\n⚠ Arquivo '{nome_arquivo}' não encontrado.")
+        return nome_arquivo, None
+    return nome_arquivo, caminho_csv
+
 
 def main():
-    global ultima_agenda_grasp
+    global ultima_agenda_grasp, ultimas_aulas_grasp, ultimo_csv_grasp
     random.seed(42)
     inicializar_agenda(agenda_manual)
 
@@ -685,6 +4163,7 @@ def main():
         print("4 - Rodar GRASP (automático) com dados do CSV")
         print("5 - Gerar PDF da agenda manual")
         print("6 - Gerar PDF da última agenda GRASP")
+        print("7 - Rodar solver exato com dados do CSV")
         print("0 - Sair")
 
         opcao = input("Escolha: ")
@@ -696,34 +4175,32 @@ def main():
         elif opcao == '3':
             ver_disponibilidade(agenda_manual)
         elif opcao == '4':
-            # Solicita o nome do arquivo ao usuário
-            nome_arquivo = input("\nDigite o nome do arquivo CSV (ex: agenda.csv): ").strip()
-            
-            if not nome_arquivo:
-                print("\n⚠ Nome do arquivo não pode ser vazio.")
-                continue
-            
-            # Adiciona extensão .csv se não foi informada
-            if not nome_arquivo.lower().endswith('.csv'):
-                nome_arquivo += '.csv'
-            
-            # Tenta encontrar o arquivo no diretório do script ou no diretório atual
-            caminho_csv = os.path.join(os.path.dirname(__file__), nome_arquivo)
-            if not os.path.exists(caminho_csv):
-                caminho_csv = nome_arquivo
-            
-            if not os.path.exists(caminho_csv):
-                print(f"\n⚠ Arquivo '{nome_arquivo}' não encontrado.")
+            nome_arquivo, caminho_csv = solicitar_arquivo_csv()
+            if caminho_csv is None:
                 continue
             
-            aulas = carregar_aulas_do_csv(caminho_csv)
+            aulas = carregar_aulas_com_cache(caminho_csv)
             
             if not aulas:
                 print("\n⚠ Nenhuma aula encontrada no CSV. Verifique o arquivo.")
             else:
-                print(f"\nExecutando GRASP com {len(aulas)} aulas...")
-                melhor_agenda, score, aulas_nao_alocadas = grasp(aulas, iteracoes=30)
+                reaproveitar = False
+                if ultima_agenda_grasp is not None and caminho_csv == ultimo_csv_grasp:
+                    resposta = input("\nReaproveitar a última agenda GRASP deste arquivo e refazer "
+                                     "só os horários alterados? (S/n, n = recalcular do zero): ")
+                    reaproveitar = resposta.strip().lower() != 'n'
+                if reaproveitar:
+                    # mesmo arquivo: parte da última agenda e refaz só os horários alterados
+                    print(f"\nReaproveitando a última agenda GRASP de {nome_arquivo}...")
+                    melhor_agenda, score, aulas_nao_alocadas, afetados = resolver_incremental(
+                        aulas, ultima_agenda_grasp, ultimas_aulas_grasp)
+                    print(f"{len(afetados)} horário(s) com alterações re-resolvido(s).")
+                else:
+                    print(f"\nExecutando GRASP com {len(aulas)} aulas...")
+                    melhor_agenda, score, aulas_nao_alocadas = grasp(aulas, iteracoes=30)
                 ultima_agenda_grasp = melhor_agenda
+                ultimas_aulas_grasp = aulas
+                ultimo_csv_grasp = caminho_csv
                 
                 # Mostrar aviso de aulas não alocadas no console
                 if aulas_nao_alocadas:
@@ -732,6 +4209,17 @@ def main():
                         dia_nome = dias_semana[aula.dia] if aula.dia is not None else "N/A"
                         horario_nome = horarios_texto[aula.horario] if aula.horario is not None else "N/A"
                         print(f"   - {aula.disciplina} ({aula.professor}) - {dia_nome}, {horario_nome}")
+
+                    resposta = input("\nTentar reagendá-las em outros dias/horários? (s/N): ").strip().lower()
+                    if resposta == 's':
+                        reagendadas, aulas_nao_alocadas = reagendar_nao_alocadas(melhor_agenda, aulas_nao_alocadas)
+                        score = avaliar_agenda(melhor_agenda)
+                        for original, nova in reagendadas:
+                            print(f"   ✓ {original.disciplina} ({original.professor}): "
+                                  f"{dias_semana[original.dia]}, {horarios_texto[original.horario]} -> "
+                                  f"{dias_semana[nova.dia]}, {horarios_texto[nova.horario]}")
+                        print(f"\n{len(reagendadas)} aula(s) reagendada(s); "
+                              f"{len(aulas_nao_alocadas)} continuam sem sala.")
                 
                 print(f"\nScore da melhor agenda (GRASP): {score}")
                 mostrar_agenda(melhor_agenda)
@@ -740,23 +4228,51 @@ def main():
                 # Nome do PDF baseado no nome do arquivo CSV de entrada
                 nome_base = os.path.splitext(os.path.basename(nome_arquivo))[0]
                 nome_pdf = f"{nome_base}_grasp.pdf"
-                print(f"\nGerando PDF da agenda GRASP: {nome_pdf}...")
-                gerar_pdf_agenda(melhor_agenda, nome_pdf, aulas_nao_alocadas)
+                # O PDF é escrito em segundo plano; o menu volta imediatamente
+                print(f"\nGerando PDF da agenda GRASP em segundo plano: {nome_pdf}...")
+                gerar_pdf_em_segundo_plano(melhor_agenda, nome_pdf, aulas_nao_alocadas)
         elif opcao == '5':
             print("\nGerando PDF da agenda manual...")
-            gerar_pdf_agenda(agenda_manual, "agenda_manual.pdf")
+            # cópia: a agenda manual pode mudar enquanto o PDF é escrito
+            gerar_pdf_em_segundo_plano(clonar_agenda(agenda_manual), "agenda_manual.pdf")
         elif opcao == '6':
             if ultima_agenda_grasp is None:
                 print("\n⚠ Nenhuma agenda GRASP foi gerada ainda. Execute a opção 4 primeiro.")
             else:
                 print("\nGerando PDF da agenda GRASP...")
-                gerar_pdf_agenda(ultima_agenda_grasp, "agenda_grasp.pdf")
+                gerar_pdf_em_segundo_plano(ultima_agenda_grasp, "agenda_grasp.pdf")
+        elif opcao == '7':
+            nome_arquivo, caminho_csv = solicitar_arquivo_csv()
+            if caminho_csv is None:
+                continue
+            
+            aulas = carregar_aulas_com_cache(caminho_csv)
+            
+            if not aulas:
+                print("\n⚠ Nenhuma aula encontrada no CSV. Verifique o arquivo.")
+            else:
+                print(f"\nExecutando solver exato com {len(aulas)} aulas...")
+                agenda_exata, score, aulas_nao_alocadas = resolver_exato(aulas)
+                
+                if aulas_nao_alocadas:
+                    print(f"\n⚠ Atenção: {len(aulas_nao_alocadas)} aula(s) não puderam ser alocadas!")
+                
+                print(f"\nScore da agenda ótima: {score}")
+                mostrar_agenda(agenda_exata)
+                
+                nome_base = os.path.splitext(os.path.basename(nome_arquivo))[0]
+                nome_pdf = f"{nome_base}_exato.pdf"
+                print(f"\nGerando PDF da agenda exata em segundo plano: {nome_pdf}...")
+                gerar_pdf_em_segundo_plano(agenda_exata, nome_pdf, aulas_nao_alocadas)
         elif opcao == '0':
+            aguardar_pdfs()
             print(" Encerrando o sistema.")
             break
         else:
             print(" Opção inválida.")
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(executar_cli(sys.argv[1:]))
     main()
  
\ No newline at end of file
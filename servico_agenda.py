@@ -0,0 +1,623 @@
+"""
+Serviço local de agendamento (HTTP/JSON sobre asyncio).
+
+Mantém instâncias e agendas em memória, atende reservas, consultas de
+disponibilidade e execuções do GRASP de vários usuários ao mesmo tempo e
+grava o estado em um arquivo SQLite. Só usa a biblioteca padrão.
+
+Rotas:
+    GET    /instancias                              instâncias cadastradas
+    POST   /instancias                              {"nome": ..., + formato de carregar_instancia}
+    GET    /agendas                                 agendas existentes
+    POST   /agendas                                 {"nome": ..., "instancia": "padrao"}
+    GET    /agendas/{nome}                          alocações, score
+    GET    /agendas/{nome}/disponibilidade[?alunos=N]
+    POST   /agendas/{nome}/reservas                 {"disciplina", "professor", "alunos", "sala", "dia", "horario"}
+    DELETE /agendas/{nome}/reservas/{sala}/{dia}/{horario}
+    POST   /agendas/{nome}/resolver                 {"aulas": [...]} ou {"csv": caminho}, "iteracoes", "semente", "alpha"
+
+Sala, dia e horário podem ser índices ou nomes da instância. Resolver
+substitui todo o conteúdo da agenda pela melhor solução do GRASP, mantendo
+as reservas feitas enquanto ele rodava. O caminho de "csv" é relativo ao
+diretório de dados (--dados); sem ele, a leitura de CSV fica desativada.
+
+Exemplo:
+    python servico_agenda.py --porta 8080 --banco agendas.db --processos 2 --dados .
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import grasp as g
+
+INSTANCIA_PADRAO = "padrao"
+ACOES_AGENDA = ("disponibilidade", "reservas", "resolver")
+TAMANHO_MAXIMO_CORPO = 16 * 1024 * 1024
+
+MENSAGENS_HTTP = {200: "OK", 201: "Created", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+                  405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+                  500: "Internal Server Error"}
+
+
+class ErroRequisicao(Exception):
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+        self.mensagem = mensagem
+
+
+# =========================
+# Persistência (SQLite)
+# =========================
+
+class BancoAgendas:
+    """
+    Estado persistido: instâncias (como JSON), agendas e suas alocações.
+    A conexão só é usada pela thread do executor do serviço.
+    """
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS instancias (nome TEXT PRIMARY KEY, dados TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS agendas (nome TEXT PRIMARY KEY, instancia TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS alocacoes (
+            agenda TEXT NOT NULL, sala INTEGER NOT NULL, dia INTEGER NOT NULL,
+            horario INTEGER NOT NULL, disciplina TEXT, professor TEXT, alunos INTEGER,
+            PRIMARY KEY (agenda, sala, dia, horario));
+    """
+
+    def __init__(self, caminho):
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.conexao.executescript(self.ESQUEMA)
+
+    def carregar(self):
+        """
+        Retorna: tupla (instancias {nome: dados}, agendas {nome: instancia},
+        alocacoes {agenda: [(sala, dia, horario, disciplina, professor, alunos)]})
+        """
+        cursor = self.conexao.cursor()
+        instancias = {nome: json.loads(dados)
+                      for nome, dados in cursor.execute("SELECT nome, dados FROM instancias")}
+        agendas = dict(cursor.execute("SELECT nome, instancia FROM agendas"))
+        alocacoes = {}
+        for agenda, *linha in cursor.execute(
+                "SELECT agenda, sala, dia, horario, disciplina, professor, alunos FROM alocacoes"):
+            alocacoes.setdefault(agenda, []).append(tuple(linha))
+        return instancias, agendas, alocacoes
+
+    def salvar_instancia(self, nome, dados):
+        with self.conexao:
+            self.conexao.execute("INSERT OR REPLACE INTO instancias VALUES (?, ?)",
+                                 (nome, json.dumps(dados, ensure_ascii=False)))
+
+    def salvar_agenda(self, nome, instancia):
+        with self.conexao:
+            self.conexao.execute("INSERT OR REPLACE INTO agendas VALUES (?, ?)", (nome, instancia))
+
+    def inserir_alocacao(self, agenda, sala, dia, horario, aula):
+        with self.conexao:
+            self.conexao.execute("INSERT INTO alocacoes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                 (agenda, sala, dia, horario, aula.disciplina, aula.professor,
+                                  aula.alunos))
+
+    def remover_alocacao(self, agenda, sala, dia, horario):
+        with self.conexao:
+            self.conexao.execute(
+                "DELETE FROM alocacoes WHERE agenda = ? AND sala = ? AND dia = ? AND horario = ?",
+                (agenda, sala, dia, horario))
+
+    def substituir_alocacoes(self, agenda, alocacoes):
+        # uma única transação: quem lê o banco vê a agenda antiga ou a nova
+        with self.conexao:
+            self.conexao.execute("DELETE FROM alocacoes WHERE agenda = ?", (agenda,))
+            self.conexao.executemany(
+                "INSERT INTO alocacoes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(agenda, s, d, h, aula.disciplina, aula.professor, aula.alunos)
+                 for s, d, h, aula in alocacoes])
+
+
+# =========================
+# Execução do GRASP em outro processo
+# =========================
+
+def _resolver_em_processo(tabela, iteracoes, semente, instancia, alpha):
+    """
+    Roda no pool de processos. As aulas chegam como TabelaAulas (colunas e
+    textos distintos, bem menor de serializar que a lista de objetos) e a
+    solução volta por índices de aula, sem depender da identidade dos
+    objetos entre processos.
+    Retorna: tupla (alocacao [(sala, dia, horario, aula_idx)], score, nao_alocadas_idx)
+    """
+    aulas = tabela.para_aulas()
+    agenda, score, nao_alocadas = g.grasp(aulas, iteracoes=iteracoes, semente=semente,
+                                          instancia=instancia, alpha=alpha)
+    indices = {id(aula): i for i, aula in enumerate(aulas)}
+    alocacao = [(s, d, h, indices[id(aula)])
+                for s, d, h, aula in g.listar_alocacoes(agenda, instancia)]
+    return alocacao, score, [indices[id(aula)] for aula in nao_alocadas]
+
+
+# =========================
+# Estado do serviço
+# =========================
+
+class AgendaServico:
+    def __init__(self, nome, nome_instancia, instancia):
+        self.nome = nome
+        self.nome_instancia = nome_instancia
+        self.instancia = instancia
+        self.agenda = g.criar_agenda_vazia(instancia)
+        # serializa reservas, cancelamentos e a troca pela solução do GRASP
+        self.trava = asyncio.Lock()
+        self.versao = 0        # incrementada a cada reserva aceita
+        self.resolucoes = 0    # execuções do GRASP em andamento
+        # (versao, sala, dia, horario, aula) das reservas aceitas enquanto há
+        # resolução em andamento; reaplicadas sobre a solução quando ela chega
+        self.reservas_recentes = []
+
+    def registrar_reserva(self, s, d, h, aula):
+        self.versao += 1
+        if self.resolucoes:
+            self.reservas_recentes.append((self.versao, s, d, h, aula))
+
+    def reaplicar_reservas(self, nova, desde):
+        """
+        Copia para a agenda nova as reservas aceitas depois da versão `desde`
+        que continuam na agenda atual (não foram canceladas). A reserva fica
+        com o slot; a aula do GRASP que estava nele vai para outra sala livre
+        do mesmo horário, se houver.
+        Retorna: tupla (reservas mantidas, aulas do GRASP que ficaram sem sala)
+        """
+        inst = self.instancia
+        mantidas = 0
+        sem_sala = []
+        for versao, s, d, h, aula in self.reservas_recentes:
+            if versao <= desde or self.agenda[s][d][h].aula is not aula:
+                continue
+            slot = nova[s][d][h]
+            deslocada = slot.aula if slot.ocupado else None
+            slot.ocupado = 1
+            slot.aula = aula
+            mantidas += 1
+            if deslocada is None:
+                continue
+            for s2 in range(inst.n_salas):
+                if g.pode_agendar(s2, d, h, deslocada.alunos, nova, inst):
+                    nova[s2][d][h].ocupado = 1
+                    nova[s2][d][h].aula = deslocada
+                    break
+            else:
+                sem_sala.append(deslocada)
+        return mantidas, sem_sala
+
+
+class ServicoAgenda:
+    """
+    Estado em memória e regras de cada rota. Cada agenda tem sua própria
+    trava: a verificação (pode_agendar) e a gravação de uma reserva
+    acontecem sob ela, então duas reservas concorrentes para o mesmo slot
+    nunca são aceitas juntas. O GRASP roda num ProcessPoolExecutor, fora do
+    laço de eventos; o SQLite, numa única thread própria. Reservas aceitas
+    durante uma resolução são reaplicadas sobre a solução (reaplicar_reservas).
+    diretorio_dados: único diretório de onde "csv" pode ser lido (None: nenhum).
+    """
+    def __init__(self, caminho_banco, processos=None, diretorio_dados=None):
+        self.banco = BancoAgendas(caminho_banco)
+        self.diretorio_dados = (os.path.realpath(diretorio_dados)
+                                if diretorio_dados is not None else None)
+        self.executor_banco = ThreadPoolExecutor(max_workers=1)
+        # "spawn": processos filhos não herdam o socket do servidor
+        self.executor_grasp = ProcessPoolExecutor(max_workers=processos,
+                                                  mp_context=multiprocessing.get_context("spawn"))
+        self.instancias = {INSTANCIA_PADRAO: g.INSTANCIA_PADRAO}
+        self.agendas = {}
+
+        instancias, agendas, alocacoes = self.banco.carregar()
+        for nome, dados in instancias.items():
+            self.instancias[nome] = g.instancia_de_dict(dados)
+        for nome, nome_instancia in agendas.items():
+            agenda = AgendaServico(nome, nome_instancia, self.instancias[nome_instancia])
+            for s, d, h, disciplina, professor, alunos in alocacoes.get(nome, []):
+                slot = agenda.agenda[s][d][h]
+                slot.ocupado = 1
+                slot.aula = g.Aula(sys.intern(disciplina), sys.intern(professor), alunos, d, h)
+            self.agendas[nome] = agenda
+
+    async def _no_banco(self, funcao, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor_banco, funcao, *args)
+
+    def encerrar(self):
+        self.executor_grasp.shutdown()
+        self.executor_banco.shutdown()
+        self.banco.conexao.close()
+
+    def _agenda(self, nome):
+        agenda = self.agendas.get(nome)
+        if agenda is None:
+            raise ErroRequisicao(404, f"agenda '{nome}' não existe")
+        return agenda
+
+    # ---- instâncias ----
+
+    def listar_instancias(self):
+        return {nome: g.instancia_para_dict(inst) for nome, inst in self.instancias.items()}
+
+    async def criar_instancia(self, dados):
+        nome = _texto(dados, "nome")
+        if nome in self.instancias:
+            raise ErroRequisicao(409, f"instância '{nome}' já existe")
+        try:
+            instancia = g.instancia_de_dict(dados)
+        except (KeyError, TypeError, ValueError) as erro:
+            raise ErroRequisicao(400, f"instância inválida: {erro}")
+        self.instancias[nome] = instancia
+        await self._no_banco(self.banco.salvar_instancia, nome, g.instancia_para_dict(instancia))
+        return {"nome": nome}
+
+    # ---- agendas ----
+
+    def listar_agendas(self):
+        return [{"nome": a.nome, "instancia": a.nome_instancia} for a in self.agendas.values()]
+
+    async def criar_agenda(self, dados):
+        nome = _texto(dados, "nome")
+        nome_instancia = dados.get("instancia", INSTANCIA_PADRAO)
+        if nome in self.agendas:
+            raise ErroRequisicao(409, f"agenda '{nome}' já existe")
+        if nome_instancia not in self.instancias:
+            raise ErroRequisicao(404, f"instância '{nome_instancia}' não existe")
+        self.agendas[nome] = AgendaServico(nome, nome_instancia, self.instancias[nome_instancia])
+        await self._no_banco(self.banco.salvar_agenda, nome, nome_instancia)
+        return {"nome": nome, "instancia": nome_instancia}
+
+    def descrever_agenda(self, nome):
+        agenda = self._agenda(nome)
+        inst = agenda.instancia
+        return {
+            "nome": nome,
+            "instancia": agenda.nome_instancia,
+            "score": g.avaliar_agenda(agenda.agenda, inst),
+            "alocadas": [{"sala": inst.salas[s].nome, "dia": inst.dias[d], "horario": inst.horarios[h],
+                          "disciplina": aula.disciplina, "professor": aula.professor,
+                          "alunos": aula.alunos}
+                         for s, d, h, aula in g.listar_alocacoes(agenda.agenda, inst)],
+        }
+
+    def disponibilidade(self, nome, alunos=0):
+        """
+        Salas livres por dia/horário, só as que comportam `alunos`.
+        """
+        agenda = self._agenda(nome)
+        inst = agenda.instancia
+        livres = []
+        for d in range(inst.n_dias):
+            for h in range(inst.n_horarios):
+                salas_livres = [inst.salas[s].nome for s in range(inst.n_salas)
+                                if g.pode_agendar(s, d, h, alunos, agenda.agenda, inst)]
+                if salas_livres:
+                    livres.append({"dia": inst.dias[d], "horario": inst.horarios[h],
+                                   "salas": salas_livres})
+        return livres
+
+    async def reservar(self, nome, dados):
+        agenda = self._agenda(nome)
+        inst = agenda.instancia
+        s = _indice(dados, "sala", [sala.nome for sala in inst.salas])
+        d = _indice(dados, "dia", inst.dias)
+        h = _indice(dados, "horario", inst.horarios)
+        alunos = _inteiro(dados, "alunos")
+        aula = g.Aula(sys.intern(_texto_opcional(dados, "disciplina")),
+                      sys.intern(_texto_opcional(dados, "professor")), alunos, d, h)
+
+        async with agenda.trava:
+            if not g.pode_agendar(s, d, h, alunos, agenda.agenda, inst):
+                raise ErroRequisicao(409, "conflito ou capacidade insuficiente")
+            slot = agenda.agenda[s][d][h]
+            slot.ocupado = 1
+            slot.aula = aula
+            try:
+                await self._no_banco(self.banco.inserir_alocacao, nome, s, d, h, aula)
+            except Exception:
+                slot.ocupado = 0
+                slot.aula = None
+                raise
+            agenda.registrar_reserva(s, d, h, aula)
+        return {"sala": inst.salas[s].nome, "dia": inst.dias[d], "horario": inst.horarios[h]}
+
+    async def cancelar(self, nome, sala, dia, horario):
+        agenda = self._agenda(nome)
+        inst = agenda.instancia
+        s = _indice({"sala": sala}, "sala", [x.nome for x in inst.salas])
+        d = _indice({"dia": dia}, "dia", inst.dias)
+        h = _indice({"horario": horario}, "horario", inst.horarios)
+
+        async with agenda.trava:
+            slot = agenda.agenda[s][d][h]
+            if not slot.ocupado:
+                raise ErroRequisicao(404, "não há aula nesse slot")
+            await self._no_banco(self.banco.remover_alocacao, nome, s, d, h)
+            slot.ocupado = 0
+            slot.aula = None
+        return {"cancelada": True}
+
+    def _caminho_dados(self, caminho):
+        """
+        Caminho de "csv" resolvido dentro do diretório de dados.
+        """
+        if self.diretorio_dados is None:
+            raise ErroRequisicao(403, "leitura de CSV no servidor desativada (inicie com --dados)")
+        completo = os.path.realpath(os.path.join(self.diretorio_dados, caminho))
+        if os.path.commonpath([completo, self.diretorio_dados]) != self.diretorio_dados:
+            raise ErroRequisicao(403, f"'{caminho}' está fora do diretório de dados")
+        if not os.path.exists(completo):
+            raise ErroRequisicao(404, f"arquivo '{caminho}' não encontrado")
+        return completo
+
+    async def resolver(self, nome, dados):
+        agenda = self._agenda(nome)
+        inst = agenda.instancia
+        iteracoes = _inteiro_opcional(dados, "iteracoes", 30, minimo=1)
+        semente = _inteiro_opcional(dados, "semente")
+        alpha = _fracao_opcional(dados, "alpha")
+        if "csv" in dados:
+            caminho = self._caminho_dados(_texto(dados, "csv"))
+            loop = asyncio.get_running_loop()
+            aulas = await loop.run_in_executor(None, g.carregar_aulas_com_cache, caminho, inst)
+        else:
+            aulas = [_aula(item, inst) for item in dados.get("aulas", [])]
+        if not aulas:
+            raise ErroRequisicao(400, "nenhuma aula para resolver")
+
+        # reservas aceitas a partir daqui são reaplicadas sobre a solução
+        desde = agenda.versao
+        agenda.resolucoes += 1
+        try:
+            loop = asyncio.get_running_loop()
+            alocacao, score, nao_alocadas = await loop.run_in_executor(
+                self.executor_grasp, _resolver_em_processo, g.TabelaAulas(aulas), iteracoes,
+                semente, inst, alpha)
+
+            async with agenda.trava:
+                nova = g.criar_agenda_vazia(inst)
+                for s, d, h, a_idx in alocacao:
+                    nova[s][d][h].ocupado = 1
+                    nova[s][d][h].aula = aulas[a_idx]
+                mantidas, sem_sala = agenda.reaplicar_reservas(nova, desde)
+                alocacoes = g.listar_alocacoes(nova, inst)
+                await self._no_banco(self.banco.substituir_alocacoes, nome, alocacoes)
+                agenda.agenda = nova
+        finally:
+            agenda.resolucoes -= 1
+            if not agenda.resolucoes:
+                agenda.reservas_recentes.clear()
+
+        nao_alocadas = [aulas[i] for i in nao_alocadas] + sem_sala
+        if mantidas:
+            score = g.avaliar_agenda(nova, inst)
+        # alocadas conta a agenda gravada: aulas do GRASP mais reservas mantidas
+        return {"score": score, "alocadas": len(alocacoes),
+                "reservas_mantidas": mantidas,
+                "nao_alocadas": [{"disciplina": aula.disciplina, "professor": aula.professor,
+                                  "alunos": aula.alunos, "dia": inst.dias[aula.dia],
+                                  "horario": inst.horarios[aula.horario]}
+                                 for aula in nao_alocadas]}
+
+    # ---- roteamento ----
+
+    async def atender(self, metodo, caminho, consulta, corpo):
+        """
+        Retorna: tupla (status, objeto JSON da resposta)
+        """
+        partes = [unquote(p) for p in caminho.strip("/").split("/") if p]
+
+        if partes == ["instancias"]:
+            if metodo == "GET":
+                return 200, self.listar_instancias()
+            if metodo == "POST":
+                return 201, await self.criar_instancia(_json(corpo))
+        elif partes == ["agendas"]:
+            if metodo == "GET":
+                return 200, self.listar_agendas()
+            if metodo == "POST":
+                return 201, await self.criar_agenda(_json(corpo))
+        elif len(partes) == 2 and partes[0] == "agendas":
+            if metodo == "GET":
+                return 200, self.descrever_agenda(partes[1])
+        elif len(partes) == 3 and partes[0] == "agendas" and partes[2] in ACOES_AGENDA:
+            nome, acao = partes[1], partes[2]
+            if acao == "disponibilidade" and metodo == "GET":
+                alunos = _inteiro_opcional({"alunos": consulta.get("alunos", [None])[0]},
+                                           "alunos", 0, minimo=0)
+                return 200, self.disponibilidade(nome, alunos)
+            if acao == "reservas" and metodo == "POST":
+                return 201, await self.reservar(nome, _json(corpo))
+            if acao == "resolver" and metodo == "POST":
+                return 200, await self.resolver(nome, _json(corpo))
+        elif len(partes) == 6 and partes[0] == "agendas" and partes[2] == "reservas":
+            if metodo == "DELETE":
+                return 200, await self.cancelar(partes[1], *partes[3:])
+        else:
+            raise ErroRequisicao(404, "rota não encontrada")
+        raise ErroRequisicao(405, "método não permitido")
+
+
+# =========================
+# Validação dos dados recebidos
+# =========================
+
+def _json(corpo):
+    try:
+        dados = json.loads(corpo or b"{}")
+    except ValueError:
+        raise ErroRequisicao(400, "corpo não é JSON válido")
+    if not isinstance(dados, dict):
+        raise ErroRequisicao(400, "corpo deve ser um objeto JSON")
+    return dados
+
+
+def _texto(dados, campo):
+    valor = dados.get(campo)
+    if not isinstance(valor, str) or not valor:
+        raise ErroRequisicao(400, f"campo '{campo}' obrigatório")
+    return valor
+
+
+def _texto_opcional(dados, campo):
+    valor = dados.get(campo, "")
+    if not isinstance(valor, str):
+        raise ErroRequisicao(400, f"campo '{campo}' deve ser texto")
+    return valor
+
+
+def _inteiro(dados, campo):
+    try:
+        return int(dados[campo])
+    except (KeyError, TypeError, ValueError):
+        raise ErroRequisicao(400, f"campo '{campo}' deve ser um inteiro")
+
+
+def _inteiro_opcional(dados, campo, padrao=None, minimo=None):
+    if dados.get(campo) is None:
+        return padrao
+    valor = _inteiro(dados, campo)
+    if minimo is not None and valor < minimo:
+        raise ErroRequisicao(400, f"campo '{campo}' deve ser no mínimo {minimo}")
+    return valor
+
+
+def _fracao_opcional(dados, campo):
+    valor = dados.get(campo)
+    if valor is None:
+        return None
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)) or not 0 <= valor <= 1:
+        raise ErroRequisicao(400, f"campo '{campo}' deve ser um número entre 0 e 1")
+    return float(valor)
+
+
+def _indice(dados, campo, nomes):
+    """
+    Aceita o índice ou o nome (sala, dia ou horário) da instância.
+    """
+    valor = dados.get(campo)
+    if isinstance(valor, str) and valor in nomes:
+        return nomes.index(valor)
+    try:
+        indice = int(valor)
+    except (TypeError, ValueError):
+        raise ErroRequisicao(400, f"campo '{campo}' inválido")
+    if not 0 <= indice < len(nomes):
+        raise ErroRequisicao(400, f"campo '{campo}' fora do intervalo")
+    return indice
+
+
+def _aula(item, instancia):
+    if not isinstance(item, dict):
+        raise ErroRequisicao(400, "cada aula deve ser um objeto JSON")
+    return g.Aula(sys.intern(_texto_opcional(item, "disciplina")),
+                  sys.intern(_texto_opcional(item, "professor")), _inteiro(item, "alunos"),
+                  _indice(item, "dia", instancia.dias),
+                  _indice(item, "horario", instancia.horarios))
+
+
+# =========================
+# HTTP mínimo sobre asyncio
+# =========================
+
+async def _ler_requisicao(leitor):
+    linha = await leitor.readline()
+    if not linha:
+        return None
+    try:
+        metodo, alvo, _ = linha.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise ErroRequisicao(400, "linha de requisição inválida")
+    cabecalhos = {}
+    while True:
+        linha = await leitor.readline()
+        if linha in (b"\r\n", b"\n", b""):
+            break
+        nome, _, valor = linha.decode("latin-1").partition(":")
+        cabecalhos[nome.strip().lower()] = valor.strip()
+    tamanho = int(cabecalhos.get("content-length", 0) or 0)
+    if tamanho > TAMANHO_MAXIMO_CORPO:
+        raise ErroRequisicao(413, "corpo grande demais")
+    corpo = await leitor.readexactly(tamanho) if tamanho else b""
+    return metodo.upper(), alvo, corpo
+
+
+def _escrever_resposta(escritor, status, objeto):
+    corpo = json.dumps(objeto, ensure_ascii=False).encode("utf-8")
+    escritor.write(
+        (f"HTTP/1.1 {status} {MENSAGENS_HTTP.get(status, '')}\r\n"
+         "Content-Type: application/json; charset=utf-8\r\n"
+         f"Content-Length: {len(corpo)}\r\n"
+         "Connection: close\r\n\r\n").encode("latin-1") + corpo)
+
+
+def criar_tratador(servico):
+    async def tratar(leitor, escritor):
+        try:
+            try:
+                requisicao = await _ler_requisicao(leitor)
+                if requisicao is None:
+                    return
+                metodo, alvo, corpo = requisicao
+                url = urlsplit(alvo)
+                status, resposta = await servico.atender(metodo, url.path, parse_qs(url.query), corpo)
+            except ErroRequisicao as erro:
+                status, resposta = erro.status, {"erro": erro.mensagem}
+            except Exception as erro:
+                print(f"⚠ Erro ao atender requisição: {erro!r}", file=sys.stderr)
+                status, resposta = 500, {"erro": "erro interno"}
+            _escrever_resposta(escritor, status, resposta)
+            await escritor.drain()
+        finally:
+            escritor.close()
+    return tratar
+
+
+async def servir(host, porta, caminho_banco, processos=None, diretorio_dados=None):
+    servico = ServicoAgenda(caminho_banco, processos, diretorio_dados)
+    servidor = await asyncio.start_server(criar_tratador(servico), host, porta)
+    enderecos = ", ".join(str(sock.getsockname()) for sock in servidor.sockets)
+    print(f"✓ Serviço de agendamento em {enderecos} (banco: {caminho_banco})")
+
+    parar = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sinal, parar.set)
+        except NotImplementedError:
+            pass  # Windows: Ctrl+C chega como KeyboardInterrupt
+    try:
+        async with servidor:
+            await parar.wait()
+    finally:
+        servico.encerrar()
+    print("\nEncerrando o serviço.")
+
+
+def executar(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP/JSON de agendamento de laboratórios.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8080)
+    parser.add_argument("--banco", default="agendas.db", help="arquivo SQLite com o estado (padrão: agendas.db)")
+    parser.add_argument("--processos", type=int, default=None, help="processos para as execuções do GRASP")
+    parser.add_argument("--dados", default=None,
+                        help="diretório de onde o campo \"csv\" de /resolver pode ler (padrão: desativado)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(servir(args.host, args.porta, args.banco, args.processos, args.dados))
+    except KeyboardInterrupt:
+        print("\nEncerrando o serviço.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(executar())
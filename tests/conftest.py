@@ -0,0 +1,26 @@
+"""
+Configuração comum dos testes: deixa os módulos da raiz importáveis e
+carrega os CSVs de exemplo.
+"""
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import grasp  # noqa: E402
+
+
+@pytest.fixture
+def raiz():
+    return RAIZ
+
+
+@pytest.fixture
+def carregar_csv():
+    """Carrega as aulas de um dos CSVs da raiz do projeto."""
+    def carregar(nome, instancia=None):
+        return grasp.carregar_aulas_do_csv(os.path.join(RAIZ, nome), instancia)
+    return carregar
@@ -0,0 +1,47 @@
+"""
+Testes do grasp_anytime e do limite usado para parar cedo.
+"""
+import time
+
+import pytest
+
+import grasp
+
+
+@pytest.mark.parametrize("nome", ["agenda.csv", "agenda_exata.csv", "agenda_saturada.csv"])
+def test_limite_exato_e_o_score_do_solver_exato(nome, carregar_csv):
+    aulas = carregar_csv(nome)
+    _, score, nao_alocadas = grasp.resolver_exato(aulas)
+
+    limite, minimo = grasp.limite_superior_score(aulas)
+    assert limite == pytest.approx(score, abs=grasp.TOLERANCIA_SCORE)
+    assert minimo == len(nao_alocadas)
+    assert grasp.limite_superior_score(aulas, exato=False)[0] >= limite
+
+
+def test_para_ao_atingir_o_otimo(carregar_csv):
+    aulas = carregar_csv("agenda_exata.csv")
+    limite, minimo = grasp.limite_superior_score(aulas)
+    estatisticas = grasp.EstatisticasGrasp()
+
+    solucoes = list(grasp.grasp_anytime(aulas, max_iteracoes=200, semente=1,
+                                        estatisticas=estatisticas))
+    _, score, nao_alocadas, iteracao = solucoes[-1]
+
+    assert estatisticas.iteracoes == iteracao + 1 < 200
+    assert score == pytest.approx(limite, abs=grasp.TOLERANCIA_SCORE)
+    assert len(nao_alocadas) == minimo
+
+
+def test_limite_relaxado_nao_para_cedo(carregar_csv):
+    # o limite relaxado ignora a disputa por salas e fica acima do ótimo
+    aulas = carregar_csv("agenda_exata.csv")
+    estatisticas = grasp.EstatisticasGrasp()
+    list(grasp.grasp_anytime(aulas, max_iteracoes=20, semente=1, limite="relaxado",
+                             estatisticas=estatisticas))
+    assert estatisticas.iteracoes == 20
+
+
+def test_limite_desiste_no_prazo(carregar_csv):
+    aulas = carregar_csv("agenda_saturada.csv")
+    assert grasp.limite_superior_score(aulas, prazo=time.perf_counter() - 1) is None
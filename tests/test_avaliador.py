@@ -0,0 +1,121 @@
+"""
+Testes da avaliação incremental: o score mantido pelo AvaliadorIncremental
+deve coincidir com avaliar_agenda depois de cada movimento aceito, e a
+AgendaCompacta deve dar os mesmos resultados que a grade de SlotAgenda.
+"""
+import random
+
+import pytest
+
+import grasp
+
+CSVS = ["agenda.csv", "agenda_exata.csv", "agenda_saturada.csv"]
+
+
+def _agenda_inicial(aulas, compacta, semente=7):
+    agenda = grasp.AgendaCompacta(aulas) if compacta else None
+    agenda, _ = grasp.construir_solucao_grasp(aulas, agenda=agenda, rng=random.Random(semente))
+    return agenda
+
+
+def _ocupadas(agenda, d, h):
+    return [s for s in range(grasp.INSTANCIA_PADRAO.n_salas) if agenda[s][d][h].ocupado]
+
+
+@pytest.mark.parametrize("compacta", [False, True])
+@pytest.mark.parametrize("nome", CSVS)
+def test_delta_confere_com_avaliacao_completa(nome, compacta, carregar_csv):
+    inst = grasp.INSTANCIA_PADRAO
+    agenda = _agenda_inicial(carregar_csv(nome), compacta)
+    avaliador = grasp.AvaliadorIncremental(agenda)
+    rng = random.Random(11)
+    movimentos = 0
+
+    for _ in range(400):
+        d = rng.randrange(inst.n_dias)
+        h = rng.randrange(inst.n_horarios)
+        ocupadas = _ocupadas(agenda, d, h)
+        if not ocupadas:
+            continue
+        if len(ocupadas) >= 2 and rng.random() < 0.5:
+            s1, s2 = rng.sample(ocupadas, 2)
+            delta = avaliador.delta_troca(s1, s2, d, h)
+            grasp.aplicar_troca(agenda, s1, s2, d, h)
+        else:
+            s_origem = rng.choice(ocupadas)
+            livres = [s for s in range(inst.n_salas) if not agenda[s][d][h].ocupado]
+            if not livres:
+                continue
+            s_destino = rng.choice(livres)
+            delta = avaliador.delta_mover(s_origem, s_destino, d, h)
+            grasp.aplicar_movimento(agenda, s_origem, s_destino, d, h)
+        # registra também movimentos que pioram: o delta tem de valer em ambos os sentidos
+        avaliador.registrar(delta)
+        movimentos += 1
+        assert avaliador.score == pytest.approx(grasp.avaliar_agenda(agenda),
+                                                abs=grasp.TOLERANCIA_SCORE)
+
+    assert movimentos > 0
+
+
+@pytest.mark.parametrize("compacta", [False, True])
+@pytest.mark.parametrize("nome", CSVS)
+def test_busca_local_com_verificacao(nome, compacta, carregar_csv):
+    agenda = _agenda_inicial(carregar_csv(nome), compacta)
+    score_inicial = grasp.avaliar_agenda(agenda)
+    estatisticas = grasp.EstatisticasGrasp()
+
+    agenda, score = grasp.buscar_melhora_local(agenda, max_tentativas=300, verificar=True,
+                                               rng=random.Random(3), estatisticas=estatisticas)
+
+    assert score == pytest.approx(grasp.avaliar_agenda(agenda), abs=grasp.TOLERANCIA_SCORE)
+    assert score >= score_inicial - grasp.TOLERANCIA_SCORE
+
+
+def test_verificar_detecta_delta_inconsistente(carregar_csv):
+    agenda = _agenda_inicial(carregar_csv("agenda.csv"), compacta=False)
+    avaliador = grasp.AvaliadorIncremental(agenda, verificar=True)
+    with pytest.raises(AssertionError):
+        avaliador.registrar(1.0)
+
+
+@pytest.mark.parametrize("nome", CSVS)
+def test_agenda_compacta_confere_com_lista(nome, carregar_csv):
+    aulas = carregar_csv(nome)
+    lista = _agenda_inicial(aulas, compacta=False)
+    compacta = _agenda_inicial(aulas, compacta=True)
+    indice = grasp.INSTANCIA_PADRAO.indice
+
+    assert compacta.avaliar() == pytest.approx(grasp.avaliar_agenda(lista), abs=grasp.TOLERANCIA_SCORE)
+    assert (indice.mascaras_ocupacao(compacta, grasp.INSTANCIA_PADRAO)
+            == indice.mascaras_ocupacao(lista, grasp.INSTANCIA_PADRAO))
+    assert grasp.salas_por_aula(compacta, aulas) == grasp.salas_por_aula(lista, aulas)
+
+
+@pytest.mark.parametrize("busca_local", sorted(grasp.BUSCAS_LOCAIS))
+@pytest.mark.parametrize("nome", CSVS)
+def test_motores_com_verificacao(nome, busca_local, carregar_csv):
+    aulas = carregar_csv(nome)
+    agenda, score, *_ = grasp.grasp(aulas, iteracoes=2, verificar_delta=True, processos=1,
+                                    semente=5, busca_local=busca_local)
+
+    assert score == pytest.approx(grasp.avaliar_agenda(agenda), abs=grasp.TOLERANCIA_SCORE)
+
+
+@pytest.mark.parametrize("compacta", [False, True])
+def test_busca_local_sem_copias(compacta, carregar_csv, monkeypatch):
+    aulas = carregar_csv("agenda_saturada.csv")
+    agenda = _agenda_inicial(aulas, compacta)
+    copias = []
+    original = grasp.clonar_agenda
+    monkeypatch.setattr(grasp, "clonar_agenda", lambda *args: copias.append(1) or original(*args))
+
+    resultado, _ = grasp.buscar_melhora_local(agenda, max_tentativas=300, rng=random.Random(3))
+    assert resultado is agenda
+    assert not copias
+
+    # no grasp() só se copia a agenda quando surge uma nova melhor solução
+    estatisticas = grasp.EstatisticasGrasp()
+    grasp.grasp(aulas, iteracoes=10, compacta=compacta, processos=1, semente=2,
+                estatisticas=estatisticas)
+    assert len(copias) == len(estatisticas.melhorias)
@@ -0,0 +1,18 @@
+"""
+Testes do benchmark (instância sintética e contagem de movimentos).
+"""
+import random
+
+import benchmark
+
+
+def test_movimentos_contam_so_os_sorteados():
+    # 3 aulas em 20 horários: a maioria das tentativas cai em horário vazio
+    instancia, aulas = benchmark.gerar_instancia_sintetica(n_salas=4, n_aulas=3, semente=1)
+    resultado = benchmark.medir_busca_local(aulas, instancia, repeticoes=5, tentativas=200,
+                                            rng=random.Random(1))
+
+    assert 0 < resultado["movimentos_tentados"] < 5 * 200
+    assert resultado["movimentos_aceitos"] <= resultado["movimentos_viaveis"] \
+        <= resultado["movimentos_tentados"]
+    assert resultado["movimentos_por_s"] == resultado["movimentos_tentados"] / resultado["tempo_s"]
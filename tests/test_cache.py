@@ -0,0 +1,87 @@
+"""
+Testes do cache persistente das aulas lidas do CSV.
+"""
+import os
+import shutil
+
+import pytest
+
+import grasp
+
+
+def _campos(aulas):
+    return [(a.disciplina, a.professor, a.alunos, a.dia, a.horario) for a in aulas]
+
+
+@pytest.fixture
+def csv_copia(tmp_path, raiz):
+    caminho = tmp_path / "agenda.csv"
+    shutil.copy(os.path.join(raiz, "agenda.csv"), caminho)
+    return str(caminho)
+
+
+def _contar_parser(monkeypatch):
+    chamadas = []
+    original = grasp.carregar_aulas_do_csv
+    monkeypatch.setattr(grasp, "carregar_aulas_do_csv",
+                        lambda *args: chamadas.append(args) or original(*args))
+    return chamadas
+
+
+def test_acerto_pula_o_parser(csv_copia, tmp_path, monkeypatch):
+    cache = str(tmp_path / "cache")
+    esperado = grasp.carregar_aulas_do_csv(csv_copia)
+    chamadas = _contar_parser(monkeypatch)
+
+    primeira = grasp.carregar_aulas_com_cache(csv_copia, diretorio_cache=cache)
+    segunda = grasp.carregar_aulas_com_cache(csv_copia, diretorio_cache=cache)
+
+    assert len(chamadas) == 1
+    assert len(os.listdir(cache)) == 1
+    assert _campos(primeira) == _campos(segunda) == _campos(esperado)
+
+
+def test_conteudo_ou_versao_alterados_invalidam(csv_copia, tmp_path, monkeypatch):
+    cache = str(tmp_path / "cache")
+    chamadas = _contar_parser(monkeypatch)
+    antes = grasp.carregar_aulas_com_cache(csv_copia, diretorio_cache=cache)
+
+    with open(csv_copia, "a", encoding="utf-8") as arquivo:
+        arquivo.write("\n")
+    grasp.carregar_aulas_com_cache(csv_copia, diretorio_cache=cache)
+    assert len(chamadas) == 2
+
+    monkeypatch.setattr(grasp, "VERSAO_PARSER", grasp.VERSAO_PARSER + 1)
+    depois = grasp.carregar_aulas_com_cache(csv_copia, diretorio_cache=cache)
+    assert len(chamadas) == 3
+    assert _campos(depois) == _campos(antes)
+
+
+def test_entrada_corrompida_rele_o_csv(csv_copia, tmp_path, monkeypatch):
+    cache = str(tmp_path / "cache")
+    esperado = grasp.carregar_aulas_com_cache(csv_copia, diretorio_cache=cache)
+    (entrada,) = os.listdir(cache)
+    with open(os.path.join(cache, entrada), "wb") as arquivo:
+        arquivo.write(b"lixo")
+    chamadas = _contar_parser(monkeypatch)
+
+    aulas = grasp.carregar_aulas_com_cache(csv_copia, diretorio_cache=cache)
+    assert len(chamadas) == 1
+    assert _campos(aulas) == _campos(esperado)
+    # a entrada é regravada e volta a servir
+    grasp.carregar_aulas_com_cache(csv_copia, diretorio_cache=cache)
+    assert len(chamadas) == 1
+
+
+def test_cache_limitado_remove_as_mais_antigas(tmp_path, raiz):
+    cache = str(tmp_path / "cache")
+    entradas = []
+    for i, nome in enumerate(("agenda.csv", "agenda_exata.csv", "agenda_saturada.csv")):
+        grasp.carregar_aulas_com_cache(os.path.join(raiz, nome), diretorio_cache=cache)
+        (nova,) = set(os.listdir(cache)) - set(entradas)
+        os.utime(os.path.join(cache, nova), (i, i))
+        entradas.append(nova)
+
+    # cabe só a mais recente
+    grasp._podar_cache(cache, os.path.getsize(os.path.join(cache, entradas[-1])))
+    assert os.listdir(cache) == [entradas[-1]]
@@ -0,0 +1,26 @@
+"""
+Testes da leitura dos horários do CSV.
+"""
+import grasp
+
+
+def _instancia():
+    return grasp.Instancia(grasp.salas, grasp.dias_semana, grasp.horarios_texto,
+                           grasp.marcadores_horario)
+
+
+def test_mapear_horario_usa_marcadores():
+    inst = _instancia()
+    assert grasp.mapear_horario(" 08:00 às 10:00 ", inst) == 0
+    assert grasp.mapear_horario("sem horário", inst) is None
+
+
+def test_tabela_horarios_limitada():
+    inst = _instancia()
+    for i in range(grasp.LIMITE_TABELA_HORARIOS + 50):
+        grasp.mapear_horario(f"turma {i} 08:00 às 10:00", inst)
+
+    assert len(inst.tabela_horarios) == grasp.LIMITE_TABELA_HORARIOS
+    # os textos mais antigos saem primeiro, e o resultado não muda
+    assert "turma 0 08:00 às 10:00" not in inst.tabela_horarios
+    assert grasp.mapear_horario("turma 0 08:00 às 10:00", inst) == 0
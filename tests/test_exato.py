@@ -0,0 +1,66 @@
+"""
+Testes do solver exato: resolver_horario_exato contra força bruta em
+horários pequenos e resolver_exato nos CSVs de exemplo.
+"""
+import itertools
+import random
+
+import pytest
+
+import grasp
+
+
+def _instancia_aleatoria(rng):
+    salas = [grasp.Sala(f"S{i}", rng.choice((10, 20, 30, 40)), rng.randint(-2, 3))
+             for i in range(rng.randint(1, 5))]
+    return grasp.Instancia(salas, ["Segunda-feira"], ["08:00 às 10:00"])
+
+
+def _forca_bruta(aulas, instancia):
+    """(alocadas, peso) ótimos entre todas as atribuições parciais sem repetir sala."""
+    opcoes = [None] + list(range(instancia.n_salas))
+    melhor = (0, 0.0)
+    for escolha in itertools.product(opcoes, repeat=len(aulas)):
+        usadas = [s for s in escolha if s is not None]
+        if len(usadas) != len(set(usadas)):
+            continue
+        if any(s is not None and instancia.salas[s].capacidade < aula.alunos
+               for aula, s in zip(aulas, escolha)):
+            continue
+        peso = sum(grasp.contribuicao_slot(s, aula, instancia)
+                   for aula, s in zip(aulas, escolha) if s is not None)
+        if (len(usadas), peso) > (melhor[0], melhor[1] + grasp.TOLERANCIA_SCORE):
+            melhor = (len(usadas), peso)
+    return melhor
+
+
+def test_horario_exato_confere_com_forca_bruta():
+    rng = random.Random(4)
+    for _ in range(150):
+        instancia = _instancia_aleatoria(rng)
+        aulas = [grasp.Aula(f"A{i}", f"P{i}", rng.randint(5, 45), 0, 0)
+                 for i in range(rng.randint(0, 6))]
+
+        pares, nao_alocadas = grasp.resolver_horario_exato(aulas, instancia)
+        alocadas, peso = _forca_bruta(aulas, instancia)
+
+        salas_usadas = [s for _, s in pares]
+        assert len(salas_usadas) == len(set(salas_usadas))
+        assert all(instancia.salas[s].capacidade >= aula.alunos for aula, s in pares)
+        assert len(pares) + len(nao_alocadas) == len(aulas)
+        assert len(pares) == alocadas
+        assert sum(grasp.contribuicao_slot(s, aula, instancia) for aula, s in pares) == \
+            pytest.approx(peso, abs=grasp.TOLERANCIA_SCORE)
+
+
+@pytest.mark.parametrize("nome", ["agenda.csv", "agenda_exata.csv", "agenda_saturada.csv"])
+def test_resolver_exato_nao_perde_para_o_grasp(nome, carregar_csv):
+    aulas = carregar_csv(nome)
+    agenda, score, nao_alocadas = grasp.resolver_exato(aulas)
+    _, score_grasp, nao_alocadas_grasp = grasp.grasp(aulas, iteracoes=5, processos=1, semente=1)
+
+    assert score == pytest.approx(grasp.avaliar_agenda(agenda), abs=grasp.TOLERANCIA_SCORE)
+    # o exato aloca o máximo de aulas e, com o mesmo número, tem o maior score
+    assert len(nao_alocadas) <= len(nao_alocadas_grasp)
+    if len(nao_alocadas) == len(nao_alocadas_grasp):
+        assert score >= score_grasp - grasp.TOLERANCIA_SCORE
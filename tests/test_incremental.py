@@ -0,0 +1,42 @@
+"""
+Testes da re-solução incremental (partida quente).
+"""
+import random
+
+import grasp
+
+
+def _alocacao(agenda, d, h):
+    inst = grasp.INSTANCIA_PADRAO
+    return [grasp.chave_aula(agenda[s][d][h].aula) if agenda[s][d][h].aula else None
+            for s in range(inst.n_salas)]
+
+
+def test_incremental_confere_com_resolucao_completa(carregar_csv):
+    inst = grasp.INSTANCIA_PADRAO
+    anteriores = carregar_csv("agenda_exata.csv")
+    agenda_anterior, _, _ = grasp.resolver_exato(anteriores)
+
+    # nova leitura (outros objetos Aula) com uma aula removida e uma incluída
+    aulas = carregar_csv("agenda_exata.csv")
+    removida = aulas.pop(0)
+    incluida = grasp.Aula("Nova", "Prof. Novo", 20, 4, 3)
+    aulas.append(incluida)
+    afetados_esperados = sorted({(removida.dia, removida.horario), (4, 3)})
+
+    agenda, score, nao_alocadas, afetados = grasp.resolver_incremental(
+        aulas, agenda_anterior, anteriores, iteracoes=5, rng=random.Random(1))
+    completa, _, _ = grasp.resolver_exato(aulas)
+
+    assert afetados == afetados_esperados
+    assert score == grasp.avaliar_agenda(agenda)
+    for d in range(inst.n_dias):
+        for h in range(inst.n_horarios):
+            if (d, h) not in afetados:
+                assert _alocacao(agenda, d, h) == _alocacao(completa, d, h)
+
+    # cada aula nova está na agenda uma única vez ou entre as não alocadas
+    ids = [id(slot.aula) for sala in agenda for dia in sala for slot in dia if slot.aula]
+    assert len(ids) == len(set(ids))
+    assert set(ids) | {id(a) for a in nao_alocadas} == {id(a) for a in aulas}
+    assert not set(ids) & {id(a) for a in nao_alocadas}
@@ -0,0 +1,70 @@
+"""
+Testes do modo em lote (vários CSVs em paralelo).
+"""
+import json
+import os
+import shutil
+
+import grasp
+
+PARAMETROS = {"instancia": None, "iteracoes": 3, "alpha": None, "semente_lote": 7}
+
+
+def _copiar_csvs(raiz, destino):
+    os.makedirs(destino)
+    for nome in ("agenda.csv", "agenda_exata.csv"):
+        shutil.copy(os.path.join(raiz, nome), destino)
+    return str(destino)
+
+
+def test_lote_resolve_e_pula_inalterados(tmp_path, raiz):
+    entradas = _copiar_csvs(raiz, tmp_path / "departamentos")
+    saida = str(tmp_path / "saida")
+    trabalhos = grasp.ler_trabalhos_lote(entradas, PARAMETROS)
+
+    resumo = grasp.executar_lote(trabalhos, saida, processos=2)
+
+    assert (resumo["total"], resumo["executados"], resumo["erros"]) == (2, 2, 0)
+    por_nome = {r["nome"]: r for r in resumo["trabalhos"]}
+    assert set(por_nome) == {"agenda", "agenda_exata"}
+    for r in por_nome.values():
+        with open(r["saida"], encoding="utf-8") as arquivo:
+            assert json.load(arquivo)["score"] == r["score"]
+    assert por_nome["agenda"]["semente"] != por_nome["agenda_exata"]["semente"]
+    with open(os.path.join(saida, grasp.ARQUIVO_RESUMO_LOTE), encoding="utf-8") as arquivo:
+        assert json.load(arquivo)["aulas"] == resumo["aulas"]
+
+    # sem mudanças, nada é refeito; só o CSV alterado volta a rodar
+    repetido = grasp.executar_lote(list(reversed(trabalhos)), saida, processos=2)
+    assert (repetido["executados"], repetido["reaproveitados"]) == (0, 2)
+    with open(os.path.join(entradas, "agenda.csv"), "a", encoding="utf-8") as arquivo:
+        arquivo.write("\n")
+    alterado = grasp.executar_lote(trabalhos, saida, processos=2)
+    assert (alterado["executados"], alterado["reaproveitados"]) == (1, 1)
+    assert {r["nome"]: r["score"] for r in alterado["trabalhos"]} == \
+        {nome: r["score"] for nome, r in por_nome.items()}
+
+
+def test_semente_nao_depende_da_ordem_nem_dos_processos(tmp_path, raiz):
+    entradas = _copiar_csvs(raiz, tmp_path / "departamentos")
+    trabalhos = grasp.ler_trabalhos_lote(entradas, PARAMETROS)
+
+    um = grasp.executar_lote(trabalhos, str(tmp_path / "a"), processos=1)
+    dois = grasp.executar_lote(list(reversed(trabalhos)), str(tmp_path / "b"), processos=2)
+
+    def resultados(resumo):
+        return {r["nome"]: (r["semente"], r["score"], r["nao_alocadas"]) for r in resumo["trabalhos"]}
+    assert resultados(um) == resultados(dois)
+
+
+def test_erro_em_um_trabalho_nao_derruba_o_lote(tmp_path, raiz):
+    entradas = _copiar_csvs(raiz, tmp_path / "departamentos")
+    vazio = os.path.join(entradas, "vazio.csv")
+    open(vazio, "w").close()
+    trabalhos = grasp.ler_trabalhos_lote(entradas, PARAMETROS)
+
+    resumo = grasp.executar_lote(trabalhos, str(tmp_path / "saida"), processos=2)
+
+    assert (resumo["total"], resumo["erros"]) == (3, 1)
+    (erro,) = [r for r in resumo["trabalhos"] if "erro" in r]
+    assert erro["nome"] == "vazio"
@@ -0,0 +1,58 @@
+"""
+Testes da MatrizCustos e da busca local em lote.
+"""
+import random
+import subprocess
+import sys
+
+import pytest
+
+import grasp
+
+
+@pytest.fixture(params=["numpy", "python"])
+def numpy_ou_python(request, monkeypatch):
+    """Roda o teste com NumPy (se instalado) e com a versão em Python puro."""
+    if request.param == "numpy":
+        if grasp.obter_numpy() is None:
+            pytest.skip("NumPy não instalado")
+    else:
+        monkeypatch.setattr(grasp, "_numpy", False)
+    return request.param
+
+
+def test_importar_grasp_nao_carrega_numpy(raiz):
+    codigo = "import sys, grasp; sys.exit('numpy' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", codigo], cwd=raiz).returncode == 0
+
+
+def test_busca_em_lote_confere_com_avaliacao(numpy_ou_python, carregar_csv):
+    aulas = carregar_csv("agenda_saturada.csv")
+    agenda, _ = grasp.construir_solucao_grasp(aulas, rng=random.Random(3))
+
+    agenda, score, nao_alocadas = grasp.busca_local_em_lote(agenda, aulas, verificar=True)
+
+    assert score == pytest.approx(grasp.avaliar_agenda(agenda), abs=grasp.TOLERANCIA_SCORE)
+    vetor = grasp.salas_por_aula(agenda, aulas)
+    assert [a for a, s in zip(aulas, vetor) if s < 0] == nao_alocadas
+
+
+def test_busca_em_lote_respeita_salas_ocupadas_por_terceiros(numpy_ou_python):
+    # Lab4 (a melhor sala para 20 alunos) está bloqueada em (0, 0) e tem uma
+    # reserva fora da lista de aulas em (0, 1)
+    lab3, lab4 = 2, 3
+    agenda = grasp.criar_agenda_vazia()
+    a = grasp.Aula("A", "P1", 20, 0, 0)
+    b = grasp.Aula("B", "P2", 20, 0, 1)
+    reserva = grasp.Aula("Reserva", "X", 20, 0, 1)
+    agenda[lab4][0][0].ocupado = 1
+    for sala, aula in ((lab3, a), (lab3, b), (lab4, reserva)):
+        agenda[sala][0][aula.horario].ocupado = 1
+        agenda[sala][0][aula.horario].aula = aula
+
+    agenda, score, nao_alocadas = grasp.busca_local_em_lote(agenda, [a, b], verificar=True)
+
+    assert agenda[lab3][0][0].aula is a and agenda[lab3][0][1].aula is b
+    assert agenda[lab4][0][0].ocupado and agenda[lab4][0][0].aula is None
+    assert agenda[lab4][0][1].aula is reserva
+    assert not nao_alocadas
@@ -0,0 +1,63 @@
+"""
+Testes do MemoHorarios.
+"""
+import json
+import os
+
+import grasp
+
+ASSINATURA = ("instancia", (40, 20), 0b1111)
+
+
+def test_combinar_varias_copias_soma_so_o_que_cada_uma_viu():
+    memo = grasp.MemoHorarios()
+    memo.registrar(ASSINATURA, [0, 1], 5.0, vistos=3)
+    memo.consultar(ASSINATURA)
+
+    copias = [memo.novo() for _ in range(3)]
+    for i, copia in enumerate(copias):
+        copia.registrar(ASSINATURA, [0, 1], 5.0, vistos=2)
+        copia.consultar(ASSINATURA)
+        copia.consultar(("instancia", (i,), 0))
+    for copia in copias:
+        memo.combinar(copia)
+
+    assert memo.entradas[ASSINATURA][2] == 3 + 3 * 2
+    # nas cópias a assinatura já tem 5 observações (confirmada): acerto
+    assert memo.acertos == 3
+    assert memo.faltas == 1 + 3
+
+
+def test_grasp_com_memo_em_processos(carregar_csv):
+    aulas = carregar_csv("agenda.csv")
+    memo = grasp.MemoHorarios()
+    grasp.grasp(aulas, iteracoes=8, processos=2, semente=1, memo=memo)
+    vistos = sum(entrada[2] for entrada in memo.entradas.values())
+    consultas = memo.acertos + memo.faltas
+
+    # cada horário buscado numa iteração é uma observação no memo, e cada
+    # horário (buscado ou copiado) é uma consulta
+    assert consultas == 8 * len(grasp.agrupar_por_horario(aulas))
+    assert vistos == memo.faltas
+
+
+def test_lote_com_memo_nao_reconta_o_arquivo(tmp_path, raiz):
+    caminho_memo = str(tmp_path / "memo.json")
+    trabalhos = grasp.ler_trabalhos_lote(
+        [os.path.join(raiz, "agenda.csv"), os.path.join(raiz, "agenda_exata.csv")],
+        {"instancia": None, "iteracoes": 10, "alpha": None, "semente_lote": 1})
+
+    def contagens():
+        with open(caminho_memo, encoding="utf-8") as arquivo:
+            return sorted(entrada[-1] for entrada in json.load(arquivo)["entradas"])
+
+    # 10 iterações confirmam todas as assinaturas: nas execuções seguintes os
+    # horários são copiados do memo, sem observações novas
+    grasp.executar_lote(trabalhos, str(tmp_path / "saida"), processos=2, memo=caminho_memo)
+    primeira = contagens()
+    assert min(primeira) >= grasp.MemoHorarios().confirmacoes
+
+    for _ in range(2):
+        grasp.executar_lote(trabalhos, str(tmp_path / "saida"), processos=2, forcar=True,
+                            memo=caminho_memo)
+        assert contagens() == primeira
@@ -0,0 +1,81 @@
+"""
+Testes dos motores de busca local horário a horário (BuscaVND e
+BuscaRecozimento): score incremental com verificar=True, salas bloqueadas
+e orçamento da VND.
+"""
+import random
+
+import pytest
+
+import grasp
+
+MOTORES = [grasp.BuscaVND, grasp.BuscaRecozimento]
+
+
+def _inicial(aulas, compacta, semente=5):
+    agenda = grasp.AgendaCompacta(aulas) if compacta else None
+    return grasp.construir_solucao_grasp(aulas, agenda=agenda, rng=random.Random(semente))
+
+
+@pytest.mark.parametrize("compacta", [False, True])
+@pytest.mark.parametrize("motor", MOTORES)
+@pytest.mark.parametrize("nome", ["agenda.csv", "agenda_exata.csv", "agenda_saturada.csv"])
+def test_motor_com_verificacao(nome, motor, compacta, carregar_csv):
+    aulas = carregar_csv(nome)
+    agenda, nao_alocadas = _inicial(aulas, compacta)
+    score_inicial = grasp.avaliar_agenda(agenda)
+
+    # verificar=True confere cada movimento aceito com avaliar_agenda
+    agenda, score, nao_alocadas = motor(aulas).buscar(agenda, nao_alocadas, random.Random(2),
+                                                      max_tentativas=50, verificar=True)
+
+    assert score == pytest.approx(grasp.avaliar_agenda(agenda), abs=grasp.TOLERANCIA_SCORE)
+    assert score >= score_inicial - grasp.TOLERANCIA_SCORE
+    vetor = grasp.salas_por_aula(agenda, aulas)
+    assert {id(a) for a, s in zip(aulas, vetor) if s < 0} == {id(a) for a in nao_alocadas}
+
+
+def test_verificar_detecta_delta_errado_na_vnd(carregar_csv, monkeypatch):
+    aulas = carregar_csv("agenda_saturada.csv")
+    original = grasp.BuscaVND.delta
+    monkeypatch.setattr(grasp.BuscaVND, "delta",
+                        lambda self, estado, mudancas: original(self, estado, mudancas) + 1)
+
+    agenda, nao_alocadas = _inicial(aulas, compacta=False)
+    grasp.BuscaVND(aulas).buscar(agenda, nao_alocadas, random.Random(2))  # sem verificar: passa
+    agenda, nao_alocadas = _inicial(aulas, compacta=False)
+    with pytest.raises(AssertionError):
+        grasp.BuscaVND(aulas).buscar(agenda, nao_alocadas, random.Random(2), verificar=True)
+
+
+@pytest.mark.parametrize("motor", MOTORES)
+def test_motor_nao_usa_sala_bloqueada(motor):
+    # Lab4, a melhor sala para 20 alunos, está ocupada sem aula
+    lab3, lab4 = 2, 3
+    agenda = grasp.criar_agenda_vazia()
+    a = grasp.Aula("A", "P1", 20, 0, 0)
+    agenda[lab4][0][0].ocupado = 1
+    agenda[lab3][0][0].ocupado = 1
+    agenda[lab3][0][0].aula = a
+
+    agenda, _, _ = motor([a]).buscar(agenda, [], random.Random(1), max_tentativas=200,
+                                     verificar=True)
+
+    assert agenda[lab4][0][0].ocupado and agenda[lab4][0][0].aula is None
+    assert grasp.salas_por_aula(agenda, [a]) != [lab4]
+
+
+def test_vnd_respeita_orcamento(carregar_csv):
+    aulas = carregar_csv("agenda_saturada.csv")
+    busca = grasp.BuscaVND(aulas, avaliacoes_por_tentativa=1)
+    avaliados = []
+    for max_tentativas in (20, 10000):
+        agenda, nao_alocadas = _inicial(aulas, compacta=False)
+        estatisticas = grasp.EstatisticasGrasp()
+        busca.buscar(agenda, nao_alocadas, random.Random(2), max_tentativas=max_tentativas,
+                     estatisticas=estatisticas)
+        avaliados.append(estatisticas.movimentos_tentados)
+
+    # o orçamento é conferido entre salas: passa no máximo de uma varredura
+    assert avaliados[0] <= 20 + busca.tamanho_lista ** 2 + len(aulas)
+    assert avaliados[0] < avaliados[1]
@@ -0,0 +1,64 @@
+"""
+Testes do reagendamento de aulas não alocadas em outros horários.
+"""
+import grasp
+
+
+def _aulas_em(agenda, instancia):
+    for s in range(instancia.n_salas):
+        for d in range(instancia.n_dias):
+            for h in range(instancia.n_horarios):
+                slot = agenda[s][d][h]
+                if slot.ocupado and slot.aula is not None:
+                    yield s, d, h, slot.aula
+
+
+def test_reagendar_sem_conflitos(carregar_csv):
+    inst = grasp.INSTANCIA_PADRAO
+    # sem as aulas de quinta e sexta, sobram salas livres nesses dias
+    aulas = [a for a in carregar_csv("agenda_saturada.csv") if a.dia < 3]
+    agenda, _, nao_alocadas = grasp.grasp(aulas, iteracoes=3, processos=1, semente=1)
+    antes = {(s, d, h): aula for s, d, h, aula in _aulas_em(agenda, inst)}
+    originais = [(a.dia, a.horario) for a in nao_alocadas]
+
+    reagendadas, restantes = grasp.reagendar_nao_alocadas(agenda, nao_alocadas)
+
+    assert reagendadas
+    assert len(reagendadas) + len(restantes) == len(nao_alocadas)
+    assert [(a.dia, a.horario) for a in nao_alocadas] == originais
+    depois = {(s, d, h): aula for s, d, h, aula in _aulas_em(agenda, inst)}
+    # nada do que já estava na agenda mudou
+    assert all(depois[chave] is aula for chave, aula in antes.items())
+
+    novas = {id(nova) for _, nova in reagendadas}
+    for (s, d, h), aula in depois.items():
+        if id(aula) not in novas:
+            continue
+        assert (s, d, h) not in antes
+        assert inst.salas[s].capacidade >= aula.alunos
+        assert (aula.dia, aula.horario) == (d, h)
+        # o professor não tem outra aula no novo horário
+        outras = [o for (_, d2, h2), o in depois.items()
+                  if (d2, h2) == (d, h) and o is not aula and o.professor == aula.professor]
+        assert not outras
+
+
+def test_reagendar_respeita_professor_e_prefere_horario_proximo():
+    inst = grasp.INSTANCIA_PADRAO
+    agenda = grasp.criar_agenda_vazia()
+    # (0, 0) lotado; o professor P já dá aula em (0, 1)
+    for s in range(inst.n_salas):
+        agenda[s][0][0].ocupado = 1
+        agenda[s][0][0].aula = grasp.Aula(f"D{s}", f"Q{s}", 10, 0, 0)
+    agenda[0][0][1].ocupado = 1
+    agenda[0][0][1].aula = grasp.Aula("Outra", "P", 10, 0, 1)
+    aula = grasp.Aula("Pendente", "P", 30, 0, 0)
+
+    reagendadas, restantes = grasp.reagendar_nao_alocadas(agenda, [aula])
+
+    assert not restantes
+    ((original, nova),) = reagendadas
+    assert original is aula and (aula.dia, aula.horario) == (0, 0)
+    assert (nova.dia, nova.horario) == (0, 2)
+    (sala,) = [s for s in range(inst.n_salas) if agenda[s][0][2].aula is nova]
+    assert inst.salas[sala].capacidade == 54
@@ -0,0 +1,52 @@
+"""
+Testes do path relinking (religar_caminho).
+"""
+import grasp
+
+LAB1, LAB2, LAB3, LAB4 = range(4)
+
+
+def _agenda_com_terceiros():
+    """
+    (0, 0) com Lab1 bloqueado (ocupado sem aula) e Lab2 com uma aula que
+    não participa do religamento.
+    """
+    agenda = grasp.criar_agenda_vazia()
+    agenda[LAB1][0][0].ocupado = 1
+    terceira = grasp.Aula("Reserva", "X", 50, 0, 0)
+    agenda[LAB2][0][0].ocupado = 1
+    agenda[LAB2][0][0].aula = terceira
+    return agenda, terceira
+
+
+def _conferir_terceiros(agenda, terceira):
+    assert agenda[LAB1][0][0].ocupado and agenda[LAB1][0][0].aula is None
+    assert agenda[LAB2][0][0].ocupado and agenda[LAB2][0][0].aula is terceira
+
+
+def test_reescrever_horario_preserva_terceiros():
+    agenda, terceira = _agenda_com_terceiros()
+    a = grasp.Aula("A", "P1", 20, 0, 0)
+    b = grasp.Aula("B", "P2", 20, 0, 0)
+    agenda[LAB3][0][0].ocupado = 1
+    agenda[LAB3][0][0].aula = b
+    atual = [-1, LAB3]
+
+    ganho = grasp.religar_caminho(agenda, [a, b], atual, [LAB4, LAB3])
+
+    assert ganho > 0
+    assert atual == [LAB4, LAB3]
+    assert agenda[LAB4][0][0].aula is a and agenda[LAB3][0][0].aula is b
+    _conferir_terceiros(agenda, terceira)
+
+
+def test_guia_nao_invade_sala_de_terceiros():
+    agenda, terceira = _agenda_com_terceiros()
+    # no guia, A ocupa a sala da aula de fora e B a bloqueada
+    a = grasp.Aula("A", "P1", 50, 0, 0)
+    b = grasp.Aula("B", "P2", 50, 0, 0)
+
+    ganho = grasp.religar_caminho(agenda, [a, b], [-1, -1], [LAB2, LAB1])
+
+    assert ganho == 0
+    _conferir_terceiros(agenda, terceira)
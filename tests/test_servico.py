@@ -0,0 +1,74 @@
+"""
+Testes do serviço de agendamento (sem HTTP: chamam o ServicoAgenda direto).
+"""
+import asyncio
+
+import pytest
+
+import servico_agenda as sa
+
+
+@pytest.fixture
+def servico(tmp_path, raiz):
+    servico = sa.ServicoAgenda(str(tmp_path / "agendas.db"), processos=1, diretorio_dados=raiz)
+    yield servico
+    servico.encerrar()
+
+
+def _reserva(disciplina, dia):
+    return {"disciplina": disciplina, "professor": "X", "alunos": 20, "sala": "Lab4",
+            "dia": dia, "horario": 0}
+
+
+def test_reserva_durante_resolucao_e_mantida(servico):
+    async def cenario():
+        await servico.criar_agenda({"nome": "g"})
+        agenda = servico.agendas["g"]
+        resolucao = asyncio.ensure_future(servico.resolver(
+            "g", {"csv": "agenda_saturada.csv", "iteracoes": 2000, "semente": 1}))
+        while not agenda.resolucoes:
+            await asyncio.sleep(0.01)
+        await servico.reservar("g", _reserva("Durante", 0))
+        await servico.reservar("g", _reserva("Cancelada", 1))
+        await servico.cancelar("g", "Lab4", 1, 0)
+        assert not resolucao.done()
+        return await resolucao
+
+    resposta = asyncio.run(cenario())
+
+    disciplinas = {a["disciplina"] for a in servico.descrever_agenda("g")["alocadas"]}
+    assert "Durante" in disciplinas
+    assert "Cancelada" not in disciplinas
+    assert resposta["reservas_mantidas"] == 1
+    assert resposta["alocadas"] == len(servico.descrever_agenda("g")["alocadas"])
+    assert not servico.agendas["g"].reservas_recentes
+
+
+@pytest.mark.parametrize("corpo, status", [
+    ({"csv": "../etc/passwd"}, 403),
+    ({"csv": "/etc/passwd"}, 403),
+    ({"csv": "nao_existe.csv"}, 404),
+    ({"csv": "agenda.csv", "iteracoes": "x"}, 400),
+    ({"csv": "agenda.csv", "iteracoes": 0}, 400),
+    ({"csv": "agenda.csv", "semente": "abc"}, 400),
+    ({"csv": "agenda.csv", "alpha": 2}, 400),
+    ({"csv": "agenda.csv", "alpha": "0.3"}, 400),
+])
+def test_resolver_rejeita_entradas_invalidas(servico, corpo, status):
+    async def cenario():
+        await servico.criar_agenda({"nome": "g"})
+        await servico.resolver("g", corpo)
+
+    with pytest.raises(sa.ErroRequisicao) as erro:
+        asyncio.run(cenario())
+    assert erro.value.status == status
+
+
+def test_disponibilidade_rejeita_alunos_invalido(servico):
+    async def cenario(consulta):
+        await servico.criar_agenda({"nome": "g"})
+        return await servico.atender("GET", "/agendas/g/disponibilidade", consulta, b"")
+
+    with pytest.raises(sa.ErroRequisicao) as erro:
+        asyncio.run(cenario({"alunos": ["x"]}))
+    assert erro.value.status == 400